@@ -47,4 +47,13 @@ class Conf(_config.ConfigNamespace):
         'to zero. If it is not within ``threshold`` then a warning is raised.'
     )
 
+    dtype_policy = _config.ConfigItem(
+        ['promote', 'preserve'],
+        'Floating point type of the results of the manipulation and analysis '
+        'functions. With ``promote``, results follow the type promotion of '
+        'their computations, which often gives float64 results for float32 '
+        'spectra. With ``preserve``, results keep the precision of the '
+        'spectra, so float32 spectra give float32 results.'
+    )
+
 conf = Conf()
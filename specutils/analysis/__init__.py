@@ -4,3 +4,8 @@ from .location import *  # noqa
 from .width import *  # noqa
 from .template_comparison import *  # noqa
 from .correlation import *  # noqa
+from .cumulative import *  # noqa
+from .measure import *  # noqa
+from .caching import *  # noqa
+from .moment import *  # noqa
+from .spectral_index import *  # noqa
@@ -0,0 +1,199 @@
+"""
+Opt-in memoization of the region lookups and per-region results of the
+analysis functions.
+"""
+
+import threading
+from collections import OrderedDict, namedtuple
+from contextlib import contextmanager
+
+
+__all__ = ['cache', 'AnalysisCache']
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'maxsize', 'currsize'])
+
+# The active caches of each thread, innermost last.
+_active = threading.local()
+
+
+class AnalysisCache:
+    """
+    Least-recently-used store of the results of the analysis functions for
+    pairs of spectrum and region.
+
+    Entries are keyed by the identity of the spectrum and the bounds of the
+    region, and are only reused while the flux, mask, uncertainty and WCS
+    objects of the spectrum are the same as when they were stored. The
+    in-place operations of `~specutils.Spectrum1D` (the augmented
+    arithmetic operators, the ``out`` argument of the arithmetic methods and
+    ``new_flux_unit(inplace=True)``) evict the entries of the spectrum.
+    Instances are created by `~specutils.analysis.cache`.
+
+    Parameters
+    ----------
+    maxsize : int or `None`, optional
+        Maximum number of entries. The least recently used entry is evicted
+        when it is exceeded. `None` for no limit.
+    """
+    def __init__(self, maxsize=128):
+        if maxsize is not None and maxsize < 1:
+            raise ValueError("maxsize must be a positive integer or None.")
+
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __repr__(self):
+        return "<AnalysisCache(hits={}, misses={}, maxsize={}, " \
+               "currsize={})>".format(*self.info())
+
+    def info(self):
+        """
+        The hit and miss counts, maximum size and current size of the cache,
+        as a named tuple like that of `functools.lru_cache`.
+        """
+        return CacheInfo(self.hits, self.misses, self.maxsize, len(self))
+
+    def clear(self):
+        """
+        Remove all the entries, keeping the hit and miss counts.
+        """
+        self._entries.clear()
+
+    def evict(self, spectrum):
+        """
+        Remove the entries of ``spectrum``, after its flux, mask or
+        uncertainty are modified in place.
+        """
+        stale = [key for key, (state, _) in self._entries.items()
+                 if state[0] is spectrum]
+        for key in stale:
+            del self._entries[key]
+
+    def get(self, name, spectrum, region, compute):
+        """
+        Return the value of ``name`` for ``spectrum`` and ``region``,
+        calling ``compute`` (without arguments) and storing its result if it
+        is not in the cache.
+        """
+        key = (name, id(spectrum), _region_key(region))
+        state = _spectrum_state(spectrum)
+
+        entry = self._entries.get(key)
+        if entry is not None and all(a is b for a, b in zip(entry[0], state)):
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return entry[1]
+
+        self.misses += 1
+        value = compute()
+
+        # The stored state keeps a reference to the spectrum, so that its id
+        # is not reused while the entry exists.
+        self._entries[key] = (state, value)
+        self._entries.move_to_end(key)
+        if self.maxsize is not None and len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+        return value
+
+
+@contextmanager
+def cache(maxsize=128):
+    """
+    Context manager that memoizes the region lookups and per-region moments
+    of the analysis functions called inside it.
+
+    Analysis functions often repeat each other's work on the same spectrum
+    and region: `~specutils.analysis.gaussian_fwhm` computes the
+    `~specutils.analysis.gaussian_sigma_width`, which computes the
+    `~specutils.analysis.centroid`, and
+    `~specutils.analysis.equivalent_width` computes the
+    `~specutils.analysis.line_flux`. Inside this context the pixels selected
+    by each region, the line flux, the centroid and the second moment are
+    computed once per spectrum and region and then reused. The cache is
+    emptied on exit.
+
+    Parameters
+    ----------
+    maxsize : int or `None`, optional
+        Maximum number of stored results, the least recently used being
+        evicted first. `None` for no limit.
+
+    Yields
+    ------
+    cache : `~specutils.analysis.AnalysisCache`
+        The active cache, whose ``hits`` and ``misses`` attributes and
+        ``info()`` method report its statistics.
+
+    Examples
+    --------
+    >>> from specutils.analysis import cache, gaussian_fwhm, centroid
+    >>> with cache() as analysis_cache:  # doctest: +SKIP
+    ...     fwhm = gaussian_fwhm(spectrum, region)
+    ...     center = centroid(spectrum, region)
+    >>> analysis_cache.info()  # doctest: +SKIP
+    CacheInfo(hits=2, misses=3, maxsize=128, currsize=0)
+    """
+    analysis_cache = AnalysisCache(maxsize)
+
+    stack = getattr(_active, 'stack', None)
+    if stack is None:
+        stack = _active.stack = []
+
+    stack.append(analysis_cache)
+    try:
+        yield analysis_cache
+    finally:
+        stack.remove(analysis_cache)
+        analysis_cache.clear()
+
+
+def cached(name, spectrum, region, compute):
+    """
+    Return ``compute()``, memoized in the innermost active
+    `~specutils.analysis.cache` under ``name``, ``spectrum`` and ``region``
+    if there is one.
+    """
+    stack = getattr(_active, 'stack', None)
+    if not stack:
+        return compute()
+
+    return stack[-1].get(name, spectrum, region, compute)
+
+
+def evict(spectrum):
+    """
+    Remove the entries of ``spectrum`` from all the active caches.
+    """
+    for analysis_cache in getattr(_active, 'stack', None) or ():
+        analysis_cache.evict(spectrum)
+
+
+def _spectrum_state(spectrum):
+    """
+    The objects whose identity must not change for a cached result of
+    ``spectrum`` to be reused. The WCS is keyed on its stored value and on
+    the spectral axis it is pending from, so that caching does not build the
+    lazy WCS of a `~specutils.Spectrum1D`.
+    """
+    return (spectrum, getattr(spectrum, 'data', None),
+            getattr(spectrum, 'mask', None),
+            getattr(spectrum, 'uncertainty', None),
+            getattr(spectrum, '_wcs', None),
+            getattr(spectrum, '_wcs_spectral_axis', None))
+
+
+def _region_key(region):
+    """
+    Hashable key made of the bounds of the sub-regions of ``region``.
+    """
+    if region is None:
+        return None
+
+    return tuple((float(lower.value), lower.unit, float(upper.value),
+                  upper.unit) for lower, upper in region._subregions)
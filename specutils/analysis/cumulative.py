@@ -0,0 +1,315 @@
+"""
+A cumulative-sum index over a spectrum, answering region integrals and
+moments with a constant number of lookups per region.
+"""
+
+import numpy as np
+import astropy.units as u
+
+from ..spectra.spectral_axis import SpectralAxis
+from .flux import _region_width, _variance
+
+
+__all__ = ['CumulativeIndex']
+
+
+class CumulativeIndex:
+    """
+    Prefix sums of the flux of a spectrum along its spectral axis.
+
+    The index holds the cumulative sums of ``flux * dx``,
+    ``variance * dx**2``, ``flux``, ``flux * x``, ``flux / uncertainty`` and
+    of the number of unmasked pixels, where ``x`` is the spectral axis and
+    ``dx`` the bin widths. The sum of any of these over a range of pixels is
+    the difference of two lookups, so the line flux, equivalent width,
+    centroid and S/N of a region are computed without extracting it. The
+    index is built once and can be reused for any number of regions.
+
+    Masked pixels are excluded from all the sums. Multi-dimensional flux
+    arrays are indexed along their last axis and queries return one value per
+    spectrum.
+
+    The index is usually attached to the spectrum with
+    `~specutils.Spectrum1D.build_cumulative_index`, in which case
+    `~specutils.analysis.line_flux`, `~specutils.analysis.equivalent_width`,
+    `~specutils.analysis.centroid` and `~specutils.analysis.snr` use it
+    automatically. It must be rebuilt if the flux, mask or uncertainty of the
+    spectrum are modified in place.
+
+    Parameters
+    ----------
+    spectrum : `~specutils.Spectrum1D`
+        The spectrum to index. Its spectral axis must be monotonic.
+    """
+    def __init__(self, spectrum):
+        spectral_axis = spectrum.spectral_axis
+        x = np.asarray(spectral_axis.value, dtype=float)
+        widths = np.abs(np.diff(spectral_axis.bin_edges.value))
+
+        flux = np.asarray(spectrum.flux.value, dtype=float)
+        good = np.ones(flux.shape, dtype=bool) if spectrum.mask is None \
+            else ~np.asarray(spectrum.mask, dtype=bool)
+        masked_flux = np.where(good, flux, 0.)
+
+        self._data = spectrum.data
+        self._mask = spectrum.mask
+        self._uncertainty = spectrum.uncertainty
+
+        self._n = x.size
+        self._x = x
+        self._widths = widths
+        self._edges = np.asarray(spectral_axis.bin_edges.value, dtype=float)
+        self._ascending = self._n < 2 or x[-1] > x[0]
+        self._spectral_unit = spectral_axis.unit
+
+        # A private spectral axis, whose monotonic index (or grid) is built
+        # once, so that the pixels of regions are located with a binary
+        # search per query.
+        self._spectral_axis = SpectralAxis(x * spectral_axis.unit)
+        self._spectral_axis._monotonic_index()
+        self._flux_unit = spectrum.flux.unit
+
+        self._flux = masked_flux
+        self._cum_flux = _prefix_sum(masked_flux)
+        self._cum_flux_x = _prefix_sum(masked_flux * x)
+        self._cum_flux_dx = _prefix_sum(masked_flux * widths)
+        self._cum_good = _prefix_sum(good.astype(float))
+
+        self._variance = None
+        self._cum_var_dx2 = None
+        self._cum_snr = None
+        self._snr_unit = None
+
+        uncertainty = spectrum.uncertainty
+        if uncertainty is not None:
+            variance = _variance(uncertainty)
+            if variance is not None:
+                self._variance = np.where(good, variance.value, 0.)
+                self._cum_var_dx2 = _prefix_sum(self._variance * widths**2)
+                self._variance_unit = variance.unit
+
+            ratio = spectrum.flux / uncertainty.quantity
+            self._cum_snr = _prefix_sum(np.where(good, ratio.value, 0.))
+            self._snr_unit = ratio.unit
+
+    def is_valid(self, spectrum):
+        """
+        Whether the index was built from the current flux, mask and
+        uncertainty objects of ``spectrum``.
+        """
+        return (spectrum.data is self._data and
+                spectrum.mask is self._mask and
+                spectrum.uncertainty is self._uncertainty)
+
+    def _pixel_bounds(self, region, merge=False):
+        """
+        Left (inclusive) and right (exclusive) pixel indices of the
+        sub-regions, the same as selected by
+        `~specutils.SpectralRegion.to_mask` and
+        `~specutils.manipulation.extract_region`. With ``merge``,
+        overlapping sub-regions are combined so that every pixel is counted
+        once.
+        """
+        if region is None:
+            return np.array([0]), np.array([self._n])
+
+        left, right = region._edge_indices(self._spectral_axis)
+
+        if merge and len(left) > 1:
+            order = np.argsort(left)
+            merged = [[left[order[0]], right[order[0]]]]
+            for lo, hi in zip(left[order[1:]], right[order[1:]]):
+                if lo <= merged[-1][1]:
+                    merged[-1][1] = max(merged[-1][1], hi)
+                else:
+                    merged.append([lo, hi])
+            left, right = np.array(merged).T
+
+        return left, right
+
+    def _range_sum(self, cumulative, left, right):
+        """
+        Sum ``cumulative`` over the pixel ranges, adding up the sub-regions.
+        """
+        return (cumulative[..., right] - cumulative[..., left]).sum(axis=-1)
+
+    def _edge_correction(self, values, left, right, power=1):
+        """
+        Difference between the sum of ``values * dx**power`` over the pixel
+        ranges with the bin widths of the extracted sub-spectra and with the
+        bin widths of the full spectrum. The outer bins of an extracted
+        sub-spectrum are extrapolated from its own pixels, so only the first
+        and last pixel of each range differ.
+        """
+        x, widths = self._x, self._widths
+        wide = right - left > 1
+        left, right = left[wide], right[wide]
+
+        left_dx = np.abs(x[left + 1] - x[left]) ** power - \
+            widths[left] ** power
+        right_dx = np.abs(x[right - 1] - x[right - 2]) ** power - \
+            widths[right - 1] ** power
+
+        return (values[..., left] * left_dx +
+                values[..., right - 1] * right_dx).sum(axis=-1)
+
+    def line_flux(self, region=None, fractional=False):
+        """
+        Integrated flux of the spectrum in ``region``.
+
+        Parameters
+        ----------
+        region : `~specutils.SpectralRegion`, optional
+            The region to integrate over. The whole spectrum if `None`.
+        fractional : bool, optional
+            If `False` (default), integrate over the pixels extracted by
+            `~specutils.manipulation.extract_region`, as
+            `~specutils.analysis.line_flux` does. If `True`, integrate exactly
+            between the region bounds, weighting the bins that are only
+            partially inside the region by the fraction of the bin width they
+            cover.
+
+        Returns
+        -------
+        flux : `~astropy.units.Quantity`
+            The integrated flux, with an ``uncertainty`` attribute if the
+            spectrum has a (standard deviation, variance or inverse variance)
+            uncertainty.
+        """
+        if fractional:
+            total, variance = self._fractional_sums(region)
+        else:
+            left, right = self._pixel_bounds(region)
+            total = self._range_sum(self._cum_flux_dx, left, right) + \
+                self._edge_correction(self._flux, left, right)
+
+            variance = None
+            if self._variance is not None:
+                variance = self._range_sum(self._cum_var_dx2, left, right) + \
+                    self._edge_correction(self._variance, left, right, 2)
+
+        line_flux = u.Quantity(total, self._flux_unit * self._spectral_unit)
+        line_flux.uncertainty = None
+
+        if variance is not None:
+            line_flux.uncertainty = np.sqrt(
+                u.Quantity(variance, self._variance_unit *
+                           self._spectral_unit**2))
+
+        return line_flux
+
+    def _fractional_sums(self, region):
+        """
+        Sums of ``flux * dx`` and ``variance * dx**2`` between the exact
+        region bounds, with partial outer bins.
+        """
+        if region is None:
+            total = self._cum_flux_dx[..., -1]
+            variance = None if self._variance is None else \
+                self._cum_var_dx2[..., -1]
+            return total, variance
+
+        is_pixel, lower, upper = region._bounds_arrays(self._spectral_unit)
+        if np.any(is_pixel):
+            raise ValueError("Fractional line fluxes require regions in "
+                             "spectral units.")
+
+        edges = self._edges if self._ascending else self._edges[::-1]
+        lower = np.clip(lower, edges[0], edges[-1])
+        upper = np.clip(upper, edges[0], edges[-1])
+
+        # Bins that contain the bounds, in ascending order.
+        first = np.clip(np.searchsorted(edges, lower, side='right') - 1,
+                        0, self._n - 1)
+        last = np.clip(np.searchsorted(edges, upper, side='left') - 1,
+                       0, self._n - 1)
+        widths = np.diff(edges)
+        first_frac = (edges[first + 1] - lower) / widths[first]
+        last_frac = (upper - edges[last]) / widths[last]
+        single = first == last
+        first_frac = np.where(single, (upper - lower) / widths[first],
+                              first_frac)
+        last_frac = np.where(single, 0., last_frac)
+
+        if not self._ascending:
+            first, last = self._n - 1 - first, self._n - 1 - last
+            inner_left, inner_right = last + 1, first
+        else:
+            inner_left, inner_right = first + 1, last
+
+        inner_right = np.maximum(inner_left, inner_right)
+
+        def partial(values, cumulative, power):
+            dx = self._widths ** power
+            return (self._range_sum(cumulative, inner_left, inner_right) +
+                    (values[..., first] * dx[first] * first_frac ** power +
+                     values[..., last] * dx[last] * last_frac ** power
+                     ).sum(axis=-1))
+
+        total = partial(self._flux, self._cum_flux_dx, 1)
+        variance = None if self._variance is None else \
+            partial(self._variance, self._cum_var_dx2, 2)
+
+        return total, variance
+
+    def equivalent_width(self, region=None, continuum=1):
+        """
+        Equivalent width of ``region``, as computed by
+        `~specutils.analysis.equivalent_width`.
+
+        Parameters
+        ----------
+        region : `~specutils.SpectralRegion`, optional
+            The region of the line. The whole spectrum if `None`.
+        continuum : ``1`` or `~astropy.units.Quantity`, optional
+            The continuum level, ``1`` in the flux unit by default.
+
+        Returns
+        -------
+        ew : `~astropy.units.Quantity`
+            The equivalent width, in the spectral axis unit.
+        """
+        if not isinstance(continuum, u.Quantity) and continuum == 1:
+            continuum = 1 * self._flux_unit
+
+        left, right = self._pixel_bounds(region)
+        dx = _region_width(self._x, left, right) * self._spectral_unit
+
+        ew = dx - self.line_flux(region) / continuum
+
+        return ew.to(self._spectral_unit)
+
+    def centroid(self, region=None):
+        """
+        Flux-weighted centroid of the pixels in ``region``, as computed by
+        `~specutils.analysis.centroid`.
+        """
+        left, right = self._pixel_bounds(region, merge=True)
+
+        return u.Quantity(self._range_sum(self._cum_flux_x, left, right) /
+                          self._range_sum(self._cum_flux, left, right),
+                          self._spectral_unit)
+
+    def snr(self, region=None):
+        """
+        Mean signal to noise ratio of the pixels in ``region``, as computed
+        by `~specutils.analysis.snr`.
+        """
+        if self._cum_snr is None:
+            raise ValueError("The indexed spectrum has no uncertainty.")
+
+        left, right = self._pixel_bounds(region, merge=True)
+
+        return u.Quantity(self._range_sum(self._cum_snr, left, right) /
+                          self._range_sum(self._cum_good, left, right),
+                          self._snr_unit)
+
+
+def _prefix_sum(values):
+    """
+    Cumulative sum along the last axis, with a leading zero so that the sum
+    of pixels ``[left, right)`` is ``result[..., right] - result[..., left]``.
+    """
+    result = np.zeros(values.shape[:-1] + (values.shape[-1] + 1,))
+    np.cumsum(values, axis=-1, out=result[..., 1:])
+    return result
@@ -6,11 +6,15 @@ import warnings
 from functools import wraps
 
 import numpy as np
+from astropy.modeling import Model
 from astropy.nddata import StdDevUncertainty, VarianceUncertainty, InverseVariance
 
 from .. import conf
-from ..manipulation import extract_region, LinearInterpolatedResampler
-from .utils import computation_wrapper
+from ..manipulation import extract_region
+from ..utils import QuantityModel
+from ..utils.dtype_utils import result_dtype, cast
+from .caching import cached
+from .utils import computation_wrapper, attached_index, region_edge_pixels
 import astropy.units as u
 from astropy.stats import mad_std
 from astropy.utils.exceptions import AstropyUserWarning
@@ -20,8 +24,7 @@ __all__ = ['line_flux', 'equivalent_width', 'is_continuum_below_threshold',
            'warn_continuum_below_threshold']
 
 
-def line_flux(spectrum, regions=None,
-              mask_interpolation=LinearInterpolatedResampler):
+def line_flux(spectrum, regions=None, mask_interpolation=None):
     """
     Computes the integrated flux in a spectrum or region of a spectrum.
 
@@ -37,27 +40,36 @@ def line_flux(spectrum, regions=None,
         Region within the spectrum to calculate the gaussian sigma width. If
         regions is `None`, computation is performed over entire spectrum.
 
-    mask_interpolation : `~specutils.manipulation.LinearInterpolatedResampler`
-        Interpolator class used to fill up the gaps in the spectrum's flux
-        array, when the spectrum mask is not None.
+    mask_interpolation : resampler class, optional
+        Resampler class (e.g.
+        `~specutils.manipulation.LinearInterpolatedResampler`) used to fill
+        up the masked pixels of a one dimensional spectrum before
+        integrating. By default, masked pixels are left out of the
+        integration and the widths of their bins are shared between the
+        nearest unmasked bins on either side.
 
     Returns
     -------
     flux : `~astropy.units.Quantity`
         Flux in the provided spectrum (or regions). Unit isthe ``spectrum``'s'
-        ``flux`` unit times ``spectral_axis`` unit.
+        ``flux`` unit times ``spectral_axis`` unit. Multi-dimensional fluxes
+        give one value per spectrum.
 
     Notes
     -----
     While the flux can be computed on any spectrum or region, it should be
     continuum-subtracted to compute actual line fluxes.
+
+    On a uniform spectral axis, sharing the bin widths of masked pixels is
+    the same as linearly interpolating the flux over them (and repeating the
+    outermost unmasked values past the ends).
     """
     return computation_wrapper(_compute_line_flux, spectrum, regions,
                                mask_interpolation=mask_interpolation)
 
 
 def equivalent_width(spectrum, continuum=1, regions=None,
-                     mask_interpolation=LinearInterpolatedResampler):
+                     mask_interpolation=None):
     """
     Computes the equivalent width of a region of the spectrum.
 
@@ -73,16 +85,20 @@ def equivalent_width(spectrum, continuum=1, regions=None,
         Region within the spectrum to calculate the gaussian sigma width. If
         regions is `None`, computation is performed over entire spectrum.
 
-    continuum : ``1`` or `~astropy.units.Quantity`, optional
+    continuum : ``1``, `~astropy.units.Quantity` or `~astropy.modeling.Model`, optional
         Value to assume is the continuum level.  For the special value ``1``
         (without units), ``1`` in whatever the units of the ``spectrum.flux``
         will be assumed, otherwise units are required and must be the same as
-        the ``spectrum.flux``.
+        the ``spectrum.flux``. An array that broadcasts with the flux (e.g.
+        one fitted continuum per spectrum) normalizes every pixel by its own
+        continuum level. A model (or model set, one per spectrum) is
+        evaluated on the spectral axis, models without units giving values in
+        the flux unit.
 
-    mask_interpolation : `~specutils.manipulation.LinearInterpolatedResampler`
-        Interpolator class used to fill up the gaps in the spectrum's flux
-        array after an excise operation to ensure the mask shape can always be
-        applied when the spectrum mask is not None.
+    mask_interpolation : resampler class, optional
+        Resampler class used to fill up the masked pixels before integrating,
+        see `~specutils.analysis.line_flux`. By default, masked pixels are
+        left out of the integration. Only supported with a scalar continuum.
 
     Returns
     -------
@@ -96,6 +112,9 @@ def equivalent_width(spectrum, continuum=1, regions=None,
     continuum-normalized to whatever ``continuum`` is before this function is
     called.
 
+    For a region with several sub-regions, the widths and line fluxes of all
+    the sub-regions are added up.
+
     """
 
     kwargs = dict(continuum=continuum)
@@ -103,9 +122,162 @@ def equivalent_width(spectrum, continuum=1, regions=None,
                                mask_interpolation=mask_interpolation, **kwargs)
 
 
-def _compute_line_flux(spectrum, regions=None,
-                       mask_interpolation=LinearInterpolatedResampler):
+def _compute_line_flux(spectrum, regions=None, mask_interpolation=None):
+    return cached(('line_flux', mask_interpolation), spectrum, regions,
+                  lambda: _integrate_line_flux(spectrum, regions,
+                                               mask_interpolation))
+
+
+def _integrate_line_flux(spectrum, regions=None, mask_interpolation=None):
+
+    index = attached_index(spectrum)
+    if index is not None and spectrum.mask is None:
+        return index.line_flux(regions)
+
+    if mask_interpolation is not None and spectrum.mask is not None:
+        return _interpolated_line_flux(spectrum, regions, mask_interpolation)
+
+    bins = _region_bins(spectrum, regions)
+    line_flux = u.Quantity(_integrate(spectrum.flux, bins, spectrum.mask))
+    line_flux.uncertainty = None
+
+    if spectrum.uncertainty is not None:
+        variance_q = _variance(spectrum.uncertainty)
+        if variance_q is not None:
+            line_flux.uncertainty = np.sqrt(
+                _integrate(variance_q, bins, spectrum.mask, power=2))
+
+    # TODO: we may want to consider converting to erg / cm^2 / sec by default
+    return line_flux
+
+
+def _region_bins(spectrum, regions=None):
+    """
+    The pixel ranges of the sub-regions of ``regions`` (the whole spectrum if
+    `None`), with the widths of their bins, as ``(left, right, dx)`` tuples.
+    Shared by the line flux and equivalent width computations.
+    """
+    def compute():
+        spectral_axis = spectrum.spectral_axis
+        mask = spectrum.mask
+
+        if regions is None:
+            return [(0, spectral_axis.size,
+                     _bin_widths(spectral_axis.bin_edges, mask))]
+
+        bins = []
+        for left, right in zip(*region_edge_pixels(spectrum, regions)):
+            bin_edges = spectral_axis._edges_from_centers(
+                spectral_axis.value[left:right], spectral_axis.unit)
+            region_mask = None if mask is None else mask[..., left:right]
+            bins.append((left, right, _bin_widths(bin_edges, region_mask)))
+
+        return bins
+
+    return cached('region_bins', spectrum, regions, compute)
+
+
+def _region_width(spectral_axis, left, right):
+    """
+    The total width of the pixel ranges ``left`` (inclusive) to ``right``
+    (exclusive) of the sub-regions, from their first to their last spectral
+    axis value, as used for the equivalent width. Empty ranges have no width.
+    """
+    left, right = np.atleast_1d(left), np.atleast_1d(right)
+    nonempty = right > left
+
+    return np.abs(spectral_axis[right[nonempty] - 1] -
+                  spectral_axis[left[nonempty]]).sum()
+
+
+def _integrate(values, bins, mask=None, power=1):
+    """
+    Sum of ``values * dx**power`` over the pixel ranges of ``bins`` (see
+    `_region_bins`), leaving out the masked pixels. Sub-regions are
+    integrated separately and added up. With the ``'preserve'`` type
+    policy, the bin widths are cast to the type of ``values``.
+    """
+    dtype = result_dtype(values)
+
+    total = 0
+    for left, right, dx in bins:
+        region_mask = None if mask is None else mask[..., left:right]
+        total = total + _masked_sum(
+            values[..., left:right] * cast(dx, dtype)**power, region_mask)
+
+    return total
+
+
+def _bin_widths(bin_edges, mask=None):
+    """
+    Widths of the bins with edges ``bin_edges``.  If a ``mask`` is given
+    (with the bins along its last axis), the width of each run of masked bins
+    is split evenly between the nearest unmasked bins on either side, or
+    given entirely to the unmasked bin next to it at the ends.  The widths of
+    masked bins are meaningless.
+    """
+    if mask is None:
+        return np.abs(np.diff(bin_edges))
+
+    n = mask.shape[-1]
+    pixels = np.arange(n)
+
+    # The nearest unmasked bin strictly before and after each bin.
+    previous = np.maximum.accumulate(np.where(mask, -1, pixels), axis=-1)
+    previous = np.concatenate([np.full(mask.shape[:-1] + (1,), -1),
+                               previous[..., :-1]], axis=-1)
+    following = np.minimum.accumulate(np.where(mask, n, pixels)[..., ::-1],
+                                      axis=-1)[..., ::-1]
+    following = np.concatenate([following[..., 1:],
+                                np.full(mask.shape[:-1] + (1,), n)], axis=-1)
+
+    lower = np.where(previous < 0, bin_edges[0],
+                     (bin_edges[previous + 1] + bin_edges[pixels]) / 2)
+    upper = np.where(following >= n, bin_edges[-1],
+                     (bin_edges[pixels + 1] +
+                      bin_edges[np.minimum(following, n - 1)]) / 2)
+
+    return np.abs(upper - lower)
+
+
+def _masked_sum(values, mask=None):
+    """
+    Sum of ``values`` along the last axis, leaving out the masked elements.
+    The sum is NaN where all the elements are masked.
+    """
+    if mask is None:
+        return np.sum(values, axis=-1)
+
+    masked = np.ma.masked_array(values.value, mask=mask).sum(axis=-1)
+
+    return u.Quantity(np.ma.filled(masked, np.nan), values.unit)
+
+
+def _variance(uncertainty):
+    """
+    The variance of ``uncertainty`` as a `~astropy.units.Quantity`, or `None`
+    (with a warning) for uncertainty types that are not supported.
+    """
+    if isinstance(uncertainty, StdDevUncertainty):
+        return uncertainty.quantity ** 2
+    elif isinstance(uncertainty, VarianceUncertainty):
+        return uncertainty.quantity
+    elif isinstance(uncertainty, InverseVariance):
+        return 1 / uncertainty.quantity
+
+    message = ('Uncertainty type "{}" was not recognized by line_flux.  '
+               'Proceeding without uncertainty in result.').format(
+                   uncertainty.uncertainty_type)
+    warnings.warn(message, AstropyUserWarning)
+
+    return None
 
+
+def _interpolated_line_flux(spectrum, regions, mask_interpolation):
+    """
+    Line flux of a masked spectrum, with the masked pixels filled by
+    resampling the spectrum onto its own spectral axis.
+    """
     if regions is not None:
         calc_spectrum = extract_region(spectrum, regions)
     else:
@@ -113,71 +285,96 @@ def _compute_line_flux(spectrum, regions=None,
 
     # Average dispersion in the line region
     avg_dx = (np.abs(np.diff(calc_spectrum.spectral_axis.bin_edges)))
-    line_flux = np.sum(calc_spectrum.flux * avg_dx)
 
-    line_flux.uncertainty = None
-
-    # Account for the existence of a mask.
-    if hasattr(calc_spectrum, 'mask') and calc_spectrum.mask is not None:
-        # For now, we interpolate over the masked values. A better solution
-        # would be to account for the masked values when computing the dispersion.
-        interpolator = mask_interpolation()
-        sp = interpolator(calc_spectrum, calc_spectrum.spectral_axis)
-        flux = sp.flux
-    else:
-        flux = calc_spectrum.flux
-
-    line_flux = np.sum(flux * avg_dx)
+    interpolator = mask_interpolation()
+    sp = interpolator(calc_spectrum, calc_spectrum.spectral_axis)
 
+    line_flux = np.sum(sp.flux * avg_dx)
     line_flux.uncertainty = None
 
     if calc_spectrum.uncertainty is not None:
         # Can't handle masks via interpolation here, since interpolators
         # only work with the flux array.
-        if isinstance(calc_spectrum.uncertainty, StdDevUncertainty):
-            variance_q = calc_spectrum.uncertainty.quantity ** 2
-        elif isinstance(calc_spectrum.uncertainty, VarianceUncertainty):
-            variance_q = calc_spectrum.uncertainty.quantity
-        elif isinstance(calc_spectrum.uncertainty, InverseVariance):
-            variance_q = 1/calc_spectrum.uncertainty.quantity
-        else:
-            message = ('Uncertainty type "{}" was not recognized by line_flux.  '
-                       'Proceeding without uncertainty in result.').format(calc_spectrum.uncertainty.uncertainty_type)
-            warnings.warn(message, AstropyUserWarning)
-            variance_q = None
+        variance_q = _variance(calc_spectrum.uncertainty)
 
         if variance_q is not None:
             line_flux.uncertainty = np.sqrt(
                 np.sum(variance_q * avg_dx**2))
 
-    # TODO: we may want to consider converting to erg / cm^2 / sec by default
     return line_flux
 
 
 def _compute_equivalent_width(spectrum, continuum=1, regions=None,
-                              mask_interpolation=LinearInterpolatedResampler):
+                              mask_interpolation=None):
+    continuum = _continuum_values(spectrum, continuum)
+    spectral_axis = spectrum.spectral_axis
+
+    if continuum.ndim == 0:
+        index = attached_index(spectrum)
+        if index is not None and spectrum.mask is None:
+            return index.equivalent_width(regions, continuum=continuum)
+
     if regions is not None:
-        calc_spectrum = extract_region(spectrum, regions)
+        left, right = region_edge_pixels(spectrum, regions)
     else:
-        calc_spectrum = spectrum
+        left, right = 0, spectral_axis.size
 
-    if continuum == 1:
-        continuum = 1*calc_spectrum.flux.unit
+    dx = u.Quantity(_region_width(spectral_axis, left, right))
 
-    spectral_axis = calc_spectrum.spectral_axis
+    if continuum.ndim == 0:
+        line_flux = _compute_line_flux(spectrum, regions,
+                                       mask_interpolation=mask_interpolation)
 
-    dx = (np.abs(spectral_axis[-1] - spectral_axis[0]))
+        # Calculate equivalent width
+        ew = dx - (line_flux / continuum)
+    else:
+        if mask_interpolation is not None and spectrum.mask is not None:
+            raise ValueError("mask_interpolation only supports a scalar "
+                             "continuum.")
 
-    line_flux = _compute_line_flux(spectrum, regions,
-                                   mask_interpolation=mask_interpolation)
+        try:
+            continuum = np.broadcast_to(continuum, spectrum.flux.shape,
+                                        subok=True)
+        except ValueError:
+            raise ValueError("The continuum of shape {} does not broadcast "
+                             "with the flux of shape {}.".format(
+                                 continuum.shape, spectrum.flux.shape))
 
-    # Calculate equivalent width
-    ew = dx - (line_flux / continuum)
+        # All the spectra are normalized by their own continuum and
+        # integrated together.
+        ew = dx - _integrate(spectrum.flux / continuum,
+                             _region_bins(spectrum, regions), spectrum.mask)
 
-    return ew.to(calc_spectrum.spectral_axis.unit)
+    return ew.to(spectral_axis.unit)
 
 
-def is_continuum_below_threshold(spectrum, threshold=0.01):
+def _continuum_values(spectrum, continuum):
+    """
+    The continuum as a `~astropy.units.Quantity`, evaluating it on the
+    spectral axis if it is a model.
+    """
+    if isinstance(continuum, (Model, QuantityModel)):
+        spectral_axis = u.Quantity(spectrum.spectral_axis)
+        kwargs = {}
+        if len(getattr(continuum, 'unitless_model', continuum)) > 1:
+            kwargs['model_set_axis'] = False
+
+        # Models without units are taken to be in the units of the spectrum.
+        if isinstance(continuum, Model) and all(
+                getattr(continuum, name).unit is None
+                for name in continuum.param_names):
+            return u.Quantity(continuum(spectral_axis.value, **kwargs),
+                              spectrum.flux.unit)
+
+        return continuum(spectral_axis, **kwargs)
+
+    if not isinstance(continuum, u.Quantity) and np.all(continuum == 1):
+        return u.Quantity(np.ones(np.shape(continuum)), spectrum.flux.unit)
+
+    return u.Quantity(continuum)
+
+
+def is_continuum_below_threshold(spectrum, threshold=0.01, per_spectrum=False):
     """
     Determine if the baseline of this spectrum is less than a threshold.
     I.e., an estimate of whether or not the continuum has been subtracted.
@@ -193,6 +390,11 @@ def is_continuum_below_threshold(spectrum, threshold=0.01):
     is compared to the median of the flux divided by the
     `~astropy.stats.mad_std`.
 
+    The statistic is computed once per spectrum and stored on it, so that
+    repeated checks (e.g. by the line finding functions) are free. It is
+    recomputed when the flux, mask or uncertainty of the spectrum are
+    replaced, but not when they are modified in place.
+
     Parameters
     ----------
     spectrum : `~specutils.spectra.spectrum1d.Spectrum1D`
@@ -202,34 +404,107 @@ def is_continuum_below_threshold(spectrum, threshold=0.01):
         The tolerance on the quantification to confirm the continuum is
         near zero.
 
+    per_spectrum : bool, optional
+        If `True`, check every spectrum of a multi-dimensional flux
+        separately, computing the statistics of all of them at once along
+        the spectral axis. By default, all the pixels are checked together.
+
     Returns
     -------
-    is_continuum_below_threshold: bool
-        Return True if the continuum of the spectrum is below the threshold, False otherwise.
+    is_continuum_below_threshold: bool or `~numpy.ndarray`
+        Return True if the continuum of the spectrum is below the threshold,
+        False otherwise. One value per spectrum with ``per_spectrum``.
 
     """
 
-    flux = spectrum.flux
-    uncertainty = spectrum.uncertainty if hasattr(spectrum, 'uncertainty') else None
-
-    # Apply the mask if it exists.
-    if hasattr(spectrum, 'mask') and spectrum.mask is not None:
-        flux = flux[~spectrum.mask]
-        uncertainty = uncertainty[~spectrum.mask] if uncertainty else uncertainty
+    uncertainty = getattr(spectrum, 'uncertainty', None)
 
     # If the threshold has units then the assumption is that we want
     # to compare the median of the flux regardless of the
     # existence of the uncertainty.
     if hasattr(threshold, 'unit') and not threshold.unit == u.dimensionless_unscaled:
-        return np.median(flux) < threshold
+        kind = 'median'
 
     # If threshold does not have a unit, ie it is not a quantity, then
     # we are going to calculate based on the S/N if the uncertainty
     # exists.
-    if uncertainty and uncertainty.uncertainty_type != 'std':
-        return np.median(flux / uncertainty.quantity) < threshold
+    elif uncertainty and uncertainty.uncertainty_type != 'std':
+        kind = 'snr'
     else:
-        return np.median(flux) / mad_std(flux) < threshold
+        kind = 'mad'
+
+    return _continuum_statistic(spectrum, kind, per_spectrum) < threshold
+
+
+def _continuum_statistic(spectrum, kind, per_spectrum=False):
+    """
+    The statistic of ``spectrum`` compared to the threshold by
+    `is_continuum_below_threshold`, stored on the spectrum along with the
+    flux, mask and uncertainty it was computed from and a fingerprint of
+    their contents, so that it is computed again when they are replaced or
+    modified in place.
+    """
+    data = getattr(spectrum, 'data', spectrum.flux)
+    mask = getattr(spectrum, 'mask', None)
+    uncertainty = getattr(spectrum, 'uncertainty', None)
+    objects = (data, mask, uncertainty)
+    contents = tuple(_fingerprint(array) for array in
+                     (data, mask, getattr(uncertainty, 'array', None)))
+
+    stored = getattr(spectrum, '_continuum_statistics', None)
+    if stored is None or any(a is not b for a, b in zip(stored[0], objects)) \
+            or stored[1] != contents:
+        stored = (objects, contents, {})
+        spectrum._continuum_statistics = stored
+
+    key = (kind, per_spectrum)
+    if key not in stored[2]:
+        stored[2][key] = _compute_continuum_statistic(spectrum, kind,
+                                                      per_spectrum)
+
+    return stored[2][key]
+
+
+def _fingerprint(array, samples=64):
+    """
+    A cheap fingerprint of the contents of ``array``: its address, shape and
+    about ``samples`` values taken at regular strides, which detects most
+    in-place modifications without reading the whole array.
+    """
+    if array is None:
+        return None
+
+    array = np.asarray(array)
+    indices = np.arange(0, array.size, max(1, array.size // samples))
+
+    return (array.__array_interface__['data'][0], array.shape,
+            array.flat[indices].tobytes())
+
+
+def _compute_continuum_statistic(spectrum, kind, per_spectrum=False):
+    """
+    The median of the flux (``'median'``), of the flux over its uncertainty
+    (``'snr'``) or of the flux over its `~astropy.stats.mad_std` (``'mad'``),
+    along the spectral axis with ``per_spectrum`` or over all the pixels.
+    Masked pixels are replaced by NaN and ignored.
+    """
+    axis = -1 if per_spectrum else None
+    flux = spectrum.flux
+
+    if kind == 'snr':
+        flux = flux / spectrum.uncertainty.quantity
+
+    values = np.asarray(flux.value, dtype=float)
+    mask = getattr(spectrum, 'mask', None)
+    if mask is not None:
+        values = np.where(mask, np.nan, values)
+
+    median = np.nanmedian(values, axis=axis)
+
+    if kind == 'mad':
+        return median / mad_std(values, axis=axis, ignore_nan=True)
+
+    return u.Quantity(median, flux.unit)
 
 
 def warn_continuum_below_threshold(threshold=0.01):
@@ -6,7 +6,8 @@ spectral features.
 import numpy as np
 
 from ..spectra import SpectralRegion
-from ..manipulation import extract_region
+from .caching import cached
+from .utils import region_selection, attached_index
 
 
 __all__ = ['centroid']
@@ -75,20 +76,23 @@ def _centroid_single_region(spectrum, region=None):
 
     """
 
-    if region is not None:
-        calc_spectrum = extract_region(spectrum, region)
-    else:
-        calc_spectrum = spectrum
+    return cached('centroid', spectrum, region,
+                  lambda: _compute_centroid(spectrum, region))
+
+
+def _compute_centroid(spectrum, region=None):
+    index = attached_index(spectrum)
+    if index is not None:
+        return index.centroid(region)
+
+    selection = region_selection(spectrum, region)
+    flux = spectrum.flux[..., selection]
+    dispersion = spectrum.spectral_axis[selection].quantity
 
     if hasattr(spectrum, 'mask') and spectrum.mask is not None:
-        flux = calc_spectrum.flux[~calc_spectrum.mask]
-        dispersion = calc_spectrum.spectral_axis[~calc_spectrum.mask].quantity
-    else:
-        flux = calc_spectrum.flux
-        dispersion = calc_spectrum.spectral_axis.quantity
-
-    if len(flux.shape) > 1:
-        dispersion = np.tile(dispersion, [flux.shape[0], 1])
+        mask = spectrum.mask[..., selection]
+        flux = flux[~mask]
+        dispersion = dispersion[~mask]
 
     # the axis=-1 will enable this to run on single-dispersion, single-flux
     # and single-dispersion, multiple-flux
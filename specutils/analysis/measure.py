@@ -0,0 +1,225 @@
+"""
+A module to compute several analysis quantities of many regions (and
+spectra) at once.
+"""
+
+import numpy as np
+import astropy.units as u
+from astropy.stats.funcs import gaussian_sigma_to_fwhm
+from astropy.table import QTable, vstack
+
+from ..spectra import Spectrum1D, SpectralRegion
+from .cumulative import CumulativeIndex
+from .flux import _compute_line_flux, _region_width
+from .utils import attached_index, region_selection
+from .width import _compute_fwhm_values
+
+
+__all__ = ['measure']
+
+_QUANTITIES = ('line_flux', 'equivalent_width', 'centroid',
+               'gaussian_sigma_width', 'gaussian_fwhm', 'fwhm', 'snr')
+
+
+def measure(spectrum, regions=None, quantities=None, continuum=1):
+    """
+    Compute several analysis quantities over a list of regions of a spectrum
+    in one pass.
+
+    Each region is located once and the intermediate sums and moments are
+    shared between the quantities: the line flux, equivalent width, centroid
+    and S/N are answered from a `~specutils.analysis.CumulativeIndex` of the
+    spectrum (the attached one, if any), and the second moment reuses the
+    centroid. The values are the same as those of the individual functions.
+
+    Parameters
+    ----------
+    spectrum : `~specutils.Spectrum1D` or `~specutils.SpectrumCollection`
+        The spectrum to measure. Multi-dimensional flux arrays are measured
+        along their last axis, one spectrum at a time. The spectra of a
+        collection are measured with one index per distinct spectral axis.
+
+    regions : `~specutils.SpectralRegion` or list of `~specutils.SpectralRegion`
+        The regions to measure. If `None`, the whole spectrum is measured.
+
+    quantities : list of str, optional
+        The quantities to compute, any of ``'line_flux'``,
+        ``'equivalent_width'``, ``'centroid'``, ``'gaussian_sigma_width'``,
+        ``'gaussian_fwhm'``, ``'fwhm'`` and ``'snr'`` (see the functions of the
+        same names). Defaults to all of them, leaving out ``'snr'`` if the
+        spectrum has no uncertainty.
+
+    continuum : ``1`` or `~astropy.units.Quantity`, optional
+        The continuum level for the equivalent width, see
+        `~specutils.analysis.equivalent_width`.
+
+    Returns
+    -------
+    table : `~astropy.table.QTable`
+        Table with one row per spectrum and region, ordered by spectrum and
+        then by region. It has a ``region_index`` column (and a
+        ``spectrum_index`` column for multi-dimensional fluxes) followed by
+        one column per quantity, plus a ``line_flux_uncertainty`` column if
+        the line flux has an uncertainty.
+    """
+    has_uncertainty = spectrum.uncertainty is not None
+
+    if quantities is None:
+        quantities = [q for q in _QUANTITIES if q != 'snr' or has_uncertainty]
+
+    unknown = set(quantities) - set(_QUANTITIES)
+    if unknown:
+        raise ValueError("Unknown quantities {}, must be in {}.".format(
+            sorted(unknown), _QUANTITIES))
+
+    if 'snr' in quantities and not has_uncertainty:
+        raise ValueError("The spectrum must have an uncertainty to compute "
+                         "the S/N.")
+
+    if regions is None or isinstance(regions, SpectralRegion):
+        regions = [regions]
+
+    if spectrum.spectral_axis.ndim > 1:
+        return _measure_collection(spectrum, regions, quantities, continuum)
+
+    index = attached_index(spectrum)
+    if index is None:
+        index = CumulativeIndex(spectrum)
+
+    n_spectra = int(np.prod(spectrum.flux.shape[:-1]))
+    columns = {}
+
+    for region in regions:
+        values = _measure_region(spectrum, index, region, quantities,
+                                 continuum)
+        for name, value in values.items():
+            columns.setdefault(name, []).append(
+                np.broadcast_to(value, spectrum.flux.shape[:-1],
+                                subok=True).ravel())
+
+    table = QTable()
+    if spectrum.flux.ndim > 1:
+        table['spectrum_index'] = np.repeat(np.arange(n_spectra),
+                                            len(regions))
+    table['region_index'] = np.tile(np.arange(len(regions)), n_spectra)
+
+    for name, values in columns.items():
+        # Regions vary fastest along the rows.
+        table[name] = u.Quantity(values).T.ravel()
+
+    return table
+
+
+def _measure_collection(spectrum, regions, quantities, continuum):
+    """
+    Measure the spectra of a collection, grouping them by spectral axis so
+    that one index is built per distinct axis.
+    """
+    flux = spectrum.flux
+    n_pixels = flux.shape[-1]
+    spectral_axis = spectrum.spectral_axis
+
+    grids = np.broadcast_to(spectral_axis.value, flux.shape)
+    unique, inverse = np.unique(grids.reshape(-1, n_pixels), axis=0,
+                                return_inverse=True)
+
+    flux = flux.reshape(-1, n_pixels)
+    mask = spectrum.mask
+    if mask is not None:
+        mask = np.broadcast_to(mask, spectrum.flux.shape).reshape(
+            -1, n_pixels)
+    uncertainty = spectrum.uncertainty
+
+    tables = []
+    for i, grid in enumerate(unique):
+        rows = np.flatnonzero(inverse.ravel() == i)
+
+        group_uncertainty = None
+        if uncertainty is not None:
+            group_uncertainty = uncertainty.__class__(
+                np.broadcast_to(uncertainty.array, spectrum.flux.shape)
+                .reshape(-1, n_pixels)[rows], unit=uncertainty.unit)
+
+        group = Spectrum1D(spectral_axis=u.Quantity(grid, spectral_axis.unit),
+                           flux=flux[rows],
+                           mask=None if mask is None else mask[rows],
+                           uncertainty=group_uncertainty)
+
+        table = measure(group, regions, quantities, continuum)
+        table['spectrum_index'] = rows[table['spectrum_index']]
+        tables.append(table)
+
+    table = vstack(tables)
+    table.sort(['spectrum_index', 'region_index'])
+
+    return table
+
+
+def _measure_region(spectrum, index, region, quantities, continuum):
+    """
+    Compute ``quantities`` for one region, sharing the intermediate results.
+    """
+    values = {}
+
+    if 'line_flux' in quantities or 'equivalent_width' in quantities:
+        if spectrum.mask is not None:
+            line_flux = _compute_line_flux(spectrum, region)
+        else:
+            line_flux = index.line_flux(region)
+
+        if 'line_flux' in quantities:
+            values['line_flux'] = line_flux
+            if line_flux.uncertainty is not None:
+                values['line_flux_uncertainty'] = line_flux.uncertainty
+
+        if 'equivalent_width' in quantities:
+            if not isinstance(continuum, u.Quantity) and continuum == 1:
+                continuum = 1 * spectrum.flux.unit
+
+            left, right = index._pixel_bounds(region)
+            spectral_axis = spectrum.spectral_axis
+            dx = _region_width(spectral_axis, left, right)
+            ew = u.Quantity(dx) - line_flux / continuum
+            values['equivalent_width'] = ew.to(spectral_axis.unit)
+
+    if 'snr' in quantities:
+        values['snr'] = index.snr(region)
+
+    widths = {'gaussian_sigma_width', 'gaussian_fwhm', 'fwhm'}
+    if 'centroid' in quantities or widths.intersection(quantities):
+        centroid = index.centroid(region)
+
+        if 'centroid' in quantities:
+            values['centroid'] = centroid
+
+    if widths.intersection(quantities):
+        selection = region_selection(spectrum, region)
+        flux = spectrum.flux[..., selection]
+        spectral_axis = u.Quantity(spectrum.spectral_axis[selection])
+
+        if 'gaussian_sigma_width' in quantities or \
+                'gaussian_fwhm' in quantities:
+            weights = flux
+            if spectrum.mask is not None:
+                weights = np.where(spectrum.mask[..., selection], 0, flux)
+
+            dx = spectral_axis - centroid[..., np.newaxis]
+            sigma = np.sqrt(np.sum(dx * dx * weights, axis=-1) /
+                            np.sum(weights, axis=-1))
+
+            if 'gaussian_sigma_width' in quantities:
+                values['gaussian_sigma_width'] = sigma
+            if 'gaussian_fwhm' in quantities:
+                values['gaussian_fwhm'] = sigma * gaussian_sigma_to_fwhm
+
+        if 'fwhm' in quantities:
+            values['fwhm'] = _compute_fwhm_values(flux, spectral_axis)
+
+    # Keep the requested order, with the uncertainty next to the line flux.
+    ordered = {}
+    for name in quantities:
+        ordered[name] = values[name]
+        if name == 'line_flux' and 'line_flux_uncertainty' in values:
+            ordered['line_flux_uncertainty'] = values['line_flux_uncertainty']
+
+    return ordered
@@ -0,0 +1,153 @@
+"""
+A module for computing the moment maps of spectral cubes.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import astropy.units as u
+
+from .utils import region_selection
+from ..utils.dtype_utils import result_dtype
+
+
+__all__ = ['moment_maps']
+
+
+def moment_maps(spectrum, region=None, orders=(0, 1, 2), chunk_size=None,
+                n_threads=None, dtype=None):
+    """
+    Compute the moment maps of a multi-dimensional spectrum, such as a
+    spectral cube, in a single pass over its flux.
+
+    The spectra are processed in chunks of rows. Each chunk is read once and
+    all the requested moments are computed from it, with the sums along the
+    spectral axis done as matrix products, so that the spectral axis is never
+    broadcast to the size of the flux and only chunk-sized temporaries are
+    allocated.
+
+    Parameters
+    ----------
+    spectrum : `~specutils.Spectrum1D`
+        The spectrum, with the spectral axis as the last axis of its flux.
+
+    region : `~specutils.SpectralRegion`, optional
+        The region to compute the moments over. The whole spectrum if `None`.
+
+    orders : sequence of int, optional
+        The moments to compute, any of:
+
+        * ``0``: the integrated flux, ``sum(flux * dx)``, with ``dx`` the bin
+          widths of the spectral axis.
+        * ``1``: the flux-weighted centroid, as computed by
+          `~specutils.analysis.centroid`.
+        * ``2``: the flux-weighted standard deviation about the centroid, as
+          computed by `~specutils.analysis.gaussian_sigma_width`.
+
+    chunk_size : int, optional
+        Number of spectra to process at a time. By default all of them, or
+        one chunk per thread. Smaller chunks bound the memory used, so that
+        large (e.g. memory-mapped) flux arrays can be processed.
+
+    n_threads : int, optional
+        Number of threads to process the chunks with. The sums release the
+        GIL, so chunks are processed in parallel. By default a single thread
+        is used.
+
+    dtype : `~numpy.dtype`, optional
+        Floating point type the chunks are processed and the maps returned
+        in. By default it follows ``specutils.conf.dtype_policy``, with
+        float64 computations for the ``'promote'`` policy.
+
+    Returns
+    -------
+    maps : dict
+        The map of each order, as a `~astropy.units.Quantity` with the shape
+        of the non-spectral dimensions of the flux.
+
+    Notes
+    -----
+    Masked pixels are left out of all the moments.
+    """
+    orders = tuple(dict.fromkeys(orders))
+    if not set(orders) <= {0, 1, 2}:
+        raise ValueError("Moment orders must be 0, 1 or 2, got {}.".format(
+            orders))
+
+    if chunk_size is not None and chunk_size < 1:
+        raise ValueError("chunk_size must be a positive integer.")
+
+    dtype = result_dtype(spectrum.flux, dtype=dtype)
+    if dtype is None:
+        dtype = np.dtype(float)
+
+    spectral_axis = spectrum.spectral_axis
+    selection = region_selection(spectrum, region)
+    x = np.asarray(spectral_axis.value, dtype=dtype)[selection]
+    dx = np.abs(np.diff(spectral_axis.bin_edges.value))[selection].astype(
+        dtype)
+
+    # Views of the rows of the flux and mask, so that only the selected
+    # pixels of one chunk are read at a time.
+    shape = spectrum.flux.shape
+    flux = spectrum.flux.reshape(-1, shape[-1])
+    mask = spectrum.mask
+    if mask is not None:
+        mask = np.broadcast_to(mask, shape).reshape(-1, shape[-1])
+
+    n_spectra = len(flux)
+    if chunk_size is None:
+        chunk_size = -(-n_spectra // (n_threads or 1))
+    chunk_size = max(chunk_size, 1)
+
+    maps = {order: np.empty(n_spectra, dtype=dtype) for order in orders}
+
+    def process(start):
+        rows = slice(start, start + chunk_size)
+        values = np.asarray(flux[rows][:, selection].value, dtype=dtype)
+        if mask is not None:
+            values = np.where(mask[rows][:, selection], dtype.type(0), values)
+
+        for order, value in _moments(values, x, dx, orders).items():
+            maps[order][rows] = value
+
+    starts = range(0, n_spectra, chunk_size)
+    if n_threads is not None and n_threads > 1:
+        with ThreadPoolExecutor(n_threads) as executor:
+            list(executor.map(process, starts))
+    else:
+        for start in starts:
+            process(start)
+
+    units = {0: spectrum.flux.unit * spectral_axis.unit,
+             1: spectral_axis.unit,
+             2: spectral_axis.unit}
+
+    return {order: u.Quantity(maps[order].reshape(shape[:-1]), units[order],
+                              copy=False)
+            for order in orders}
+
+
+def _moments(flux, x, dx, orders):
+    """
+    Moments of order ``orders`` of the rows of the 2-D ``flux`` array, with
+    masked pixels set to zero.
+    """
+    moments = {}
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        if 0 in orders:
+            moments[0] = flux @ dx
+
+        if 1 in orders or 2 in orders:
+            total = flux.sum(axis=-1)
+            centroid = (flux @ x) / total
+            moments[1] = centroid
+
+            if 2 in orders:
+                offset = x - centroid[:, np.newaxis]
+                offset *= offset
+                offset *= flux
+                moments[2] = np.sqrt(offset.sum(axis=-1) / total)
+
+    return {order: moments[order] for order in orders}
@@ -0,0 +1,311 @@
+"""
+A module for measuring bandpass spectral indices, such as the Lick indices,
+of many spectra at once.
+"""
+
+import numpy as np
+import astropy.units as u
+from astropy.table import QTable
+
+from ..spectra.spectral_axis import SpectralAxis
+
+
+__all__ = ['SpectralIndexWeights', 'spectral_indices']
+
+_BOUND_COLUMNS = ('blue_start', 'blue_end', 'band_start', 'band_end',
+                  'red_start', 'red_end')
+
+
+class SpectralIndexWeights:
+    """
+    Fractional-pixel weights of a set of spectral index definitions on one
+    spectral axis.
+
+    Every index is defined by a blue and a red pseudo-continuum passband and
+    a feature passband. The weight of a pixel in a passband is the width of
+    its bin that falls inside the passband, so passbands that start or end
+    inside a bin only count the covered fraction of it. The continuum weights
+    of all the indices are stacked into matrices, so that the continuum
+    levels of every index of every spectrum are computed with matrix
+    products, and the feature integrals with one vectorized sum over the
+    pixels of all the feature passbands.
+
+    The weights only depend on the definitions and the spectral axis, and
+    can be reused with `~specutils.analysis.spectral_indices` for any number
+    of spectra that share it.
+
+    Parameters
+    ----------
+    definitions : `~astropy.table.Table` or list of dict
+        The index definitions, with a ``name`` column and the
+        ``blue_start``, ``blue_end``, ``band_start``, ``band_end``,
+        ``red_start`` and ``red_end`` passband limits, as spectral
+        `~astropy.units.Quantity` columns or in Angstrom. An optional
+        ``unit`` column gives the unit of each index, ``'A'`` for an
+        equivalent width (the default) or ``'mag'`` for a magnitude.
+
+    spectral_axis : `~astropy.units.Quantity`
+        The 1-D spectral axis of the spectra to measure, in any spectral
+        unit.
+    """
+    def __init__(self, definitions, spectral_axis):
+        definitions = _definition_table(definitions)
+
+        self.definitions = definitions
+        self.names = [str(name) for name in definitions['name']]
+        self.spectral_axis = spectral_axis
+
+        if 'unit' in definitions.colnames:
+            units = [str(unit).strip().lower() for unit in definitions['unit']]
+        else:
+            units = ['a'] * len(definitions)
+
+        unknown = set(units) - {'a', 'aa', 'angstrom', 'mag'}
+        if unknown:
+            raise ValueError("Index units must be 'A' or 'mag', got "
+                             "{}.".format(sorted(unknown)))
+        self._magnitude = np.array([unit == 'mag' for unit in units])
+
+        bounds = {}
+        for name in _BOUND_COLUMNS:
+            column = definitions[name]
+            if getattr(column, 'unit', None) is None:
+                column = u.Quantity(column, u.AA)
+            bounds[name] = u.Quantity(column).to_value(u.AA, u.spectral())
+
+        centers = spectral_axis.to_value(u.AA, u.spectral())
+        edges = _bin_edges(spectral_axis).to_value(u.AA, u.spectral())
+
+        self._blue, blue_complete = _band_weights(
+            edges, bounds['blue_start'], bounds['blue_end'])
+        self._red, red_complete = _band_weights(
+            edges, bounds['red_start'], bounds['red_end'])
+        band, band_complete = _band_weights(
+            edges, bounds['band_start'], bounds['band_end'])
+        self._complete = blue_complete & red_complete & band_complete
+
+        # The feature weights are only non-zero on a few pixels, so they are
+        # kept as the list of (index, pixel) pairs inside the feature
+        # passbands, which are grouped by index and summed per segment.
+        index, pixel = np.nonzero(band)
+        counts = np.bincount(index, minlength=len(self.names))
+        self._feature_index = index
+        self._feature_pixel = pixel
+        self._feature_weight = band[index, pixel]
+        self._segments = counts > 0
+        self._segment_starts = (np.cumsum(counts) - counts)[self._segments]
+
+        # The pseudo-continuum is the straight line through the mean flux of
+        # the blue and red passbands, at their midpoints.
+        blue_center = (bounds['blue_start'] + bounds['blue_end']) / 2
+        red_center = (bounds['red_start'] + bounds['red_end']) / 2
+        fraction = ((centers[pixel] - blue_center[index]) /
+                    (red_center - blue_center)[index])
+        self._blue_coefficient = 1 - fraction
+        self._red_coefficient = fraction
+
+        self._band_width = np.abs(bounds['band_end'] - bounds['band_start'])
+
+    def __repr__(self):
+        return "<SpectralIndexWeights(n_indices={}, n_pixels={})>".format(
+            len(self.names), self._blue.shape[1])
+
+    def matches(self, spectral_axis):
+        """
+        Whether the weights were computed for ``spectral_axis``.
+        """
+        return (spectral_axis.unit == self.spectral_axis.unit and
+                np.array_equal(spectral_axis.value, self.spectral_axis.value))
+
+    def apply(self, flux, mask=None):
+        """
+        Compute the indices of the spectra in the rows of ``flux``.
+
+        Parameters
+        ----------
+        flux : `~numpy.ndarray`
+            The fluxes, with shape ``(n_spectra, n_pixels)``.
+        mask : `~numpy.ndarray`, optional
+            Boolean mask of ``flux``, `True` for the pixels to leave out.
+
+        Returns
+        -------
+        indices : `~numpy.ndarray`
+            The indices, with shape ``(n_spectra, n_indices)``, in Angstrom
+            or magnitudes. NaN where a passband is not covered by the
+            spectral axis or has no unmasked, finite pixels.
+        """
+        flux = np.asarray(flux, dtype=float)
+        pixel = self._feature_pixel
+
+        # Non-finite pixels are left out like masked ones, so that they only
+        # affect the indices whose passbands contain them.
+        good = np.isfinite(flux)
+        if mask is not None:
+            good &= ~np.broadcast_to(mask, flux.shape)
+        flux = np.where(good, flux, 0.)
+        good = good.astype(float)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            blue = (flux @ self._blue.T) / (good @ self._blue.T)
+            red = (flux @ self._red.T) / (good @ self._red.T)
+
+            continuum = (blue[:, self._feature_index] * self._blue_coefficient +
+                         red[:, self._feature_index] * self._red_coefficient)
+            weights = good[:, pixel] * self._feature_weight
+            ratio = weights * flux[:, pixel] / continuum
+
+            # Mean of flux / continuum over the (unmasked) feature passband.
+            mean_ratio = (self._segment_sum(ratio) /
+                          self._segment_sum(weights))
+
+            indices = np.where(self._magnitude, -2.5 * np.log10(mean_ratio),
+                               self._band_width * (1 - mean_ratio))
+
+        return np.where(self._complete, indices, np.nan)
+
+    def _segment_sum(self, values):
+        """
+        Sum the columns of ``values``, one per (index, pixel) pair of the
+        feature passbands, over the pairs of each index.
+        """
+        sums = np.zeros((len(values), len(self.names)))
+        if values.shape[1]:
+            sums[:, self._segments] = np.add.reduceat(
+                values, self._segment_starts, axis=1)
+
+        return sums
+
+
+def spectral_indices(spectrum, definitions):
+    """
+    Measure bandpass spectral indices, such as the Lick indices, of every
+    spectrum of a multi-dimensional `~specutils.Spectrum1D` or a
+    `~specutils.SpectrumCollection`.
+
+    Each index is measured against a pseudo-continuum, the straight line
+    through the mean flux of its blue and red passbands. Equivalent-width
+    indices are the integral of ``1 - flux / continuum`` over the feature
+    passband, and magnitude indices are ``-2.5 log10`` of the mean of
+    ``flux / continuum`` over it. Passbands are integrated with
+    fractional-pixel weights, which are computed once per spectral axis and
+    applied to all the spectra at once.
+
+    Parameters
+    ----------
+    spectrum : `~specutils.Spectrum1D` or `~specutils.SpectrumCollection`
+        The spectra to measure, along the last axis of their flux, which
+        should be a flux density per unit wavelength.
+
+    definitions : `~astropy.table.Table`, list of dict or `~specutils.analysis.SpectralIndexWeights`
+        The index definitions, see `~specutils.analysis.SpectralIndexWeights`.
+        Weights computed beforehand are reused if they match the spectral
+        axis of the spectra.
+
+    Returns
+    -------
+    table : `~astropy.table.QTable`
+        Table with one row per spectrum and one column per index, in Angstrom
+        or magnitudes, preceded by a ``spectrum_index`` column for
+        multi-dimensional fluxes. Indices whose passbands are not covered by
+        the spectral axis are NaN.
+
+    Notes
+    -----
+    Masked and non-finite pixels are left out of the passband means.
+    """
+    flux = spectrum.flux
+    n_pixels = flux.shape[-1]
+    values = flux.value.reshape(-1, n_pixels)
+
+    mask = getattr(spectrum, 'mask', None)
+    if mask is not None:
+        mask = np.broadcast_to(mask, flux.shape).reshape(-1, n_pixels)
+
+    if isinstance(definitions, SpectralIndexWeights):
+        weights = definitions
+        definitions = weights.definitions
+    else:
+        weights = None
+
+    # Spectra of a collection can have different spectral axes, the weights
+    # are computed once per distinct axis.
+    spectral_axis = spectrum.spectral_axis
+    if spectral_axis.ndim > 1:
+        grids = np.broadcast_to(spectral_axis.value, flux.shape)
+        unique, inverse = np.unique(grids.reshape(-1, n_pixels), axis=0,
+                                    return_inverse=True)
+        groups = [(u.Quantity(grid, spectral_axis.unit), inverse == i)
+                  for i, grid in enumerate(unique)]
+    else:
+        groups = [(spectral_axis, slice(None))]
+
+    indices = None
+    for grid, rows in groups:
+        if weights is None or not weights.matches(grid):
+            weights = SpectralIndexWeights(definitions, grid)
+
+        result = weights.apply(values[rows],
+                               None if mask is None else mask[rows])
+        if indices is None:
+            indices = np.empty((len(values), result.shape[1]))
+        indices[rows] = result
+
+    table = QTable()
+    if flux.ndim > 1:
+        table['spectrum_index'] = np.arange(len(values))
+
+    for i, name in enumerate(weights.names):
+        unit = u.mag if weights._magnitude[i] else u.AA
+        table[name] = u.Quantity(indices[:, i], unit, copy=False)
+
+    return table
+
+
+def _definition_table(definitions):
+    """
+    Convert index definitions to a `~astropy.table.QTable`, checking their
+    columns.
+    """
+    if isinstance(definitions, (list, tuple)):
+        definitions = QTable(rows=definitions)
+    else:
+        definitions = QTable(definitions)
+
+    missing = [name for name in ('name',) + _BOUND_COLUMNS
+               if name not in definitions.colnames]
+    if missing:
+        raise ValueError("The index definitions are missing the columns "
+                         "{}.".format(missing))
+
+    return definitions
+
+
+def _bin_edges(spectral_axis):
+    """
+    The bin edges of ``spectral_axis``, which may be a plain
+    `~astropy.units.Quantity`.
+    """
+    if isinstance(spectral_axis, SpectralAxis):
+        return spectral_axis.bin_edges
+
+    return SpectralAxis._edges_from_centers(spectral_axis.value,
+                                            spectral_axis.unit)
+
+
+def _band_weights(edges, start, end):
+    """
+    Width of the overlap of every bin with every passband, with shape
+    ``(n_passbands, n_pixels)``, and whether each passband is fully covered
+    by the bins.
+    """
+    lower = np.minimum(edges[:-1], edges[1:])
+    upper = np.maximum(edges[:-1], edges[1:])
+    start, end = np.minimum(start, end), np.maximum(start, end)
+
+    weights = np.clip(np.minimum(upper, end[:, np.newaxis]) -
+                      np.maximum(lower, start[:, np.newaxis]), 0, None)
+
+    complete = (start >= edges.min()) & (end <= edges.max())
+
+    return weights, complete
@@ -3,9 +3,14 @@ A module for analysis tools dealing with uncertainties or error analysis in
 spectra.
 """
 
+import warnings
+
 import numpy as np
+import astropy.units as u
+
 from ..spectra import SpectralRegion
-from ..manipulation import extract_region
+from .utils import region_selection, attached_index, _compress_rows
+from ..utils.dtype_utils import result_dtype
 
 __all__ = ['snr', 'snr_derived']
 
@@ -78,24 +83,25 @@ def _snr_single_region(spectrum, region=None):
 
     """
 
-    if region is not None:
-        calc_spectrum = extract_region(spectrum, region)
-    else:
-        calc_spectrum = spectrum
+    index = attached_index(spectrum)
+    if index is not None:
+        return index.snr(region)
+
+    selection = region_selection(spectrum, region)
+    flux = spectrum.flux[..., selection]
+    uncertainty = spectrum.uncertainty.quantity[..., selection]
 
     if hasattr(spectrum, 'mask') and spectrum.mask is not None:
-        flux = calc_spectrum.flux[~spectrum.mask]
-        uncertainty = calc_spectrum.uncertainty.quantity[~spectrum.mask]
-    else:
-        flux = calc_spectrum.flux
-        uncertainty = calc_spectrum.uncertainty.quantity
+        mask = spectrum.mask[..., selection]
+        flux = flux[~mask]
+        uncertainty = uncertainty[~mask]
 
     # the axis=-1 will enable this to run on single-dispersion, single-flux
     # and single-dispersion, multiple-flux
     return np.mean(flux / uncertainty, axis=-1)
 
 
-def snr_derived(spectrum, region=None):
+def snr_derived(spectrum, region=None, chunk_size=None, dtype=None):
     """
     This function computes the signal to noise ratio DER_SNR following the
     definition set forth by the Spectral Container Working Group of ST-ECF,
@@ -105,10 +111,23 @@ def snr_derived(spectrum, region=None):
     ----------
     spectrum : `~specutils.spectra.spectrum1d.Spectrum1D`
         The spectrum object overwhich the equivalent width will be calculated.
+        Multi-dimensional flux arrays give one value per spectrum.
 
     region: `~specutils.utils.SpectralRegion`
         Region within the spectrum to calculate the SNR.
 
+    chunk_size : int, optional
+        Number of spectra of a multi-dimensional flux array to process at a
+        time. By default all of them are processed at once. With a chunk
+        size, only ``chunk_size`` spectra of the flux and mask are read and
+        held in memory at any time, so large (e.g. memory-mapped) arrays can
+        be processed with bounded memory.
+
+    dtype : `~numpy.dtype`, optional
+        Floating point type the flux is processed and the S/N returned in.
+        By default it follows ``specutils.conf.dtype_policy``, with float64
+        computations for the ``'promote'`` policy.
+
     Returns
     -------
     snr : `~astropy.units.Quantity` or list (based on region input)
@@ -122,25 +141,38 @@ def snr_derived(spectrum, region=None):
     regions, the signal over the scale of 5 or more pixels can be approximated
     by a straight line.
 
+    Masked pixels are left out and the differences are taken between the
+    remaining pixels. Spectra with fewer than 5 unmasked pixels have a S/N of
+    zero.
+
     Code and some docs copied from
     ``http://www.stecf.org/software/ASTROsoft/DER_SNR/der_snr.py``
     """
 
+    if chunk_size is not None and chunk_size < 1:
+        raise ValueError("chunk_size must be a positive integer.")
+
+    dtype = result_dtype(spectrum.flux, dtype=dtype)
+    if dtype is None:
+        dtype = np.dtype(float)
+
     # No region, therefore whole spectrum.
     if region is None:
-        return _snr_derived(spectrum)
+        return _snr_derived(spectrum, chunk_size=chunk_size, dtype=dtype)
 
     # Single region
     elif isinstance(region, SpectralRegion):
-        return _snr_derived(spectrum, region=region)
+        return _snr_derived(spectrum, region=region, chunk_size=chunk_size,
+                            dtype=dtype)
 
     # List of regions
     elif isinstance(region, list):
-        return [_snr_derived(spectrum, region=reg)
+        return [_snr_derived(spectrum, region=reg, chunk_size=chunk_size,
+                             dtype=dtype)
                 for reg in region]
 
 
-def _snr_derived(spectrum, region=None):
+def _snr_derived(spectrum, region=None, chunk_size=None, dtype=float):
     """
     This function computes the signal to noise ratio DER_SNR following the
     definition set forth by the Spectral Container Working Group of ST-ECF,
@@ -154,6 +186,12 @@ def _snr_derived(spectrum, region=None):
     region: `~specutils.utils.SpectralRegion`
         Region within the spectrum to calculate the SNR.
 
+    chunk_size : int, optional
+        Number of spectra to process at a time.
+
+    dtype : `~numpy.dtype`, optional
+        Floating point type of the computations.
+
     Returns
     -------
     snr : `~astropy.units.Quantity` or list (based on region input)
@@ -165,23 +203,69 @@ def _snr_derived(spectrum, region=None):
 
     """
 
-    if region is not None:
-        calc_spectrum = extract_region(spectrum, region)
-    else:
-        calc_spectrum = spectrum
+    selection = region_selection(spectrum, region)
+    flux = spectrum.flux
+    mask = getattr(spectrum, 'mask', None)
 
-    if hasattr(spectrum, 'mask') and spectrum.mask is not None:
-        flux = calc_spectrum.flux[~calc_spectrum.mask]
-    else:
-        flux = calc_spectrum.flux
+    # Collections select different pixels in every row, which are left out
+    # like masked pixels.
+    if np.ndim(selection) > 1:
+        mask = ~selection if mask is None else mask | ~selection
+        selection = slice(None)
 
-    # Values that are exactly zero (padded) are skipped
-    n = len(flux)
+    if chunk_size is None or flux.ndim == 1:
+        return _der_snr(flux[..., selection],
+                        None if mask is None else mask[..., selection], dtype)
 
-    # For spectra shorter than this, no value can be returned
-    if n > 4:
-        signal = np.median(flux)
-        noise  = 0.6052697 * np.median(np.abs(2.0 * flux[2:n-2] - flux[0:n-4] - flux[4:n]))
-        return signal / noise
+    # Iterate over views of the rows, so that only the selected pixels of one
+    # chunk are read from the (possibly memory-mapped) arrays at a time.
+    shape = flux.shape
+    flux = flux.reshape(-1, shape[-1])
+    if mask is not None:
+        mask = np.broadcast_to(mask, shape).reshape(-1, shape[-1])
+
+    result = np.empty(len(flux), dtype=dtype)
+    for start in range(0, len(flux), chunk_size):
+        rows = slice(start, start + chunk_size)
+        result[rows] = _der_snr(
+            flux[rows][:, selection],
+            None if mask is None else mask[rows][:, selection], dtype).value
+
+    return u.Quantity(result.reshape(shape[:-1]), u.dimensionless_unscaled,
+                      copy=False)
+
+
+def _der_snr(flux, mask=None, dtype=float):
+    """
+    DER_SNR of every spectrum of ``flux`` along its last axis, leaving out
+    the masked pixels, computed in ``dtype``.
+    """
+    values = np.asarray(flux.value, dtype=dtype)
+    median = np.median
+
+    if mask is None:
+        n = np.full(values.shape[:-1], values.shape[-1])
     else:
-        return 0.0
+        mask = np.broadcast_to(mask, values.shape)
+        n = np.sum(~mask, axis=-1)
+        values = _compress_rows(values, mask)
+        median = np.nanmedian
+
+    # For spectra shorter than this, no value can be returned
+    if values.shape[-1] <= 4:
+        return u.Quantity(np.zeros(values.shape[:-1], dtype=dtype),
+                          u.dimensionless_unscaled)
+
+    with warnings.catch_warnings(), np.errstate(invalid='ignore',
+                                                divide='ignore'):
+        # Rows with too few unmasked pixels are all NaN after the first
+        # differences and give zero below.
+        warnings.simplefilter('ignore', RuntimeWarning)
+
+        signal = median(values, axis=-1)
+        noise = 0.6052697 * median(np.abs(2.0 * values[..., 2:-2] -
+                                          values[..., :-4] -
+                                          values[..., 4:]), axis=-1)
+        snr = np.where(n > 4, signal / noise, 0.)
+
+    return u.Quantity(snr, u.dimensionless_unscaled, copy=False)
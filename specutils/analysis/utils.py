@@ -3,10 +3,15 @@ A module for internal utilities for the analysis sub-package.  Not meant for
 public API consumption.
 """
 
+import numpy as np
+
 from ..spectra import SpectralRegion
+from ..manipulation.extract_spectral_region import _edge_pixels
+from .caching import cached
 
 
-__all__ = ['computation_wrapper']
+__all__ = ['computation_wrapper', 'region_selection', 'region_edge_pixels',
+           'attached_index']
 
 
 def computation_wrapper(func, spectrum, region, **kwargs):
@@ -25,3 +30,52 @@ def computation_wrapper(func, spectrum, region, **kwargs):
     # List of regions
     elif isinstance(region, list):
         return [func(spectrum, regions=reg, **kwargs) for reg in region]
+
+
+def region_selection(spectrum, region):
+    """
+    Returns an index that selects the elements along the spectral (last) axis
+    of ``spectrum`` that fall inside ``region``.  The result can be applied to
+    the spectral axis directly and to the flux, mask and uncertainty arrays as
+    ``array[..., selection]``, so no sub-spectrum needs to be built.
+    """
+    if region is None:
+        return slice(None)
+
+    return cached('selection', spectrum, region,
+                  lambda: region.to_mask(spectrum.spectral_axis))
+
+
+def region_edge_pixels(spectrum, region):
+    """
+    Returns the left (inclusive) and right (exclusive) pixel indices of the
+    sub-regions of ``region``, selecting the same pixels as
+    `~specutils.manipulation.extract_region`.
+    """
+    return cached('edge_pixels', spectrum, region,
+                  lambda: _edge_pixels(region, spectrum.spectral_axis))
+
+
+def attached_index(spectrum):
+    """
+    Returns the `~specutils.analysis.CumulativeIndex` attached to
+    ``spectrum`` by `~specutils.Spectrum1D.build_cumulative_index`, or `None`
+    if there is none or it is out of date.
+    """
+    index = getattr(spectrum, '_cumulative_index', None)
+
+    if index is not None and index.is_valid(spectrum):
+        return index
+
+
+def _compress_rows(flux, mask):
+    """
+    Move the unmasked values of each row of ``flux`` to its start, in order,
+    and pad the rows with NaN.
+    """
+    mask = np.broadcast_to(mask, flux.shape)
+    order = np.argsort(mask, axis=-1, kind='stable')
+    flux = np.take_along_axis(flux, order, axis=-1)
+    flux[np.take_along_axis(mask, order, axis=-1)] = np.nan
+
+    return flux
@@ -6,10 +6,9 @@ spectral features.
 import numpy as np
 from astropy.stats.funcs import gaussian_sigma_to_fwhm
 from astropy.modeling.models import Gaussian1D
-from ..manipulation import extract_region
 from . import centroid
-from .utils import computation_wrapper
-from scipy.signal import chirp, find_peaks, peak_widths
+from .caching import cached
+from .utils import computation_wrapper, region_selection, _compress_rows
 
 
 __all__ = ['gaussian_sigma_width', 'gaussian_fwhm', 'fwhm', 'fwzi']
@@ -97,7 +96,8 @@ def fwhm(spectrum, regions=None):
     Returns
     -------
     whm : `~astropy.units.Quantity` or list (based on region input)
-        Full width of the signal at half max
+        Full width of the signal at half max, with one value per spectrum
+        for multi-dimensional fluxes.
 
     Notes
     -----
@@ -128,7 +128,8 @@ def fwzi(spectrum, regions=None):
     Returns
     -------
     `~astropy.units.Quantity` or list (based on region input)
-        Full width of the signal at zero intensity.
+        Full width of the signal at zero intensity, with one value per
+        spectrum for multi-dimensional fluxes.
 
     Notes
     -----
@@ -139,47 +140,128 @@ def fwzi(spectrum, regions=None):
 
 
 def _compute_fwzi(spectrum, regions=None):
-    if regions is not None:
-        calc_spectrum = extract_region(spectrum, regions)
-    else:
-        calc_spectrum = spectrum
+    selection = region_selection(spectrum, regions)
+    flux = spectrum.flux[..., selection].value
+    disp = spectrum.spectral_axis[selection]
 
-    # Create a copy of the flux array to ensure the value on the spectrum
-    # object is not altered.
+    # Masked pixels are dropped from each spectrum, as if it was compressed.
     if hasattr(spectrum, 'mask') and spectrum.mask is not None:
-        disp = calc_spectrum.spectral_axis[~spectrum.mask]
-        flux = calc_spectrum.flux[~spectrum.mask].copy()
-    else:
-        disp = calc_spectrum.spectral_axis
-        flux = calc_spectrum.flux.copy()
+        flux = _compress_rows(flux, spectrum.mask[..., selection])
 
     # For noisy data, ensure that the search from the centroid stops on
-    # either side once the flux value reaches zero.
-    flux[flux < 0] = 0
+    # either side once the flux value reaches zero.  This also copies the
+    # flux so the spectrum is not altered.
+    flux = np.where(flux < 0, 0, flux)
 
-    def find_width(data):
-        # Find the peaks in the flux data
-        peaks, _ = find_peaks(data)
+    widths = _fwzi_rows(flux.reshape((-1, flux.shape[-1])))
 
-        # Find the index of the maximum peak value in the found peak list
-        peak_ind = [peaks[np.argmin(np.abs(
-            np.array(peaks) - np.argmin(np.abs(data - np.max(data)))))]]
+    return widths.reshape(flux.shape[:-1]) * disp.unit
 
-        # Calculate the width for the given feature
-        widths, _, _, _ = \
-            peak_widths(data, peak_ind, rel_height=1-1e-7)
 
-        return widths[0] * disp.unit
+def _last_true(condition):
+    """
+    Index of the last `True` along the last axis of ``condition``, -1 if none.
+    """
+    n = condition.shape[-1]
+    return np.where(condition.any(axis=-1),
+                    n - 1 - np.argmax(condition[..., ::-1], axis=-1), -1)
 
-    if flux.ndim > 1:
-        tot_widths = []
 
-        for i in range(flux.shape[0]):
-            tot_widths.append(find_width(flux[i]))
+def _first_true(condition):
+    """
+    Index of the first `True` along the last axis of ``condition``, the
+    length of the axis if none.
+    """
+    n = condition.shape[-1]
+    return np.where(condition.any(axis=-1), np.argmax(condition, axis=-1), n)
 
-        return tot_widths
 
-    return find_width(flux)
+def _fwzi_rows(flux):
+    """
+    Width (in pixels) at the base of the peak closest to the maximum of each
+    row of the 2D ``flux`` array, as computed by `scipy.signal.find_peaks`
+    and `scipy.signal.peak_widths` with a relative height of ``1 - 1e-7``.
+    Rows may be padded at the end with NaN.  The width is NaN for rows
+    without peaks.
+    """
+    n_rows, n = flux.shape
+    rows = np.arange(n_rows)[:, np.newaxis]
+    cols = np.arange(n)
+
+    # Local maxima, with plateaus reduced to their middle pixel as in
+    # find_peaks: a rise followed by a plateau (possibly of one pixel) ending
+    # in a fall before the last pixel.
+    changes = np.full(flux.shape, n)
+    changes[:, 1:] = np.where(flux[:, 1:] != flux[:, :-1], cols[1:], n)
+    next_change = np.minimum.accumulate(changes[:, ::-1], axis=-1)[:, ::-1]
+
+    starts = np.zeros(flux.shape, dtype=bool)
+    starts[:, 1:-1] = flux[:, :-2] < flux[:, 1:-1]
+    ahead = np.full(flux.shape, n - 1)
+    ahead[:, :-1] = np.minimum(next_change[:, 1:], n - 1)
+    with np.errstate(invalid='ignore'):
+        is_peak = starts & (np.take_along_axis(flux, ahead, axis=-1) < flux)
+    peaks = (cols + ahead - 1) // 2
+
+    # The peak closest to the (first) maximum, preferring the left one.
+    argmax = np.nanargmax(flux, axis=-1)[:, np.newaxis]
+    before = is_peak & (peaks <= argmax)
+    left_peak = peaks[rows, np.maximum(_last_true(before), 0)[:, np.newaxis]]
+    right_peak = peaks[rows, np.minimum(_first_true(is_peak & ~before),
+                                        n - 1)[:, np.newaxis]]
+    use_left = before.any(axis=-1, keepdims=True) & (
+        ~(is_peak & ~before).any(axis=-1, keepdims=True) |
+        (argmax - left_peak <= right_peak - argmax))
+    found = is_peak.any(axis=-1)
+    peak = np.where(use_left, left_peak, right_peak)
+    peak = np.where(found[:, np.newaxis], peak, 0)
+    peak_value = flux[rows, peak]
+
+    # Prominence: the lowest points on either side before the flux rises
+    # above the peak (or the spectrum ends).
+    with np.errstate(invalid='ignore'):
+        higher = ~(flux <= peak_value)
+    left_stop = _last_true(higher & (cols < peak))[:, np.newaxis]
+    right_stop = _first_true(higher & (cols > peak))[:, np.newaxis]
+
+    left_side = (cols > left_stop) & (cols <= peak)
+    left_min = np.nanmin(np.where(left_side, flux, np.inf), axis=-1,
+                         keepdims=True)
+    left_base = _last_true(left_side & (flux == left_min))[:, np.newaxis]
+
+    right_side = (cols >= peak) & (cols < right_stop)
+    right_min = np.nanmin(np.where(right_side, flux, np.inf), axis=-1,
+                          keepdims=True)
+    right_base = _first_true(right_side & (flux == right_min))[:, np.newaxis]
+
+    prominence = peak_value - np.maximum(left_min, right_min)
+    height = peak_value - prominence * (1 - 1e-7)
+
+    # Interpolated positions where the flux drops to the height.
+    with np.errstate(invalid='ignore'):
+        low = flux <= height
+    left = _last_true(low & (cols >= left_base) & (cols <= peak))
+    left = np.where(left < 0, left_base[:, 0], left)
+    right = _first_true(low & (cols >= peak) & (cols <= right_base))
+    right = np.where(right >= n, right_base[:, 0], right)
+
+    rows = rows[:, 0]
+    height = height[:, 0]
+    left_ip = left.astype(float)
+    right_ip = right.astype(float)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        below = flux[rows, left] < height
+        left_next = flux[rows, np.minimum(left + 1, n - 1)]
+        left_ip[below] += ((height - flux[rows, left]) /
+                           (left_next - flux[rows, left]))[below]
+
+        below = flux[rows, right] < height
+        right_prev = flux[rows, np.maximum(right - 1, 0)]
+        right_ip[below] -= ((height - flux[rows, right]) /
+                            (right_prev - flux[rows, right]))[below]
+
+    return np.where(found, right_ip - left_ip, np.nan)
 
 
 def _compute_gaussian_fwhm(spectrum, regions=None):
@@ -197,23 +279,25 @@ def _compute_gaussian_sigma_width(spectrum, regions=None):
     This is a helper function for the above `gaussian_sigma_width()` method.
     """
 
-    if regions is not None:
-        calc_spectrum = extract_region(spectrum, regions)
-    else:
-        calc_spectrum = spectrum
+    return cached('gaussian_sigma_width', spectrum, regions,
+                  lambda: _second_moment(spectrum, regions))
+
+
+def _second_moment(spectrum, regions=None):
+    selection = region_selection(spectrum, regions)
+    flux = spectrum.flux[..., selection]
+    spectral_axis = spectrum.spectral_axis[selection]
 
     if hasattr(spectrum, 'mask') and spectrum.mask is not None:
-        flux = calc_spectrum.flux[~spectrum.mask]
-        spectral_axis = calc_spectrum.spectral_axis[~spectrum.mask]
-    else:
-        flux = calc_spectrum.flux
-        spectral_axis = calc_spectrum.spectral_axis
+        mask = spectrum.mask[..., selection]
+        flux = flux[~mask]
+        spectral_axis = spectral_axis[~mask]
 
     centroid_result = centroid(spectrum, regions)
 
     if flux.ndim > 1:
         spectral_axis = np.broadcast_to(spectral_axis, flux.shape, subok=True)
-        centroid_result = centroid_result[:, np.newaxis]
+        centroid_result = centroid_result[..., np.newaxis]
 
     dx = (spectral_axis - centroid_result)
     sigma = np.sqrt(np.sum((dx * dx) * flux, axis=-1) / np.sum(flux, axis=-1))
@@ -221,52 +305,58 @@ def _compute_gaussian_sigma_width(spectrum, regions=None):
     return sigma
 
 
-def _compute_single_fwhm(flux, spectral_axis):
+def _compute_fwhm_values(flux, spectral_axis):
     """
-    This is a helper function for the above `fwhm()` method.
+    This is a helper function for the above `fwhm()` method.  Computes the
+    FWHM of each spectrum along the last axis of ``flux`` at once.
     """
 
-    # The .value attribute is used here as the following algorithm does not
-    # use any array operations and would otherwise introduce a relatively
-    # significant overhead factor.  Two-point linear interpolation is used to
-    # achieve sub-pixel precision.
-    flux_value = flux.value
+    # The .value attribute is used here to avoid the overhead of unit
+    # handling on the intermediate arrays.  Two-point linear interpolation
+    # is used to achieve sub-pixel precision.
+    flux_value = flux.value.reshape((-1, flux.shape[-1]))
     spectral_value = spectral_axis.value
-
-    argmax = flux_value.argmax()
-    halfval = flux_value[argmax] / 2
-    left = flux_value[:argmax] < halfval
-    right = flux_value[argmax + 1:] < halfval
-
-    # Highest signal at the first point
-    i0 = np.nonzero(left)[0]
-    if i0.size == 0:
-        left_value = spectral_value[0]
-    else:
-        i0 = i0[-1]
-        i1 = i0 + 1
-        left_flux = flux_value[i0]
+    n = flux_value.shape[-1]
+    rows = np.arange(flux_value.shape[0])
+    cols = np.arange(n)
+
+    argmax = flux_value.argmax(axis=-1)
+    halfval = flux_value[rows, argmax] / 2
+    below = flux_value < halfval[:, np.newaxis]
+
+    # The last point below half max before the maximum and the first one
+    # after it.
+    left = _last_true(below & (cols < argmax[:, np.newaxis]))
+    right = _first_true(below & (cols > argmax[:, np.newaxis]))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # Highest signal at the first point
+        i0 = np.maximum(left, 0)
+        i1 = np.minimum(i0 + 1, n - 1)
+        left_flux = flux_value[rows, i0]
         left_spectral = spectral_value[i0]
-        left_value = ((halfval - left_flux)
-                      * (spectral_value[i1] - left_spectral)
-                      / (flux_value[i1] - left_flux)
-                      + left_spectral)
-
-    # Highest signal at the last point
-    i1 = np.nonzero(right)[0]
-    if i1.size == 0:
-        right_value = spectral_value[-1]
-    else:
-        i1 = i1[0] + argmax + 1
-        i0 = i1 - 1
-        left_flux = flux_value[i0]
+        left_value = np.where(
+            left < 0, spectral_value[0],
+            ((halfval - left_flux)
+             * (spectral_value[i1] - left_spectral)
+             / (flux_value[rows, i1] - left_flux)
+             + left_spectral))
+
+        # Highest signal at the last point
+        i1 = np.minimum(right, n - 1)
+        i0 = np.maximum(i1 - 1, 0)
+        left_flux = flux_value[rows, i0]
         left_spectral = spectral_value[i0]
-        right_value = ((halfval - left_flux)
-                       * (spectral_value[i1] - left_spectral)
-                       / (flux_value[i1] - left_flux)
-                       + left_spectral)
+        right_value = np.where(
+            right >= n, spectral_value[-1],
+            ((halfval - left_flux)
+             * (spectral_value[i1] - left_spectral)
+             / (flux_value[rows, i1] - left_flux)
+             + left_spectral))
 
-    return spectral_axis.unit * np.abs(right_value - left_value)
+    width = np.abs(right_value - left_value).reshape(flux.shape[:-1])
+
+    return width * spectral_axis.unit
 
 
 def _compute_fwhm(spectrum, regions=None):
@@ -274,15 +364,8 @@ def _compute_fwhm(spectrum, regions=None):
     This is a helper function for the above `fwhm()` method.
     """
 
-    if regions is not None:
-        calc_spectrum = extract_region(spectrum, regions)
-    else:
-        calc_spectrum = spectrum
-
-    flux = calc_spectrum.flux
-    spectral_axis = calc_spectrum.spectral_axis
+    selection = region_selection(spectrum, regions)
+    flux = spectrum.flux[..., selection]
+    spectral_axis = spectrum.spectral_axis[selection]
 
-    if flux.ndim > 1:
-        return [_compute_single_fwhm(x, spectral_axis) for x in flux]
-    else:
-        return _compute_single_fwhm(flux, spectral_axis)
+    return _compute_fwhm_values(flux, spectral_axis)
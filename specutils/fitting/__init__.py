@@ -1,2 +1,3 @@
 from .fitmodels import *
 from .continuum import *
+from .fitresults import *
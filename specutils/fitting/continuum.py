@@ -1,24 +1,37 @@
+import numpy as np
+import astropy.units as u
 from astropy.modeling.polynomial import Chebyshev1D
 from astropy.modeling.fitting import LevMarLSQFitter
+from astropy.modeling.utils import poly_map_domain
+from scipy.signal import medfilt
 
 from ..fitting import fit_lines
 from ..manipulation.smoothing import median_smooth
+from ..spectra import SpectrumCollection
+from .fitmodels import (_batch_arrays, _parameter_units,
+                        _strip_units_from_model)
+from .fitresults import FitResults, _UnitReference
 
 
-__all__ = ['fit_continuum', 'fit_generic_continuum']
+__all__ = ['fit_continuum', 'fit_generic_continuum', 'fit_clipped_continuum']
 
 
 def fit_generic_continuum(spectrum, median_window=3, model=Chebyshev1D(3),
                           fitter=LevMarLSQFitter(),
-                          exclude_regions=None, weights=None):
+                          exclude_regions=None, weights=None,
+                          return_continuum=False):
     """
     Basic fitting of the continuum of an input spectrum. The input
     spectrum is smoothed using a median filter to remove the spikes.
 
     Parameters
     ----------
-    spectrum : Spectrum1D
+    spectrum : `~specutils.Spectrum1D` or `~specutils.SpectrumCollection`
         The spectrum object overwhich the equivalent width will be calculated.
+        If the flux has more than one dimension, the continuum of every
+        spectrum along the last axis is fit (see `~specutils.fitting.fit_lines`).
+        Using `~astropy.modeling.fitting.LinearLSQFitter` with a linear
+        ``model`` (such as the default) then fits all the spectra at once.
 
     model : list of `~astropy.modeling.Model`
         The list of models that contain the initial guess.
@@ -30,10 +43,17 @@ def fit_generic_continuum(spectrum, median_window=3, model=Chebyshev1D(3),
     weights : list  (NOT IMPLEMENTED YET)
         List of weights to define importance of fitting regions.
 
+    return_continuum : bool, optional
+        If True, return the fitted continuum evaluated on the spectral axis of
+        ``spectrum``, with the shape of its flux, instead of the fitted model.
+
     Returns
     -------
     continuum_model
-        Fitted continuum as a model of whatever class ``model`` provides.
+        Fitted continuum as a model of whatever class ``model`` provides, or
+        a `~specutils.fitting.FitResults` for multi-dimensional spectra. If
+        ``return_continuum`` is True, the evaluated continuum as a
+        `~astropy.units.Quantity`.
 
     Notes
     -----
@@ -48,13 +68,27 @@ def fit_generic_continuum(spectrum, median_window=3, model=Chebyshev1D(3),
     # Simple median smooth to remove spikes and peaks
     #
 
-    spectrum_smoothed = median_smooth(spectrum, median_window)
+    if isinstance(spectrum, SpectrumCollection):
+        spectrum_smoothed = SpectrumCollection(
+            flux=u.Quantity(medfilt(spectrum.flux, [1, median_window]),
+                            spectrum.flux.unit),
+            spectral_axis=spectrum.spectral_axis, wcs=spectrum.wcs)
+    else:
+        spectrum_smoothed = median_smooth(spectrum, median_window)
 
     #
     # Return the fitted continuum
     #
 
-    return fit_continuum(spectrum_smoothed, model, fitter, exclude_regions, weights)
+    continuum = fit_continuum(spectrum_smoothed, model, fitter,
+                              exclude_regions, weights)
+
+    if not return_continuum:
+        return continuum
+    elif isinstance(continuum, FitResults):
+        return continuum.evaluate()
+    else:
+        return continuum(spectrum.spectral_axis)
 
 
 def fit_continuum(spectrum, model=Chebyshev1D(3), fitter=LevMarLSQFitter(),
@@ -98,3 +132,179 @@ def fit_continuum(spectrum, model=Chebyshev1D(3), fitter=LevMarLSQFitter(),
                                    weights, window)
 
     return continuum_spectrum
+
+
+def fit_clipped_continuum(spectrum, model=Chebyshev1D(3), sigma=3,
+                          sigma_lower=None, sigma_upper=None, maxiters=5,
+                          exclude_regions=None, window=None, weights=None):
+    """
+    Fit the continuum with iterative sigma clipping of the residuals.
+
+    The (linear) ``model`` is fit by weighted least squares, the pixels whose
+    residuals are outside of the clipping limits are masked and the model is
+    fit again, until the mask no longer changes or ``maxiters`` is reached.
+    All the spectra along the last axis of the flux are solved together at
+    each iteration, and each spectrum stops iterating as soon as it has
+    converged.
+
+    Parameters
+    ----------
+    spectrum : `~specutils.Spectrum1D` or `~specutils.SpectrumCollection`
+        The spectrum object to which the continuum is fit.
+
+    model : `~astropy.modeling.Model`
+        The model of the continuum. Must be linear in its parameters (e.g. a
+        polynomial), without fixed or tied parameters.
+
+    sigma : float
+        The number of standard deviations of the residuals used as clipping
+        limit.
+
+    sigma_lower, sigma_upper : float or None
+        The number of standard deviations used for the lower and upper
+        clipping limits. If None, ``sigma`` is used. A small ``sigma_upper``
+        and large ``sigma_lower`` favors the upper envelope of the spectrum,
+        for instance to ignore absorption lines.
+
+    maxiters : int
+        The maximum number of clipping iterations.
+
+    exclude_regions : list of `~specutils.SpectralRegion`
+        List of regions to exclude in the fitting.
+
+    window : `~specutils.SpectralRegion` or tuple
+        Region of the spectrum to use in the fitting. If None, then the
+        whole spectrum is used.
+
+    weights : array-like or 'unc', optional
+        If 'unc', the uncertainties from the spectrum object are used to
+        calculate the weights. If array-like, represents the weights to use in
+        the fitting.
+
+    Returns
+    -------
+    continuum_model
+        Fitted continuum as a model of whatever class ``model`` provides, or a
+        `~specutils.fitting.FitResults` for multi-dimensional spectra. Its
+        ``n_iterations`` are the numbers of fits done for each spectrum and
+        its ``status`` is 0 for spectra that converged and 1 otherwise.
+    """
+    if (not model.linear or model.n_submodels > 1 or
+            any(model.fixed.values()) or any(model.tied.values())):
+        raise ValueError("Clipped continuum fitting requires a single linear "
+                         "model without fixed or tied parameters.")
+
+    sigma_lower = sigma if sigma_lower is None else sigma_lower
+    sigma_upper = sigma if sigma_upper is None else sigma_upper
+
+    flux = spectrum.flux
+    flux_values, dispersion, x, good, weights = _batch_arrays(
+        spectrum, model, exclude_regions, weights, window)
+    n_fits, n_pixels = flux_values.shape
+
+    ignore_units = getattr(model, model.param_names[0]).unit is None
+    reference_dispersion = dispersion[0] if dispersion.ndim > 1 else dispersion
+    model_unitless, _, _ = _strip_units_from_model(
+        model, _UnitReference(reference_dispersion, flux.unit),
+        convert=not ignore_units)
+
+    good = good & np.isfinite(flux_values)
+
+    # Polynomials are solved on their window. As for the linear fitter, the
+    # domain defaults to the range of the fitted pixels, here over all of the
+    # spectra so that a single model describes every fit. Models with units
+    # can not be evaluated with a domain, so theirs is left unset.
+    if (ignore_units and good.any() and
+            getattr(model_unitless, 'domain', False) is None):
+        model_unitless.domain = [x[good].min(), x[good].max()]
+
+    def design_matrix(values):
+        if hasattr(model_unitless, 'domain'):
+            values = poly_map_domain(values, model_unitless.domain,
+                                     model_unitless.window)
+        matrix = np.asarray(model_unitless.fit_deriv(values,
+                                                     *model_unitless.parameters))
+        return matrix.T if model_unitless.col_fit_deriv else matrix
+
+    if dispersion.ndim > 1:
+        design = np.array([design_matrix(row) for row in x])
+    else:
+        design = design_matrix(x[0])
+        design = np.broadcast_to(design, (n_fits,) + design.shape)
+
+    if weights is None:
+        weights = np.ones(flux_values.shape)
+    weights = np.where(good, weights, 0)
+
+    n_parameters = design.shape[-1]
+    parameters = np.full((n_fits, n_parameters), np.nan)
+    covariance = np.full((n_fits, n_parameters, n_parameters), np.nan)
+    chi2 = np.full(n_fits, np.nan)
+    n_iterations = np.zeros(n_fits, dtype=int)
+    status = np.ones(n_fits, dtype=int)
+
+    # Pixels currently used in the fit of each spectrum, updated in place.
+    used = good.copy()
+    active = np.flatnonzero(used.sum(axis=-1) >= n_parameters)
+
+    for iteration in range(maxiters + 1):
+        #
+        # Solve the weighted normal equations of the active spectra at once.
+        #
+
+        a = design[active]
+        w2 = np.where(used[active], weights[active], 0) ** 2
+        y = np.where(used[active], flux_values[active], 0)
+
+        normal = np.einsum('rp,rpi,rpj->rij', w2, a, a)
+        inverse = np.linalg.pinv(normal)
+        parameters[active] = np.einsum('rij,rj->ri', inverse,
+                                       np.einsum('rp,rpi,rp->ri', w2, a, y))
+        n_iterations[active] += 1
+
+        residuals = flux_values[active] - np.einsum('rpi,ri->rp', a,
+                                                    parameters[active])
+        used_residuals = np.where(used[active], residuals, 0)
+        n_used = used[active].sum(axis=-1)
+        chi2[active] = np.sum(w2 * used_residuals ** 2, axis=-1)
+
+        # Scale by the reduced chi2, as the astropy fitters do.
+        dof = np.maximum(n_used - n_parameters, 1)
+        covariance[active] = inverse * (chi2[active] / dof)[:, np.newaxis, np.newaxis]
+
+        if iteration == maxiters:
+            break
+
+        #
+        # Clip the residuals of each spectrum around zero. Spectra whose mask
+        # does not change have converged, and spectra left with too few
+        # pixels keep their last fit.
+        #
+
+        std = np.sqrt(np.sum(used_residuals ** 2, axis=-1) / n_used)[:, np.newaxis]
+        clipped = good[active] & (residuals >= -sigma_lower * std) & \
+            (residuals <= sigma_upper * std)
+
+        converged = np.all(clipped == used[active], axis=-1)
+        status[active[converged]] = 0
+
+        update = ~converged & (clipped.sum(axis=-1) >= n_parameters)
+        used[active[update]] = clipped[update]
+
+        active = active[update]
+        if active.size == 0:
+            break
+
+    results = FitResults(
+        model_unitless, parameters,
+        uncertainties=np.sqrt(np.diagonal(covariance, axis1=1, axis2=2)),
+        chi2=chi2, n_iterations=n_iterations, status=status,
+        shape=flux.shape[:-1],
+        units=_parameter_units(model, model_unitless.param_names,
+                               dispersion.unit, flux.unit, ignore_units),
+        input_model=model, spectral_axis=dispersion, flux_unit=flux.unit)
+
+    if flux.ndim == 1:
+        return results[0]
+
+    return results
@@ -1,11 +1,10 @@
-import itertools
 import logging
 import operator
 
 import numpy as np
 from astropy.modeling import fitting, Model, models
+from astropy.nddata import StdDevUncertainty
 from astropy.table import QTable
-from scipy.signal import convolve
 
 
 import astropy.units as u
@@ -14,11 +13,12 @@ from ..spectra.spectral_region import SpectralRegion
 from ..spectra.spectrum1d import Spectrum1D
 from ..utils import QuantityModel
 from ..analysis import fwhm, gaussian_sigma_width, centroid, warn_continuum_below_threshold
-from ..manipulation import extract_region, noise_region_uncertainty
+from ..manipulation import noise_region_uncertainty
 from ..manipulation.utils import excise_regions
+from .fitresults import FitResults, _UnitReference, _model_set
 
 __all__ = ['find_lines_threshold', 'find_lines_derivative', 'fit_lines',
-           'estimate_line_parameters']
+           'estimate_line_parameters', 'estimate_line_shapes']
 
 # Define the initial estimators. This are the default methods to use to
 # estimate astropy model parameters. This is based on only a small subset of
@@ -45,6 +45,28 @@ _parameter_estimators = {
     }
 }
 
+# The same estimators for spectra with more than one dimension. Each method
+# takes the table returned by `estimate_line_shapes` and should return a
+# Quantity column with one value per spectrum.
+_parameter_batch_estimators = {
+    'Gaussian1D': {
+        'amplitude': lambda t: t['amplitude'],
+        'mean': lambda t: t['centroid'],
+        'stddev': lambda t: t['sigma']
+    },
+    'Lorentz1D': {
+        'amplitude': lambda t: t['amplitude'],
+        'x_0': lambda t: t['centroid'],
+        'fwhm': lambda t: t['fwhm']
+    },
+    'Voigt1D': {
+        'x_0': lambda t: t['centroid'],
+        'amplitude_L': lambda t: t['amplitude'],
+        'fwhm_L': lambda t: t['fwhm'] / np.sqrt(2),
+        'fwhm_G': lambda t: t['fwhm'] / np.sqrt(2)
+    }
+}
+
 
 def _set_parameter_estimators(model):
     """
@@ -76,9 +98,25 @@ def estimate_line_parameters(spectrum, model):
     Returns
     -------
     model : `~astropy.modeling.Model`
-        Model with parameters estimated.
+        Model with parameters estimated. If the flux of ``spectrum`` has more
+        than one dimension, this is a model set with one model per spectrum
+        (see `estimate_line_shapes`), which can be passed to
+        `~specutils.fitting.fit_lines` to seed the fit of each spectrum.
     """
 
+    if spectrum.flux.ndim > 1:
+        name = model.__class__.__name__
+        if name not in _parameter_batch_estimators:
+            raise Exception('No method to estimate the parameters of '
+                            '{}'.format(name))
+
+        shapes = estimate_line_shapes(spectrum)
+        parameters = {pn: estimator(shapes) for pn, estimator in
+                      _parameter_batch_estimators[name].items()}
+
+        return model.__class__(n_models=len(shapes), name=model.name,
+                               **parameters)
+
     model = _set_parameter_estimators(model)
     # Estimate the parameters based on the estimators already
     # attached to the model
@@ -93,8 +131,155 @@ def estimate_line_parameters(spectrum, model):
     return model
 
 
-def _consecutive(data, stepsize=1):
-    return np.split(data, np.where(np.diff(data) != stepsize)[0]+1)
+def estimate_line_shapes(spectrum):
+    """
+    Estimate the amplitude, centroid, width and full width at half maximum
+    of the line in every spectrum along the last axis of the flux.
+
+    All the spectra are processed at once with array operations. The
+    centroid and width are the first and second moments of the flux, as in
+    `~specutils.analysis.centroid` and
+    `~specutils.analysis.gaussian_sigma_width`, and share the same sums. The
+    full width at half maximum is found as in `~specutils.analysis.fwhm`.
+
+    Parameters
+    ----------
+    spectrum : `~specutils.Spectrum1D` or `~specutils.SpectrumCollection`
+        The spectrum object from which the line shapes are estimated. The
+        spectrum should be continuum subtracted. Masked pixels are excluded.
+
+    Returns
+    -------
+    qtable : `~astropy.table.QTable`
+        Table with one row per spectrum, in the order of the flattened
+        non-spectral dimensions, with the ``amplitude``, ``centroid``,
+        ``sigma`` and ``fwhm`` columns.
+    """
+    flux = spectrum.flux.value
+    n_pixels = flux.shape[-1]
+    flux = flux.reshape(-1, n_pixels)
+
+    spectral_axis = u.Quantity(spectrum.spectral_axis)
+    x = np.broadcast_to(spectral_axis.value.reshape(-1, n_pixels), flux.shape)
+
+    if spectrum.mask is not None:
+        good = ~np.broadcast_to(spectrum.mask, spectrum.flux.shape).reshape(flux.shape)
+    else:
+        good = np.ones(flux.shape, dtype=bool)
+
+    rows = np.arange(flux.shape[0])
+    pixels = np.arange(n_pixels)
+
+    #
+    # First and second moments, sharing the zeroth moment.
+    #
+
+    weights = np.where(good, flux, 0)
+    total = weights.sum(axis=-1)
+    centroids = (weights * x).sum(axis=-1) / total
+    dx = x - centroids[:, np.newaxis]
+    sigmas = np.sqrt((weights * dx * dx).sum(axis=-1) / total)
+
+    #
+    # Peak and the closest points below half of it on either side, using
+    # two-point linear interpolation to achieve sub-pixel precision.
+    #
+
+    argmax = np.where(good, flux, -np.inf).argmax(axis=-1)
+    amplitudes = flux[rows, argmax]
+    below = flux < (amplitudes / 2)[:, np.newaxis]
+
+    def crossing(i0, outside, edge):
+        i0 = np.clip(i0, 0, n_pixels - 2)
+        i1 = i0 + 1
+        f0, f1 = flux[rows, i0], flux[rows, i1]
+        x0, x1 = x[rows, i0], x[rows, i1]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            value = (amplitudes / 2 - f0) * (x1 - x0) / (f1 - f0) + x0
+        return np.where(outside, x[rows, edge], value)
+
+    left = np.where(below & (pixels < argmax[:, np.newaxis]),
+                    pixels, -1).max(axis=-1)
+    right = np.where(below & (pixels > argmax[:, np.newaxis]),
+                     pixels, n_pixels).min(axis=-1)
+
+    left_values = crossing(left, left < 0, 0)
+    right_values = crossing(right - 1, right == n_pixels, -1)
+
+    qtable = QTable()
+    qtable['amplitude'] = amplitudes * spectrum.flux.unit
+    qtable['centroid'] = centroids * spectral_axis.unit
+    qtable['sigma'] = sigmas * spectral_axis.unit
+    qtable['fwhm'] = np.abs(right_values - left_values) * spectral_axis.unit
+
+    return qtable
+
+
+def _run_extrema(values, selected, ufunc):
+    """
+    Find the extremum of every run of consecutive ``selected`` pixels along
+    the last axis of the two dimensional ``values`` array. ``ufunc`` is
+    `numpy.maximum` or `numpy.minimum`.
+
+    Returns the row and column indices of the first pixel of each run
+    that reaches the extremum, ordered by row and then by column.
+    """
+    n_rows, n_pixels = selected.shape
+
+    # Pad every row with an unselected pixel so that runs cannot continue
+    # from the end of one row onto the start of the next.
+    padded = np.zeros((n_rows, n_pixels + 1), dtype=bool)
+    padded[:, :-1] = selected
+    inds = np.flatnonzero(padded)
+
+    if inds.size == 0:
+        return np.array([], dtype=int), np.array([], dtype=int)
+
+    rows, cols = np.divmod(inds, n_pixels + 1)
+    run_values = values[rows, cols]
+
+    starts = np.flatnonzero(np.diff(inds) != 1) + 1
+    starts = np.concatenate([[0], starts])
+    extrema = ufunc.reduceat(run_values, starts)
+
+    run_ids = np.repeat(np.arange(starts.size),
+                        np.diff(np.append(starts, inds.size)))
+    at_extremum = np.flatnonzero(run_values == extrema[run_ids])
+    _, first = np.unique(run_ids[at_extremum], return_index=True)
+    picks = at_extremum[first]
+
+    return rows[picks], cols[picks]
+
+
+def _lines_table(spectrum, emission, absorption):
+    """
+    Build the table of lines returned by the line finders from the row and
+    column indices of the emission and absorption lines.
+    """
+    rows = np.concatenate([emission[0], absorption[0]])
+    cols = np.concatenate([emission[1], absorption[1]])
+    line_type = np.array(['emission'] * len(emission[0]) +
+                         ['absorption'] * len(absorption[0]), dtype='U10')
+
+    # Emission lines first and then absorption lines, for each spectrum.
+    order = np.lexsort([cols, np.arange(rows.size) >= len(emission[0]), rows])
+    rows, cols, line_type = rows[order], cols[order], line_type[order]
+
+    spectral_axis = u.Quantity(spectrum.spectral_axis)
+    if spectral_axis.ndim > 1:
+        spectral_axis = spectral_axis.reshape(-1, spectral_axis.shape[-1])
+        line_center = spectral_axis[rows, cols]
+    else:
+        line_center = spectral_axis[cols]
+
+    qtable = QTable()
+    if spectrum.flux.ndim > 1:
+        qtable['spectrum_index'] = rows
+    qtable['line_center'] = line_center
+    qtable['line_type'] = line_type
+    qtable['line_center_index'] = cols
+
+    return qtable
 
 
 @warn_continuum_below_threshold(threshold=0.01)
@@ -111,8 +296,9 @@ def find_lines_threshold(spectrum, noise_factor=1):
 
     Parameters
     ----------
-    spectrum : `~specutils.Spectrum1D`
-        The spectrum object in which the lines will be found.
+    spectrum : `~specutils.Spectrum1D` or `~specutils.SpectrumCollection`
+        The spectrum object in which the lines will be found. Every spectrum
+        along the last axis of the flux is searched.
 
     noise_factor : float
        ``noise_factor`` multiplied by the spectrum's``uncertainty``, used for
@@ -123,52 +309,23 @@ def find_lines_threshold(spectrum, noise_factor=1):
     qtable: `~astropy.table.QTable`
         Table of emission and absorption lines. Line center (``line_center``),
         line type (``line_type``) and index of line center
-        (``line_center_index``) are stored for each line.
+        (``line_center_index``) are stored for each line. If the flux has
+        more than one dimension, the lines of all the spectra are returned
+        in the same table and a ``spectrum_index`` column gives the index of
+        the spectrum in the flattened non-spectral dimensions.
     """
 
     # Threshold based on noise estimate and factor.
-    uncertainty = spectrum.uncertainty
-    inds = np.where(np.abs(spectrum.flux) > (noise_factor*uncertainty.array) *
-                    spectrum.flux.unit)[0]
-    pos_inds = inds[spectrum.flux.value[inds] > 0]
-    line_inds_grouped = _consecutive(pos_inds, stepsize=1)
-
-    if len(line_inds_grouped[0]) > 0:
-        emission_inds = [inds[np.argmax(spectrum.flux.value[inds])]
-                         for inds in line_inds_grouped]
-    else:
-        emission_inds = []
+    flux = spectrum.flux.value
+    flux = flux.reshape(-1, flux.shape[-1])
+    uncertainty = spectrum.uncertainty.array.reshape(flux.shape)
+    above = np.abs(flux) > noise_factor * uncertainty
 
-    #
-    # Find the absorption lines
-    #
-
-    neg_inds = inds[spectrum.flux.value[inds] < 0]
-    line_inds_grouped = _consecutive(neg_inds, stepsize=1)
-
-    if len(line_inds_grouped[0]) > 0:
-        absorption_inds = [inds[np.argmin(spectrum.flux.value[inds])]
-                           for inds in line_inds_grouped]
-    else:
-        absorption_inds = []
-
-    #
-    # Create the QTable to return the lines
-    #
-
-    qtable = QTable()
-    qtable['line_center'] = list(
-        itertools.chain(
-            *[spectrum.spectral_axis.value[emission_inds],
-              spectrum.spectral_axis.value[absorption_inds]]
-        )) * spectrum.spectral_axis.unit
-    qtable['line_type'] = ['emission'] * len(emission_inds) + \
-                          ['absorption'] * len(absorption_inds)
-    qtable['line_center_index'] = list(
-        itertools.chain(
-            *[emission_inds, absorption_inds]))
+    # Group consecutive pixels and find the extremum of each group.
+    emission = _run_extrema(flux, above & (flux > 0), np.maximum)
+    absorption = _run_extrema(flux, above & (flux < 0), np.minimum)
 
-    return qtable
+    return _lines_table(spectrum, emission, absorption)
 
 
 @warn_continuum_below_threshold(threshold=0.01)
@@ -180,8 +337,9 @@ def find_lines_derivative(spectrum, flux_threshold=None):
 
     Parameters
     ----------
-    spectrum : Spectrum1D
-        The spectrum object over which the equivalent width will be calculated.
+    spectrum : `~specutils.Spectrum1D` or `~specutils.SpectrumCollection`
+        The spectrum object in which the lines will be found. Every spectrum
+        along the last axis of the flux is searched.
     flux_threshold : float, `~astropy.units.Quantity` or None
         The threshold a pixel must be above to be considered part of a line. If
         a float, will assume the same units as ``spectrum.flux``. This
@@ -194,83 +352,54 @@ def find_lines_derivative(spectrum, flux_threshold=None):
     qtable: `~astropy.table.QTable`
         Table of emission and absorption lines. Line center (``line_center``),
         line type (``line_type``) and index of line center
-        (``line_center_index``) are stored for each line.
+        (``line_center_index``) are stored for each line. If the flux has
+        more than one dimension, the lines of all the spectra are returned
+        in the same table and a ``spectrum_index`` column gives the index of
+        the spectrum in the flattened non-spectral dimensions.
     """
 
-    # Take the derivative to find the zero crossings which correspond to
-    # the peaks (positive or negative)
-    kernel = [1, 0, -1]
-    dY = convolve(spectrum.flux, kernel, 'valid')
-
-    # Use sign flipping to determine direction of change
-    S = np.sign(dY)
-    ddS = convolve(S, kernel, 'valid')
-
     # Add units if needed.
     if flux_threshold is not None and isinstance(flux_threshold, (int, float)):
         flux_threshold = float(flux_threshold) * spectrum.flux.unit
 
-    #
-    # Emmision lines
-    #
-
-    # Find all the indices that appear to be part of a +ve peak
-    candidates = np.where(dY > 0)[0] + (len(kernel) - 1)
-    line_inds = sorted(set(candidates).intersection(np.where(ddS == -2)[0] + 1))
+    flux = spectrum.flux.value
+    flux = flux.reshape(-1, flux.shape[-1])
+    n_pixels = flux.shape[-1]
 
-    if flux_threshold is not None:
-        line_inds = np.array(line_inds)[spectrum.flux[line_inds] > flux_threshold]
-
-    # Now group them and find the max highest point.
-    line_inds_grouped = _consecutive(line_inds, stepsize=1)
+    emission_candidates = np.zeros(flux.shape, dtype=bool)
+    absorption_candidates = np.zeros(flux.shape, dtype=bool)
 
-    if len(line_inds_grouped[0]) > 0:
-        emission_inds = [inds[np.argmax(spectrum.flux[inds])]
-                         for inds in line_inds_grouped]
-    else:
-        emission_inds = []
+    if n_pixels > 5:
+        # Take the derivative to find the zero crossings which correspond to
+        # the peaks (positive or negative), dY[i] is centered on pixel i + 1
+        dY = flux[:, 2:] - flux[:, :-2]
 
-    #
-    # Absorption lines
-    #
+        # Use sign flipping to determine direction of change, ddS[i] is
+        # centered on pixel i + 2
+        S = np.sign(dY)
+        ddS = S[:, 2:] - S[:, :-2]
 
-    # Find all the indices that appear to be part of a -ve peak
-    candidates = np.where(dY < 0)[0] + (len(kernel) - 1)
-    line_inds = sorted(set(candidates).intersection(np.where(ddS == 2)[0] + 1))
+        # Pixel i is part of a +ve (-ve) peak if the flux is increasing
+        # (decreasing) towards it and the sign of the derivative flips at
+        # pixel i - 1.
+        emission_candidates[:, 2:-3] = (dY[:, :-3] > 0) & (ddS[:, 1:] == -2)
+        absorption_candidates[:, 2:-3] = (dY[:, :-3] < 0) & (ddS[:, 1:] == 2)
 
     if flux_threshold is not None:
-        line_inds = np.array(line_inds)[spectrum.flux[line_inds] < -flux_threshold]
+        flux_threshold = flux_threshold.to_value(spectrum.flux.unit)
+        emission_candidates &= flux > flux_threshold
+        absorption_candidates &= flux < -flux_threshold
 
     # Now group them and find the max highest point.
-    line_inds_grouped = _consecutive(line_inds, stepsize=1)
+    emission = _run_extrema(flux, emission_candidates, np.maximum)
+    absorption = _run_extrema(flux, absorption_candidates, np.minimum)
 
-    if len(line_inds_grouped[0]) > 0:
-        absorption_inds = [inds[np.argmin(spectrum.flux[inds])] for inds in
-                           line_inds_grouped]
-    else:
-        absorption_inds = []
-
-    #
-    # Create the QTable to return the lines
-    #
-
-    qtable = QTable()
-    qtable['line_center'] = list(
-        itertools.chain(
-            *[spectrum.spectral_axis.value[emission_inds],
-              spectrum.spectral_axis.value[absorption_inds]]
-        )) * spectrum.spectral_axis.unit
-    qtable['line_type'] = ['emission'] * len(emission_inds) + \
-                          ['absorption'] * len(absorption_inds)
-    qtable['line_center_index'] = list(
-        itertools.chain(
-            *[emission_inds, absorption_inds]))
-
-    return qtable
+    return _lines_table(spectrum, emission, absorption)
 
 
 def fit_lines(spectrum, model, fitter=fitting.LevMarLSQFitter(),
               exclude_regions=None, weights=None, window=None,
+              n_bootstrap=None, seed=None, percentiles=(16, 50, 84),
               **kwargs):
     """
     Fit the input models to the spectrum. The parameter values of the
@@ -281,7 +410,10 @@ def fit_lines(spectrum, model, fitter=fitting.LevMarLSQFitter(),
     spectrum : Spectrum1D
         The spectrum object over which the equivalent width will be calculated.
     model: `~astropy.modeling.Model` or list of `~astropy.modeling.Model`
-        The model or list of models that contain the initial guess.
+        The model or list of models that contain the initial guess. When
+        fitting a multi-dimensional flux array, this can also be a model set
+        with one model (initial guess) per spectrum, such as the one returned
+        by `~specutils.fitting.estimate_line_parameters`.
     fitter : `~astropy.modeling.fitting.Fitter`, optional
         Fitter instance to be used when fitting model to spectrum.
     exclude_regions : list of `~specutils.SpectralRegion`
@@ -295,13 +427,35 @@ def fit_lines(spectrum, model, fitter=fitting.LevMarLSQFitter(),
     window : `~specutils.SpectralRegion` or list of `~specutils.SpectralRegion`
         Regions of the spectrum to use in the fitting. If None, then the
         whole spectrum will be used in the fitting.
+    n_bootstrap : int, optional
+        If given, also estimate the uncertainties of the parameters by
+        fitting ``n_bootstrap`` realizations of the spectrum, with the flux
+        perturbed by Gaussian noise drawn from the spectrum's uncertainty.
+        The realizations are drawn at once and fit as a multi-dimensional
+        spectrum: single linear models fit with
+        `~astropy.modeling.fitting.LinearLSQFitter` are solved for all of
+        them at once, while other fitters loop over the realizations. Only
+        supported for one dimensional spectra.
+    seed : int or `~numpy.random.Generator`, optional
+        Seed of the random draws of the bootstrap realizations, for
+        reproducible results.
+    percentiles : sequence of float, optional
+        The percentiles of the bootstrap parameter distributions to return.
     Additional keyword arguments are passed directly into the call to the
     ``fitter``.
 
     Returns
     -------
-    models : Compound model of `~astropy.modeling.Model`
-        A compound model of models with fitted parameters.
+    models : Compound model of `~astropy.modeling.Model` or `~specutils.fitting.FitResults`
+        A compound model of models with fitted parameters. If the flux of
+        ``spectrum`` has more than one dimension (e.g. a spectral cube or a
+        `~specutils.SpectrumCollection`), each spectrum along the last axis
+        is fit separately and a `~specutils.fitting.FitResults` is returned
+        for each model instead. If ``n_bootstrap`` is given, a tuple of the
+        fitted model and a `~astropy.table.QTable` of the ``percentiles`` of
+        the parameters over the realizations (see
+        `~specutils.fitting.FitResults.percentiles`) is returned for each
+        model.
 
     Notes
     -----
@@ -311,11 +465,22 @@ def fit_lines(spectrum, model, fitter=fitting.LevMarLSQFitter(),
           together and passed as a compound model to the
           `~astropy.modeling.fitting.Fitter` class instance.
     """
+    #
+    # Multi-dimensional flux is fit one spectrum at a time, with the excluded
+    # regions and windows applied as masks so every row keeps its shape.
+    #
+
+    batch = spectrum.flux.ndim > 1
+
+    if n_bootstrap is not None and batch:
+        raise ValueError("Bootstrap uncertainties are only supported for one "
+                         "dimensional spectra.")
+
     #
     # If we are to exclude certain regions, then remove them.
     #
 
-    if exclude_regions is not None:
+    if exclude_regions is not None and not batch:
         spectrum = excise_regions(spectrum, exclude_regions)
 
     #
@@ -359,12 +524,26 @@ def fit_lines(spectrum, model, fitter=fitting.LevMarLSQFitter(),
 
         ignore_units = getattr(model_guess, model_guess.param_names[0]).unit is None
 
+        if batch:
+            fitted_models.append(
+                _fit_lines_batch(spectrum, model_guess, fitter,
+                                 exclude_regions, weights, model_window,
+                                 ignore_units, **kwargs))
+            continue
+
         fit_model = _fit_lines(spectrum, model_guess, fitter,
                                exclude_regions, weights, model_window,
                                ignore_units, **kwargs)
         if model_guess.name is not None:
             fit_model.name = model_guess.name
 
+        if n_bootstrap is not None:
+            realizations = _bootstrap_lines(spectrum, model_guess, n_bootstrap,
+                                            seed, fitter, weights,
+                                            model_window, ignore_units,
+                                            **kwargs)
+            fit_model = (fit_model, realizations.percentiles(percentiles))
+
         fitted_models.append(fit_model)
 
     if single_model_in:
@@ -446,24 +625,9 @@ def _fit_lines(spectrum, model, fitter=fitting.LevMarLSQFitter(),
         if idx1 == idx2:
             raise IndexError("Tried to fit a region containing no pixels.")
 
-        # HACK WARNING! This uses the extract machinery to create a set of
-        # indices by making an "index spectrum"
-        # note that any unit will do but Jy is at least flux-y
-        # TODO: really the spectral region machinery should have the power
-        # to create a mask, and we'd just use that...
-        idxarr = np.arange(spectrum.flux.size).reshape(spectrum.flux.shape)
-        index_spectrum = Spectrum1D(spectral_axis=spectrum.spectral_axis,
-                                    flux=u.Quantity(idxarr, u.Jy, dtype=int))
-
-        extracted_regions = extract_region(index_spectrum, window)
-        if isinstance(extracted_regions, list):
-            if len(extracted_regions) == 0:
-                raise ValueError('The whole spectrum is windowed out!')
-            window_indices = np.concatenate([s.flux.value.astype(int) for s in extracted_regions])
-        else:
-            if len(extracted_regions.flux) == 0:
-                raise ValueError('The whole spectrum is windowed out!')
-            window_indices = extracted_regions.flux.value.astype(int)
+        window_indices = window.to_indices(spectrum.spectral_axis)
+        if len(window_indices) == 0:
+            raise ValueError('The whole spectrum is windowed out!')
 
     if window_indices is not None:
         dispersion = dispersion[window_indices]
@@ -481,7 +645,6 @@ def _fit_lines(spectrum, model, fitter=fitting.LevMarLSQFitter(),
     spectrum = Spectrum1D(
         flux=flux.value * flux_unit,
         spectral_axis=dispersion,
-        wcs=input_spectrum.wcs,
         velocity_convention=input_spectrum.velocity_convention,
         rest_value=input_spectrum.rest_value)
 
@@ -522,6 +685,289 @@ def _fit_lines(spectrum, model, fitter=fitting.LevMarLSQFitter(),
     return fit_model
 
 
+def _bootstrap_lines(spectrum, model, n_bootstrap, seed=None,
+                     fitter=fitting.LevMarLSQFitter(), weights=None,
+                     window=None, ignore_units=False, **kwargs):
+    """
+    Fit the input model to ``n_bootstrap`` realizations of the spectrum, with
+    Gaussian noise drawn from its uncertainty added to the flux. All the
+    realizations are drawn at once and fit as a multi-dimensional spectrum
+    by `_fit_lines_batch`, which loops over them for nonlinear fitters.
+
+    spectrum, model -> FitResults
+    """
+    if spectrum.uncertainty is None:
+        raise ValueError("The spectrum must have an uncertainty to draw the "
+                         "bootstrap realizations.")
+
+    sigma = spectrum.uncertainty.represent_as(StdDevUncertainty).array
+
+    rng = np.random.default_rng(seed)
+    flux = spectrum.flux.value + \
+        rng.standard_normal((n_bootstrap,) + spectrum.flux.shape) * sigma
+
+    # The weights do not change between realizations.
+    if isinstance(weights, str) and weights == 'unc':
+        weights = sigma ** -1
+
+    realizations = Spectrum1D(
+        flux=flux * spectrum.flux.unit,
+        spectral_axis=spectrum.spectral_axis,
+        mask=None if spectrum.mask is None else
+        np.broadcast_to(spectrum.mask, flux.shape).copy())
+
+    return _fit_lines_batch(realizations, model, fitter, None, weights,
+                            window, ignore_units, **kwargs)
+
+
+def _window_mask(spectral_axis, model, exclude_regions=None, window=None):
+    """
+    Boolean mask of the pixels of a one dimensional ``spectral_axis`` that
+    are used in the fit, following the same ``exclude_regions`` and
+    ``window`` conventions as `_fit_lines`.
+    """
+    keep = np.ones(spectral_axis.shape, dtype=bool)
+
+    if exclude_regions is not None:
+        if isinstance(exclude_regions, SpectralRegion):
+            exclude_regions = [exclude_regions]
+        for region in exclude_regions:
+            keep &= ~region.to_mask(spectral_axis)
+
+    if window is not None and isinstance(window, (float, int)):
+        center = model.mean
+        keep &= (spectral_axis >= center-window) & (spectral_axis < center+window)
+
+    elif window is not None and isinstance(window, tuple):
+        keep &= (spectral_axis >= window[0]) & (spectral_axis <= window[1])
+
+    elif window is not None and isinstance(window, SpectralRegion):
+        idx1, idx2 = window.bounds
+        if idx1 == idx2:
+            raise IndexError("Tried to fit a region containing no pixels.")
+
+        keep &= window.to_mask(spectral_axis)
+
+    return keep
+
+
+def _batch_arrays(spectrum, model, exclude_regions=None, weights=None,
+                  window=None):
+    """
+    Flatten a multi-dimensional spectrum into the two dimensional arrays
+    used to fit every spectrum along its last axis.
+
+    Returns the flux values, the spectral axis (one dimensional if it is
+    shared by all the spectra), its values broadcast to the flux, the mask
+    of the pixels to fit and the weights (or None), all with one row per
+    spectrum.
+    """
+    flux = spectrum.flux
+    n_pixels = flux.shape[-1]
+    flux_values = flux.value.reshape(-1, n_pixels)
+
+    # A single spectral axis shared by all the spectra (e.g. a cube), or one
+    # spectral axis per spectrum (e.g. a SpectrumCollection).
+    dispersion = u.Quantity(spectrum.spectral_axis)
+    if dispersion.ndim > 1:
+        dispersion = dispersion.reshape(-1, n_pixels)
+        dispersion_values = dispersion.value
+        good = np.array([_window_mask(d, model, exclude_regions, window)
+                         for d in dispersion])
+    else:
+        dispersion_values = np.broadcast_to(dispersion.value, flux_values.shape)
+        good = np.broadcast_to(
+            _window_mask(dispersion, model, exclude_regions, window),
+            flux_values.shape)
+
+    if spectrum.mask is not None:
+        good = good & ~np.broadcast_to(spectrum.mask, flux.shape).reshape(-1, n_pixels)
+
+    if isinstance(weights, str):
+        if weights == 'unc':
+            uncerts = spectrum.uncertainty
+
+            # Astropy fitters expect weights in 1/sigma
+            if uncerts is not None:
+                weights = uncerts.array ** -1
+            else:
+                weights = None
+                logging.warning("Uncertainty values are not defined, but are "
+                                "trying to be used in model fitting.")
+        else:
+            raise ValueError("Unrecognized value `%s` in keyword argument.",
+                             weights)
+
+    if weights is not None:
+        weights = np.broadcast_to(np.asarray(weights),
+                                  flux.shape).reshape(-1, n_pixels)
+
+    return flux_values, dispersion, dispersion_values, good, weights
+
+
+def _parameter_units(model, param_names, dispersion_unit, flux_unit,
+                     ignore_units=False):
+    """
+    The unit of each fitted parameter in a batch fit. The parameters are in
+    the spectrum units, work out which one applies to each parameter from
+    the input model.
+    """
+    units = []
+    for pn in param_names:
+        param = getattr(model, pn)
+        if ignore_units or param.unit is None:
+            units.append(None)
+        elif param.unit.is_equivalent(dispersion_unit,
+                                      equivalencies=u.spectral()):
+            units.append(dispersion_unit)
+        else:
+            units.append(flux_unit)
+
+    return units
+
+
+def _fit_lines_batch(spectrum, model, fitter=fitting.LevMarLSQFitter(),
+                     exclude_regions=None, weights=None, window=None,
+                     ignore_units=False, **kwargs):
+    """
+    Fit the input model (initial conditions) separately to every spectrum of
+    a multi-dimensional flux array. The units are stripped from the model
+    once and the same unitless initial guess is used for every spectrum.
+    Single linear models fit with `~astropy.modeling.fitting.LinearLSQFitter`
+    on a shared spectral axis are solved for all the spectra at once as a
+    model set; otherwise the fitter is called for each spectrum in turn.
+
+    spectrum, model -> FitResults
+    """
+    flux = spectrum.flux
+    shape = flux.shape[:-1]
+
+    flux_values, dispersion, dispersion_values, good, weights = \
+        _batch_arrays(spectrum, model, exclude_regions, weights, window)
+    n_fits = flux_values.shape[0]
+    reference_dispersion = dispersion[0] if dispersion.ndim > 1 else dispersion
+
+    #
+    # Strip the units once. The initial guess is the same for every spectrum,
+    # unless a model set with one model per spectrum is given (e.g. from
+    # `estimate_line_parameters`).
+    #
+
+    initial_parameters = None
+    if len(model) > 1:
+        if len(model) != n_fits:
+            raise ValueError("The model set has {} models but there are {} "
+                             "spectra to fit.".format(len(model), n_fits))
+
+        initial_parameters = np.column_stack([
+            np.broadcast_to(_convert_and_dequantify(
+                getattr(model, pn), dispersion.unit, reference_dispersion,
+                flux.unit, convert=not ignore_units), n_fits)
+            for pn in model.param_names])
+        model = _model_set_member(model, 0)
+
+    model_unitless, _, _ = _strip_units_from_model(
+        model, _UnitReference(reference_dispersion, flux.unit),
+        convert=not ignore_units)
+
+    # The linear fitter sets the domain of polynomials from the data it is
+    # given. Fix it from all the spectra instead, so that the same template
+    # describes every fit.
+    linear_fitter = isinstance(fitter, fitting.LinearLSQFitter)
+    if (linear_fitter and good.any() and
+            getattr(model_unitless, 'domain', False) is None):
+        used = dispersion_values[good]
+        model_unitless.domain = [used.min(), used.max()]
+
+    # The fitters only report the covariance of the free parameters.
+    free = np.array([not (model_unitless.fixed[pn] or model_unitless.tied[pn])
+                     for pn in model_unitless.param_names])
+
+    parameters = np.full((n_fits, len(model_unitless.parameters)), np.nan)
+    uncertainties = np.full(parameters.shape, np.nan)
+    chi2 = np.full(n_fits, np.nan)
+    n_iterations = np.full(n_fits, -1, dtype=int)
+    status = np.full(n_fits, -1, dtype=int)
+
+    #
+    # Linear models sharing a spectral axis are solved for all the spectra at
+    # once, fitting a model set to the (masked) flux array.
+    #
+
+    if (linear_fitter and model_unitless.n_submodels == 1 and
+            dispersion.ndim == 1 and good.any(axis=-1).all()):
+        model_set = _model_set(model_unitless,
+                               np.tile(model_unitless.parameters, (n_fits, 1)))
+        y = flux_values if good.all() else np.ma.MaskedArray(flux_values,
+                                                              mask=~good)
+        fit_set = fitter(model_set, dispersion.value, y, weights=weights,
+                         **kwargs)
+
+        parameters = np.column_stack([getattr(fit_set, pn).value
+                                      for pn in fit_set.param_names])
+
+        residuals = flux_values - fit_set(dispersion.value, model_set_axis=False)
+        if weights is not None:
+            residuals = residuals * weights
+        chi2 = np.sum(np.where(good, residuals, 0) ** 2, axis=-1)
+    else:
+        for i in range(n_fits):
+            keep = good[i]
+            if not keep.any():
+                continue
+
+            x = dispersion_values[i, keep]
+            y = flux_values[i, keep]
+            w = None if weights is None else weights[i, keep]
+
+            if initial_parameters is not None:
+                model_unitless.parameters = initial_parameters[i]
+
+            fit_model = fitter(model_unitless, x, y, weights=w, **kwargs)
+            parameters[i] = fit_model.parameters
+
+            residuals = y - fit_model(x)
+            if w is not None:
+                residuals = residuals * w
+            chi2[i] = np.sum(residuals ** 2)
+
+            fit_info = getattr(fitter, 'fit_info', None) or {}
+            n_iterations[i] = fit_info.get('nfev', -1)
+            status[i] = fit_info.get('ierr', -1)
+
+            param_cov = fit_info.get('param_cov')
+            if param_cov is not None:
+                uncertainties[i, free] = np.sqrt(np.diag(param_cov))
+
+    units = _parameter_units(model, model_unitless.param_names,
+                             dispersion.unit, flux.unit, ignore_units)
+
+    return FitResults(model_unitless, parameters, uncertainties=uncertainties,
+                      chi2=chi2, n_iterations=n_iterations, status=status,
+                      shape=shape, units=units, input_model=model,
+                      spectral_axis=dispersion, flux_unit=flux.unit)
+
+
+def _model_set_member(model, index):
+    """
+    Return the model at ``index`` of the model set ``model`` as a single
+    model, keeping the units and constraints of the parameters.
+    """
+    parameters = {}
+    for pn in model.param_names:
+        param = getattr(model, pn)
+        value = param.quantity if param.unit is not None else param.value
+        parameters[pn] = value[index]
+
+    constraints = {c: dict(getattr(model, c)) for c in ('fixed', 'tied', 'bounds')}
+
+    if isinstance(model, models.PolynomialModel):
+        return model.__class__(model.degree, name=model.name,
+                               **parameters, **constraints)
+
+    return model.__class__(name=model.name, **parameters, **constraints)
+
+
 def _convert(quantity, dispersion_unit, dispersion, flux_unit):
     """
     Convert the quantity to the spectrum's units, and then we will use
@@ -0,0 +1,296 @@
+"""
+Columnar storage for the results of fitting a model to many spectra.
+"""
+
+import numpy as np
+import astropy.units as u
+from astropy.modeling import models
+from astropy.table import QTable
+
+from ..utils import QuantityModel
+
+__all__ = ['FitResults']
+
+
+class FitResults:
+    """
+    Container for the results of fitting the same model to many spectra.
+
+    The fitted parameters, their standard errors and the fit statistics are
+    held as contiguous `~numpy.ndarray` columns with one row per spectrum.
+    `~astropy.modeling.Model` instances are only created on demand, when a
+    row is indexed or iterated over.
+
+    Parameters
+    ----------
+    model : `~astropy.modeling.Model`
+        The unitless model that was fit. Its parameter values are ignored and
+        replaced by the values of each row when a model is materialized.
+    parameters : `~numpy.ndarray`
+        Fitted parameter values, with shape ``(n_spectra, n_parameters)``, in
+        the spectral axis and flux units of the spectra that were fit.
+    uncertainties : `~numpy.ndarray`, optional
+        Standard errors of the parameters, same shape as ``parameters``. NaN
+        where the fitter does not provide a covariance or the parameter was
+        fixed or tied.
+    chi2 : `~numpy.ndarray`, optional
+        The (weighted) sum of squared residuals of each fit.
+    n_iterations : `~numpy.ndarray`, optional
+        Number of function evaluations used by each fit, or -1 if unknown.
+    status : `~numpy.ndarray`, optional
+        Status flag returned by the fitter for each fit, or -1 if unknown.
+    shape : tuple, optional
+        Shape of the non-spectral dimensions of the input flux. Defaults to
+        ``(n_spectra,)``.
+    units : list, optional
+        The unit of each parameter, or `None` for unitless parameters.
+    input_model : `~astropy.modeling.Model`, optional
+        The model (with units) that was passed in for fitting. Used to convert
+        materialized models back to the units of the input model.
+    spectral_axis : `~astropy.units.Quantity`, optional
+        Spectral axis of the fitted spectra, used for unit conversions when
+        materializing models. Either shared by all the spectra or with one
+        row per spectrum.
+    flux_unit : `~astropy.units.Unit`, optional
+        Flux unit of the fitted spectra.
+    """
+    def __init__(self, model, parameters, uncertainties=None, chi2=None,
+                 n_iterations=None, status=None, shape=None, units=None,
+                 input_model=None, spectral_axis=None, flux_unit=None):
+        parameters = np.ascontiguousarray(parameters, dtype=float)
+        n_fits = parameters.shape[0]
+
+        if uncertainties is None:
+            uncertainties = np.full(parameters.shape, np.nan)
+        if chi2 is None:
+            chi2 = np.full(n_fits, np.nan)
+        if n_iterations is None:
+            n_iterations = np.full(n_fits, -1, dtype=int)
+        if status is None:
+            status = np.full(n_fits, -1, dtype=int)
+
+        self._model = model
+        self._parameters = parameters
+        self._uncertainties = np.ascontiguousarray(uncertainties, dtype=float)
+        self._chi2 = np.asarray(chi2, dtype=float)
+        self._n_iterations = np.asarray(n_iterations, dtype=int)
+        self._status = np.asarray(status, dtype=int)
+        self._shape = (n_fits,) if shape is None else tuple(shape)
+        self._units = [None] * parameters.shape[1] if units is None else list(units)
+        self._input_model = input_model
+        self._spectral_axis = spectral_axis
+        self._flux_unit = flux_unit
+
+    @property
+    def param_names(self):
+        """The names of the model parameters, one per column."""
+        return self._model.param_names
+
+    @property
+    def parameters(self):
+        """Fitted parameter values, shape ``(n_spectra, n_parameters)``."""
+        return self._parameters
+
+    @property
+    def uncertainties(self):
+        """Standard errors of the parameters, same shape as ``parameters``."""
+        return self._uncertainties
+
+    @property
+    def chi2(self):
+        """The (weighted) sum of squared residuals of each fit."""
+        return self._chi2
+
+    @property
+    def n_iterations(self):
+        """Number of function evaluations used by each fit."""
+        return self._n_iterations
+
+    @property
+    def status(self):
+        """Status flag returned by the fitter for each fit."""
+        return self._status
+
+    @property
+    def shape(self):
+        """Shape of the non-spectral dimensions of the fitted flux."""
+        return self._shape
+
+    def __len__(self):
+        return self._parameters.shape[0]
+
+    def __getitem__(self, index):
+        """
+        Materialize the fitted `~astropy.modeling.Model` of one spectrum.
+        Tuples are interpreted as indices into ``shape``.
+        """
+        if isinstance(index, tuple):
+            index = np.ravel_multi_index(index, self._shape)
+
+        model = self._model.copy()
+        model.parameters = self._parameters[index]
+
+        if self._input_model is None:
+            return model
+
+        spectral_axis = self._spectral_axis
+        if spectral_axis.ndim > 1:
+            spectral_axis = spectral_axis[index]
+
+        # Models given without units are wrapped as in `fit_lines`.
+        input_model = self._input_model
+        if getattr(input_model, input_model.param_names[0]).unit is None:
+            return QuantityModel(model, spectral_axis.unit, self._flux_unit)
+
+        # Avoid a circular import, fitmodels uses this class.
+        from .fitmodels import _add_units_to_model
+
+        return _add_units_to_model(model, input_model,
+                                   _UnitReference(spectral_axis,
+                                                  self._flux_unit))
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def __repr__(self):
+        return "<FitResults(model={}, n_fits={})>".format(
+            self._model.__class__.__name__, len(self))
+
+    def evaluate(self):
+        """
+        Evaluate the fitted models of all the spectra on their spectral axis.
+
+        Returns
+        -------
+        flux : `~astropy.units.Quantity`
+            The evaluated models, with the shape of the fitted flux and in its
+            unit.
+        """
+        if self._spectral_axis is None:
+            raise ValueError("The spectral axis of the fitted spectra is not "
+                             "known.")
+
+        x = self._spectral_axis.value
+
+        if self._model.n_submodels == 1:
+            model_set = _model_set(self._model, self._parameters)
+            if x.ndim > 1:
+                values = model_set(x)
+            else:
+                values = model_set(x, model_set_axis=False)
+        else:
+            model = self._model.copy()
+            x = np.broadcast_to(x, (len(self), x.shape[-1]))
+            values = np.empty(x.shape)
+            for i, parameters in enumerate(self._parameters):
+                model.parameters = parameters
+                values[i] = model(x[i])
+
+        return u.Quantity(values.reshape(self._shape + (x.shape[-1],)),
+                          self._flux_unit, copy=False)
+
+    def parameter(self, name):
+        """
+        Return the fitted values of the parameter ``name`` for all spectra,
+        reshaped to ``shape``.
+        """
+        i = self.param_names.index(name)
+        values = self._parameters[:, i].reshape(self._shape)
+        unit = self._units[i]
+
+        return values if unit is None else u.Quantity(values, unit, copy=False)
+
+    def percentiles(self, q=(16, 50, 84)):
+        """
+        Compute the percentiles of each parameter over all the fits, for
+        instance over bootstrap realizations of a spectrum. Failed fits
+        (NaN parameters) are ignored.
+
+        Parameters
+        ----------
+        q : sequence of float
+            The percentiles to compute, between 0 and 100.
+
+        Returns
+        -------
+        table : `~astropy.table.QTable`
+            Table with a ``percentile`` column and one column per parameter,
+            with one row per percentile.
+        """
+        q = np.atleast_1d(np.asarray(q, dtype=float))
+        values = np.nanpercentile(self._parameters, q, axis=0)
+
+        table = QTable()
+        table['percentile'] = q
+
+        for i, name in enumerate(self.param_names):
+            unit = self._units[i]
+            table[name] = values[:, i] if unit is None else \
+                u.Quantity(values[:, i], unit, copy=False)
+
+        return table
+
+    def to_table(self):
+        """
+        Convert the results to a `~astropy.table.QTable` with one row per
+        spectrum.
+
+        Returns
+        -------
+        table : `~astropy.table.QTable`
+            Table with a ``spectrum_index`` column, one column per parameter
+            and a ``<name>_err`` column with its standard error, followed by
+            the ``chi2``, ``n_iterations`` and ``status`` columns.
+        """
+        table = QTable()
+        table['spectrum_index'] = np.arange(len(self))
+
+        for i, name in enumerate(self.param_names):
+            unit = self._units[i]
+            values = self._parameters[:, i]
+            errors = self._uncertainties[:, i]
+
+            if unit is not None:
+                values = u.Quantity(values, unit, copy=False)
+                errors = u.Quantity(errors, unit, copy=False)
+
+            table[name] = values
+            table[name + '_err'] = errors
+
+        table['chi2'] = self._chi2
+        table['n_iterations'] = self._n_iterations
+        table['status'] = self._status
+
+        return table
+
+
+def _model_set(model, parameters):
+    """
+    Build a model set from a single (non-compound) ``model``, with one model
+    per row of the ``parameters`` array and the constraints of ``model``.
+    """
+    kwargs = {pn: parameters[:, i] for i, pn in enumerate(model.param_names)}
+    for constraint in ('fixed', 'tied', 'bounds'):
+        kwargs[constraint] = dict(getattr(model, constraint))
+
+    # Polynomials also need their degree, domain and window.
+    args = ()
+    if isinstance(model, models.PolynomialModel):
+        args = (model.degree,)
+        for attr in ('domain', 'window'):
+            if hasattr(model, attr):
+                kwargs[attr] = getattr(model, attr)
+
+    return model.__class__(*args, n_models=len(parameters), name=model.name,
+                           **kwargs)
+
+
+class _UnitReference:
+    """
+    Minimal stand-in for a spectrum, exposing only the attributes needed to
+    put units back onto a fitted model.
+    """
+    def __init__(self, spectral_axis, flux_unit):
+        self.spectral_axis = spectral_axis
+        self.flux = u.Quantity(1, flux_unit)
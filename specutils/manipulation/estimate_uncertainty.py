@@ -61,6 +61,5 @@ def noise_region_uncertainty(spectrum, spectral_region, noise_func=np.std):
     # Return new specturm with uncertainty set.
     return Spectrum1D(flux=spectrum.flux, spectral_axis=spectrum.spectral_axis,
                       uncertainty=uncertainty,
-                      wcs=spectrum.wcs,
                       velocity_convention=spectrum.velocity_convention,
                       rest_value=spectrum.rest_value)
@@ -1,11 +1,25 @@
-from math import floor, ceil  # faster than int(np.floor/ceil(float))
+from collections import namedtuple
 
 import numpy as np
 
 from astropy import units as u
-from .. import Spectrum1D
+from astropy.constants import c
+from ..spectra import SpectralRegion
+from ..spectra.spectral_region import _locate_edges
 
-__all__ = ['extract_region']
+__all__ = ['extract_region', 'extract_velocity_windows', 'SpectralWindow']
+
+SpectralWindow = namedtuple('SpectralWindow', [
+    'rest_wavelength', 'pixels', 'spectral_axis', 'flux', 'uncertainty',
+    'mask'])
+SpectralWindow.__doc__ = """
+A velocity window of a spectrum, as returned by
+`~specutils.manipulation.extract_velocity_windows`.
+
+The ``flux``, ``uncertainty`` and ``mask`` are views of those of the
+spectrum, sliced along the spectral axis by the ``pixels`` slice, so
+writing to them modifies the spectrum.
+"""
 
 
 def _to_edge_pixel(subregion, spectrum):
@@ -17,6 +31,9 @@ def _to_edge_pixel(subregion, spectrum):
 
     Parameters
     ----------
+    subregion : tuple of `~astropy.units.Quantity`
+        The lower and upper bounds of the sub-region.
+
     spectrum: `~specutils.spectra.spectrum1d.Spectrum1D`
         The spectrum object from which the region will be extracted.
 
@@ -26,68 +43,35 @@ def _to_edge_pixel(subregion, spectrum):
         Left and right indices defined by the lower and upper bounds.
 
     """
-    # TODO: spectral regions cannot handle strictly ascending spectral axis
-    #  values. Instead, convert to length space if axis given in a desceninding
-    #  unit space (e.g. frequency). We should find a more elegant solution.
-    spectral_axis = spectrum.spectral_axis
+    left_index, right_index = _edge_pixels(SpectralRegion(*subregion),
+                                           spectrum.spectral_axis)
 
-    if spectrum.spectral_axis.unit.physical_type != 'length' and \
-            spectrum.spectral_axis.unit.is_equivalent(
-                u.AA, equivalencies=u.spectral()):
-        spectral_axis = spectrum.spectral_axis.to(
-            u.AA, equivalencies=u.spectral())
-
-    #
-    # Left/lower side of sub region
-    #
-    if subregion[0].unit.is_equivalent(u.pix):
-        left_index = floor(subregion[0].value)
-    else:
+    return int(left_index[0]), int(right_index[0])
 
-        # Convert lower value to spectrum spectral_axis units
-        left_reg_in_spec_unit = subregion[0].to(spectral_axis.unit,
-                                                u.spectral())
-
-        if left_reg_in_spec_unit < spectral_axis[0]:
-            left_index = 0
-        elif left_reg_in_spec_unit > spectral_axis[-1]:
-            left_index = len(spectrum.spectral_axis)-1
-        else:
-            try:
-                left_index = int(np.ceil(spectrum.wcs.world_to_pixel(
-                    left_reg_in_spec_unit)))
-            except Exception as e:
-                raise ValueError(
-                    "Lower value, {}, could not convert using spectrum's WCS "
-                    "{}. Exception: {}".format(
-                        left_reg_in_spec_unit, spectrum.wcs, e))
-
-    #
-    # Right/upper side of sub region
-    #
-    if subregion[1].unit.is_equivalent(u.pix):
-        right_index = ceil(subregion[1].value)
-    else:
 
-        # Convert upper value to spectrum spectral_axis units
-        right_reg_in_spec_unit = subregion[1].to(spectral_axis.unit,
-                                                 u.spectral())
+def _edge_pixels(region, spectral_axis):
+    """
+    Calculate the left and right indices of all the sub-regions of
+    ``region`` at once, arithmetically on uniformly spaced axes and
+    otherwise with one `~numpy.searchsorted` per side on the monotonic index
+    of the spectral axis, which is cached on `~specutils.SpectralAxis`
+    instances. These are the same pixels as selected by
+    `~specutils.SpectralRegion.to_mask`.
+
+    Parameters
+    ----------
+    region : `~specutils.SpectralRegion`
+        The region to locate.
 
-        if right_reg_in_spec_unit > spectral_axis[-1]:
-            right_index = len(spectrum.spectral_axis)-1
-        elif right_reg_in_spec_unit < spectral_axis[0]:
-            right_index = 0
-        else:
-            try:
-                right_index = int(np.floor(spectrum.wcs.world_to_pixel(
-                    right_reg_in_spec_unit))) + 1
-            except Exception as e:
-                raise ValueError(
-                    "Upper value, {}, could not convert using spectrum's WCS "
-                    "{}. Exception: {}".format(
-                        right_reg_in_spec_unit, spectrum.wcs, e))
+    spectral_axis : `~specutils.SpectralAxis` or `~astropy.units.Quantity`
+        The monotonic spectral axis of the spectrum.
 
-    return left_index, right_index
+    Returns
+    -------
+    left_index, right_index : `~numpy.ndarray`, `~numpy.ndarray`
+        Left (inclusive) and right (exclusive) indices of each sub-region.
+    """
+    return region._edge_indices(spectral_axis)
 
 
 def extract_region(spectrum, region):
@@ -126,30 +110,18 @@ def extract_region(spectrum, region):
     If the ``region`` does not overlap with the ``spectrum`` then an empty Spectrum1D object
     will be returned.
 
-    """
-    extracted_spectrum = []
-    for subregion in region._subregions:
-        left_index, right_index = _to_edge_pixel(subregion, spectrum)
-
-        # If both indices are out of bounds then return None
-        if left_index is None and right_index is None:
-            empty_spectrum = Spectrum1D(spectral_axis=[]*spectrum.spectral_axis.unit,
-                                        flux=[]*spectrum.flux.unit)
-            extracted_spectrum.append(empty_spectrum)
-        else:
+    The pixel bounds of all the sub-regions are located at once on the
+    spectral axis. As for slices of a
+    `~specutils.Spectrum1D`, the extracted spectra share their data with the
+    input spectrum.
 
-            # If only one index is out of bounds then set it to
-            # the lower or upper extent
-            if left_index is None:
-                left_index = 0
-
-            if right_index is None:
-                right_index = len(spectrum.spectral_axis)
-
-            if left_index > right_index:
-                left_index, right_index = right_index, left_index
+    """
+    left_indices, right_indices = _edge_pixels(region,
+                                               spectrum.spectral_axis)
 
-            extracted_spectrum.append(spectrum[left_index:right_index])
+    extracted_spectrum = [spectrum[int(left_index):int(right_index)]
+                          for left_index, right_index
+                          in zip(left_indices, right_indices)]
 
     # If there is only one subregion in the region then we will
     # just return a spectrum.
@@ -157,3 +129,101 @@ def extract_region(spectrum, region):
         extracted_spectrum = extracted_spectrum[0]
 
     return extracted_spectrum
+
+
+def extract_velocity_windows(spectrum, rest_wavelengths, velocity_width,
+                             doppler_convention='optical'):
+    """
+    Extract the windows of ``velocity_width`` around every line of
+    ``rest_wavelengths`` from the input `~specutils.Spectrum1D`.
+
+    The velocity bounds of all the windows are converted to the spectral
+    axis in one vectorized pass and located on it at once, instead of
+    building and extracting a `~specutils.SpectralRegion` per line. No data
+    are copied: each window holds views of the flux, uncertainty and mask of
+    the spectrum.
+
+    Parameters
+    ----------
+    spectrum : `~specutils.Spectrum1D`
+        The spectrum to extract the windows from, with a monotonic spectral
+        axis. Multi-dimensional fluxes are sliced along their last axis.
+
+    rest_wavelengths : `~astropy.units.Quantity`
+        The rest wavelengths (or any spectral quantity) of the lines to
+        extract, in the frame of the spectral axis.
+
+    velocity_width : `~astropy.units.Quantity`
+        The velocity extent of the windows on each side of the lines, e.g.
+        ``500 * u.km / u.s`` for windows of +/- 500 km/s.
+
+    doppler_convention : {'optical', 'radio', 'relativistic'}, optional
+        The Doppler convention of the velocities.
+
+    Returns
+    -------
+    windows : list of `~specutils.manipulation.SpectralWindow`
+        The window of each line, in the order of ``rest_wavelengths``.
+
+    Notes
+    -----
+    The windows select the same pixels as
+    `~specutils.manipulation.extract_region` with a
+    `~specutils.SpectralRegion` of the same bounds: they are closed
+    intervals, except that a window running past the end of an axis that is
+    ascending in wavelength stops at (and excludes) the last pixel. Windows
+    that do not overlap with the spectrum are empty.
+    """
+    beta = (u.Quantity(velocity_width) / c).to_value(u.dimensionless_unscaled)
+    if np.any(np.asarray(beta) <= 0) or np.any(np.asarray(beta) >= 1):
+        raise ValueError("velocity_width must be positive and smaller than "
+                         "the speed of light.")
+
+    # Wavelength scale factors of the -v and +v bounds.
+    beta = np.array([-beta, beta])
+    if doppler_convention == 'optical':
+        factors = 1 + beta
+    elif doppler_convention == 'radio':
+        factors = 1 / (1 - beta)
+    elif doppler_convention == 'relativistic':
+        factors = np.sqrt((1 + beta) / (1 - beta))
+    else:
+        raise ValueError("doppler_convention must be 'optical', 'radio' or "
+                         "'relativistic', got {!r}.".format(
+                             doppler_convention))
+
+    rest_wavelengths = u.Quantity(rest_wavelengths, ndmin=1)
+    rest = rest_wavelengths.to_value(u.AA, u.spectral())
+    bounds = (rest * factors[:, np.newaxis]) * u.AA
+
+    def window_bounds(unit):
+        lower, upper = bounds.to_value(unit, u.spectral())
+        return np.minimum(lower, upper), np.maximum(lower, upper)
+
+    spectral_axis = spectrum.spectral_axis
+    n = spectral_axis.shape[-1]
+    left, right = _locate_edges(spectral_axis, window_bounds)
+    left = np.clip(left, 0, n)
+    right = np.maximum(left, np.clip(right, 0, n))
+
+    uncertainty = spectrum.uncertainty
+    mask = spectrum.mask
+
+    windows = []
+    for line, start, stop in zip(rest_wavelengths, left, right):
+        pixels = slice(int(start), int(stop))
+        window_uncertainty = None
+        if uncertainty is not None:
+            window_uncertainty = type(uncertainty)(
+                uncertainty.array[..., pixels], unit=uncertainty.unit,
+                copy=False)
+
+        windows.append(SpectralWindow(
+            rest_wavelength=line,
+            pixels=pixels,
+            spectral_axis=spectral_axis[pixels],
+            flux=spectrum.flux[..., pixels],
+            uncertainty=window_uncertainty,
+            mask=None if mask is None else mask[..., pixels]))
+
+    return windows
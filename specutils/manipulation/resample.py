@@ -10,6 +10,7 @@ from astropy.units import Quantity
 from scipy.interpolate import CubicSpline
 
 from ..spectra import Spectrum1D, SpectralAxis
+from ..utils.dtype_utils import result_dtype, cast
 
 __all__ = ['ResamplerBase', 'FluxConservingResampler',
            'LinearInterpolatedResampler', 'SplineInterpolatedResampler']
@@ -32,14 +33,17 @@ class ResamplerBase(ABC):
             raise ValueError('invalid extrapolation_treatment value: ' + str(extrapolation_treatment))
         self.extrapolation_treatment = extrapolation_treatment
 
-    def __call__(self, orig_spectrum, fin_spec_axis):
+    def __call__(self, orig_spectrum, fin_spec_axis, dtype=None):
         """
         Return the resulting `~specutils.Spectrum1D` of the resampling.
+
+        The floating point type of its flux and uncertainty is ``dtype`` if
+        it is given, and otherwise follows ``specutils.conf.dtype_policy``.
         """
-        return self.resample1d(orig_spectrum, fin_spec_axis)
+        return self.resample1d(orig_spectrum, fin_spec_axis, dtype=dtype)
 
     @abstractmethod
-    def resample1d(self, orig_spectrum, fin_spec_axis):
+    def resample1d(self, orig_spectrum, fin_spec_axis, dtype=None):
         """
         Workhorse method that will return the resampled Spectrum1D
         object.
@@ -129,7 +133,7 @@ class FluxConservingResampler(ResamplerBase):
 
         return resamp_mat.value
 
-    def resample1d(self, orig_spectrum, fin_spec_axis):
+    def resample1d(self, orig_spectrum, fin_spec_axis, dtype=None):
         """
         Create a re-sampling matrix to be used in re-sampling spectra in a way
         that conserves flux. If an uncertainty is present in the input spectra
@@ -142,6 +146,9 @@ class FluxConservingResampler(ResamplerBase):
             The original 1D spectrum.
         fin_spec_axis :  Quantity
             The desired spectral axis array.
+        dtype : `~numpy.dtype`, optional
+            Floating point type of the resampled flux and uncertainty. By
+            default it follows ``specutils.conf.dtype_policy``.
 
         Returns
         -------
@@ -173,8 +180,28 @@ class FluxConservingResampler(ResamplerBase):
         else:
             pixel_uncer = None
 
+        # The resampling matrix is computed in double precision, and then
+        # applied in the floating point type of the result.
+        dtype = result_dtype(orig_spectrum.flux, dtype=dtype)
+        pixel_uncer = cast(pixel_uncer, dtype)
+
         orig_axis_in_fin = orig_spectrum.spectral_axis.to(fin_spec_axis.unit)
-        resample_grid = self._resample_matrix(orig_axis_in_fin, fin_spec_axis)
+
+        if _same_grid(orig_axis_in_fin, fin_spec_axis):
+            # Resampling onto the same uniform grid leaves the bins unchanged,
+            # so the resampling matrix is the identity.
+            out_flux = orig_spectrum.flux.astype(
+                orig_spectrum.flux.dtype if dtype is None else dtype)
+            out_uncertainty = None
+            if pixel_uncer is not None:
+                out_uncertainty = InverseVariance(np.reciprocal(pixel_uncer))
+
+            return Spectrum1D(flux=out_flux,
+                              spectral_axis=np.array(fin_spec_axis) * orig_spectrum.spectral_axis.unit,
+                              uncertainty=out_uncertainty)
+
+        resample_grid = cast(self._resample_matrix(orig_axis_in_fin,
+                                                   fin_spec_axis), dtype)
 
         # Now for some broadcasting magic to handle multi dimensional flux inputs
         # Essentially this part is inserting length one dimensions as fillers
@@ -185,7 +212,7 @@ class FluxConservingResampler(ResamplerBase):
         # the last index.
         new_flux_shape = list(orig_spectrum.flux.shape)
         new_flux_shape.insert(-1, 1)
-        in_flux = orig_spectrum.flux.reshape(new_flux_shape)
+        in_flux = cast(orig_spectrum.flux, dtype).reshape(new_flux_shape)
 
         ones = [1] * len(orig_spectrum.flux.shape[:-1])
         new_shape_resample_grid = ones + list(resample_grid.shape)
@@ -226,6 +253,21 @@ class FluxConservingResampler(ResamplerBase):
         return resampled_spectrum
 
 
+def _same_grid(orig_spec_axis, fin_spec_axis):
+    """
+    Whether two spectral axes, in the same unit, have the same uniformly
+    spaced `~specutils.SpectralAxis.grid`.
+    """
+    orig_grid = getattr(orig_spec_axis, 'grid', None)
+    fin_grid = getattr(fin_spec_axis, 'grid', None)
+    if orig_grid is None or fin_grid is None:
+        return False
+
+    return (orig_grid.n == fin_grid.n and orig_grid.scale == fin_grid.scale and
+            np.isclose(orig_grid.start, fin_grid.start, rtol=1e-12) and
+            np.isclose(orig_grid.step, fin_grid.step, rtol=1e-9, atol=0))
+
+
 class LinearInterpolatedResampler(ResamplerBase):
     """
     Resample a spectrum onto a new ``spectral_axis`` using linear interpolation.
@@ -257,7 +299,7 @@ class LinearInterpolatedResampler(ResamplerBase):
     def __init__(self, extrapolation_treatment='nan_fill'):
         super().__init__(extrapolation_treatment)
 
-    def resample1d(self, orig_spectrum, fin_spec_axis):
+    def resample1d(self, orig_spectrum, fin_spec_axis, dtype=None):
         """
         Call interpolation, repackage new spectra
 
@@ -268,6 +310,9 @@ class LinearInterpolatedResampler(ResamplerBase):
             The original 1D spectrum.
         fin_spec_axis : ndarray
             The desired spectral axis array.
+        dtype : `~numpy.dtype`, optional
+            Floating point type of the resampled flux and uncertainty. By
+            default it follows ``specutils.conf.dtype_policy``.
 
         Returns
         -------
@@ -283,15 +328,17 @@ class LinearInterpolatedResampler(ResamplerBase):
 
         out_flux_arr = np.interp(fin_spec_axis.value, orig_axis_in_fin.value,
                                  orig_spectrum.flux.value, left=fill_val, right=fill_val)
-        out_flux = Quantity(out_flux_arr, unit=orig_spectrum.flux.unit)
+        dtype = result_dtype(orig_spectrum.flux, dtype=dtype)
+        out_flux = Quantity(cast(out_flux_arr, dtype),
+                            unit=orig_spectrum.flux.unit)
 
         new_unc = None
         if orig_spectrum.uncertainty is not None:
             out_unc_arr = np.interp(fin_spec_axis.value, orig_axis_in_fin.value,
                                     orig_spectrum.uncertainty.array,
                                     left=fill_val, right=fill_val)
-            new_unc = orig_spectrum.uncertainty.__class__(array=out_unc_arr,
-                                                          unit=orig_spectrum.unit)
+            new_unc = orig_spectrum.uncertainty.__class__(
+                array=cast(out_unc_arr, dtype), unit=orig_spectrum.unit)
 
         return Spectrum1D(spectral_axis=fin_spec_axis,
                           flux=out_flux,
@@ -332,7 +379,7 @@ class SplineInterpolatedResampler(ResamplerBase):
     def __init__(self, bin_edges='nan_fill'):
         super().__init__(bin_edges)
 
-    def resample1d(self, orig_spectrum, fin_spec_axis):
+    def resample1d(self, orig_spectrum, fin_spec_axis, dtype=None):
         """
         Call interpolation, repackage new spectra
 
@@ -343,6 +390,9 @@ class SplineInterpolatedResampler(ResamplerBase):
             The original 1D spectrum.
         fin_spec_axis : Quantity
             The desired spectral axis array.
+        dtype : `~numpy.dtype`, optional
+            Floating point type of the resampled flux and uncertainty. By
+            default it follows ``specutils.conf.dtype_policy``.
 
         Returns
         -------
@@ -352,13 +402,14 @@ class SplineInterpolatedResampler(ResamplerBase):
         orig_axis_in_new = orig_spectrum.spectral_axis.to(fin_spec_axis.unit)
         flux_spline = CubicSpline(orig_axis_in_new.value, orig_spectrum.flux.value,
                                    extrapolate=self.extrapolation_treatment != 'nan_fill')
-        out_flux_val = flux_spline(fin_spec_axis.value)
+        dtype = result_dtype(orig_spectrum.flux, dtype=dtype)
+        out_flux_val = cast(flux_spline(fin_spec_axis.value), dtype)
 
         new_unc = None
         if orig_spectrum.uncertainty is not None:
             unc_spline = CubicSpline(orig_axis_in_new.value, orig_spectrum.uncertainty.array,
                                        extrapolate=self.extrapolation_treatment != 'nan_fill')
-            out_unc_val = unc_spline(fin_spec_axis.value)
+            out_unc_val = cast(unc_spline(fin_spec_axis.value), dtype)
             new_unc = orig_spectrum.uncertainty.__class__(array=out_unc_val, unit=orig_spectrum.unit)
 
         if self.extrapolation_treatment == 'zero_fill':
@@ -9,12 +9,13 @@ from scipy.signal import medfilt
 import numpy as np
 
 from ..spectra import Spectrum1D
+from ..utils.dtype_utils import result_dtype, cast
 
 __all__ = ['convolution_smooth', 'box_smooth', 'gaussian_smooth',
            'trapezoid_smooth', 'median_smooth']
 
 
-def convolution_smooth(spectrum, kernel):
+def convolution_smooth(spectrum, kernel, dtype=None):
     """
     Apply a convolution based smoothing to the spectrum. The kernel must be one
     of the 1D kernels defined in `astropy.convolution`.
@@ -31,6 +32,9 @@ def convolution_smooth(spectrum, kernel):
         The `~specutils.Spectrum1D` object to which the smoothing will be applied.
     kernel : `astropy.convolution.Kernel1D` subclass or array.
         The convolution based smoothing kernel - anything that `astropy.convolution.convolve` accepts.
+    dtype : `~numpy.dtype`, optional
+        Floating point type of the smoothed flux and uncertainty. By default
+        it follows ``specutils.conf.dtype_policy``.
 
     Returns
     -------
@@ -49,9 +53,10 @@ def convolution_smooth(spectrum, kernel):
 
     # Get the flux of the input spectrum
     flux = spectrum.flux
+    dtype = result_dtype(flux, dtype=dtype)
 
     # Smooth based on the input kernel
-    smoothed_flux = convolution.convolve(flux, kernel)
+    smoothed_flux = cast(convolution.convolve(flux, kernel), dtype)
 
     # Propagate the uncertainty if it exists...
     uncertainty = copy.deepcopy(spectrum.uncertainty)
@@ -92,18 +97,19 @@ def convolution_smooth(spectrum, kernel):
             warnings.warn("Uncertainty is {} but convolutional error propagation is not defined for that type. Uncertainty will be dropped in the convolved spectrum.".format(type(uncertainty)),
                           AstropyUserWarning)
 
+        if uncertainty is not None:
+            uncertainty.array = cast(uncertainty.array, dtype)
 
     # Return a new object with the smoothed flux.
     return Spectrum1D(flux=u.Quantity(smoothed_flux, spectrum.unit),
                       spectral_axis=u.Quantity(spectrum.spectral_axis,
                                                spectrum.spectral_axis.unit),
-                      wcs=spectrum.wcs,
                       uncertainty=uncertainty,
                       velocity_convention=spectrum.velocity_convention,
                       rest_value=spectrum.rest_value)
 
 
-def box_smooth(spectrum, width):
+def box_smooth(spectrum, width, dtype=None):
     """
     Smooth a `~specutils.Spectrum1D` instance based on a `astropy.convolution.Box1DKernel` kernel.
 
@@ -113,6 +119,9 @@ def box_smooth(spectrum, width):
         The spectrum object to which the smoothing will be applied.
     width : number
         The width of the kernel, in pixels, as defined in `astropy.convolution.Box1DKernel`
+    dtype : `~numpy.dtype`, optional
+        Floating point type of the smoothed flux and uncertainty. By default
+        it follows ``specutils.conf.dtype_policy``.
 
     Returns
     -------
@@ -134,10 +143,10 @@ def box_smooth(spectrum, width):
     box1d_kernel = convolution.Box1DKernel(width)
 
     # Call and return the convolution smoothing.
-    return convolution_smooth(spectrum, box1d_kernel)
+    return convolution_smooth(spectrum, box1d_kernel, dtype=dtype)
 
 
-def gaussian_smooth(spectrum, stddev):
+def gaussian_smooth(spectrum, stddev, dtype=None):
     """
     Smooth a `~specutils.Spectrum1D` instance based on a `astropy.convolution.Gaussian1DKernel`.
 
@@ -147,6 +156,9 @@ def gaussian_smooth(spectrum, stddev):
         The spectrum object to which the smoothing will be applied.
     stddev : number
         The stddev of the kernel, in pixels, as defined in `astropy.convolution.Gaussian1DKernel`
+    dtype : `~numpy.dtype`, optional
+        Floating point type of the smoothed flux and uncertainty. By default
+        it follows ``specutils.conf.dtype_policy``.
 
     Returns
     -------
@@ -168,10 +180,10 @@ def gaussian_smooth(spectrum, stddev):
     gaussian_kernel = convolution.Gaussian1DKernel(stddev)
 
     # Call and return the convolution smoothing.
-    return convolution_smooth(spectrum, gaussian_kernel)
+    return convolution_smooth(spectrum, gaussian_kernel, dtype=dtype)
 
 
-def trapezoid_smooth(spectrum, width):
+def trapezoid_smooth(spectrum, width, dtype=None):
     """
     Smoothing based on a `astropy.convolution.Trapezoid1DKernel` kernel.
 
@@ -181,6 +193,9 @@ def trapezoid_smooth(spectrum, width):
         The `~specutils.Spectrum1D` object to which the smoothing will be applied.
     width : number
         The width of the kernel, in pixels, as defined in `astropy.convolution.Trapezoid1DKernel`
+    dtype : `~numpy.dtype`, optional
+        Floating point type of the smoothed flux and uncertainty. By default
+        it follows ``specutils.conf.dtype_policy``.
 
     Returns
     -------
@@ -202,10 +217,10 @@ def trapezoid_smooth(spectrum, width):
     trapezoid_kernel = convolution.Trapezoid1DKernel(width)
 
     # Call and return the convolution smoothing.
-    return convolution_smooth(spectrum, trapezoid_kernel)
+    return convolution_smooth(spectrum, trapezoid_kernel, dtype=dtype)
 
 
-def median_smooth(spectrum, width):
+def median_smooth(spectrum, width, dtype=None):
     """
     Smoothing based on a median filter. The median filter smoothing
     is implemented using the `scipy.signal.medfilt` function.
@@ -215,7 +230,11 @@ def median_smooth(spectrum, width):
     spectrum : `~specutils.Spectrum1D`
         The `~specutils.Spectrum1D` object to which the smoothing will be applied.
     width : number
-        The width of the median filter in pixels.
+        The width of the median filter in pixels. For multi-dimensional
+        spectra, every spectrum is filtered along the spectral axis.
+    dtype : `~numpy.dtype`, optional
+        Floating point type of the smoothed flux. By default it follows
+        ``specutils.conf.dtype_policy``.
 
     Returns
     -------
@@ -239,13 +258,13 @@ def median_smooth(spectrum, width):
     # Get the flux of the input spectrum
     flux = spectrum.flux
 
-    # Smooth based on the input kernel
-    smoothed_flux = medfilt(flux, width)
+    # Smooth based on the input kernel, along the spectral axis only
+    smoothed_flux = cast(medfilt(flux, [1] * (flux.ndim - 1) + [width]),
+                         result_dtype(flux, dtype=dtype))
 
     # Return a new object with the smoothed flux.
     return Spectrum1D(flux=u.Quantity(smoothed_flux, spectrum.unit),
                       spectral_axis=u.Quantity(spectrum.spectral_axis,
                                                spectrum.spectral_axis.unit),
-                      wcs=spectrum.wcs,
                       velocity_convention=spectrum.velocity_convention,
                       rest_value=spectrum.rest_value)
@@ -38,28 +38,19 @@ def true_exciser(spectrum, region):
 
     """
 
-    spectral_axis = spectrum.spectral_axis
-    excise_indices = None
+    # Keep everything that is not in any of the subregions
+    keep = ~region.to_mask(spectrum.spectral_axis)
 
-    for subregion in region:
-        # Find the indices of the spectral_axis array corresponding to the subregion
-        region_mask = (spectral_axis >= region.lower) & (spectral_axis < region.upper)
-        temp_indices = np.nonzero(region_mask)[0]
-        if excise_indices is None:
-            excise_indices = temp_indices
-        else:
-            excise_indices = np.hstack(excise_indices, temp_indices)
-
-    new_flux = np.delete(spectrum.flux, excise_indices)
-    new_spectral_axis = np.delete(spectrum.spectral_axis, excise_indices)
+    new_flux = spectrum.flux[..., keep]
+    new_spectral_axis = spectrum.spectral_axis[keep]
 
     if spectrum.mask is not None:
-        new_mask = np.delete(spectrum.mask, excise_indices)
+        new_mask = spectrum.mask[..., keep]
     else:
         new_mask = None
 
     if spectrum.uncertainty is not None:
-        new_uncertainty = np.delete(spectrum.uncertainty, excise_indices)
+        new_uncertainty = spectrum.uncertainty[..., keep]
     else:
         new_uncertainty = None
 
@@ -68,7 +59,6 @@ def true_exciser(spectrum, region):
                       spectral_axis=new_spectral_axis,
                       uncertainty=new_uncertainty,
                       mask=new_mask,
-                      wcs=spectrum.wcs,
                       velocity_convention=spectrum.velocity_convention,
                       rest_value=spectrum.rest_value if not isinstance(new_spectral_axis, SpectralCoord) else None,
                       radial_velocity=spectrum.radial_velocity if not isinstance(new_spectral_axis, SpectralCoord) else None)
@@ -121,14 +111,17 @@ def linear_exciser(spectrum, region):
              "the subregions overlap.",
              AstropyUserWarning)
 
-    for subregion in region:
-        # Find the indices of the spectral_axis array corresponding to the subregion
-        region_mask = (spectral_axis >= subregion.lower) & (spectral_axis < subregion.upper)
-        inclusive_indices = np.nonzero(region_mask)[0]
+    # Find the first and last+1 index of the spectral_axis array
+    # corresponding to each subregion
+    lefts, rights = region._edge_indices(spectral_axis)
+
+    for left, right in zip(lefts, rights):
+        if left == right:
+            continue
+
         # Now set the flux values for these indices to be a
         # linear range
-        s, e = max(inclusive_indices[0]-1, 0), min(inclusive_indices[-1]+1,
-                                               spectral_axis.size-1)
+        s, e = max(left-1, 0), min(right, spectral_axis.size-1)
 
         modified_flux[s:e+1] = np.linspace(flux[s], flux[e], modified_flux[s:e+1].size)
 
@@ -141,7 +134,6 @@ def linear_exciser(spectrum, region):
     return Spectrum1D(flux=modified_flux,
                       spectral_axis=spectral_axis,
                       uncertainty=new_uncertainty,
-                      wcs=spectrum.wcs,
                       mask=spectrum.mask,
                       velocity_convention=spectrum.velocity_convention,
                       rest_value=spectrum.rest_value if not isinstance(spectral_axis, SpectralCoord) else None,
@@ -275,6 +267,5 @@ def spectrum_from_model(model_input, spectrum):
 
     return Spectrum1D(flux=flux,
                       spectral_axis=spectrum.spectral_axis,
-                      wcs=spectrum.wcs,
                       velocity_convention=spectrum.velocity_convention,
                       rest_value=spectrum.rest_value)
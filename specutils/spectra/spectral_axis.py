@@ -1,7 +1,7 @@
 import warnings
+from collections import namedtuple
 
 import astropy.units as u
-from astropy.utils.decorators import lazyproperty
 import numpy as np
 
 from ..extern.spectralcoord import SpectralCoord
@@ -12,6 +12,17 @@ __all__ = ['SpectralAxis']
 # We don't want to run doctests in the docstrings we inherit from Quantity
 __doctest_skip__ = ['SpectralAxis.*']
 
+SpectralGrid = namedtuple('SpectralGrid', ['start', 'step', 'n', 'scale'])
+SpectralGrid.__doc__ = """
+Parameters of a uniformly spaced spectral axis: the first value ``start``,
+in the unit of the axis, the ``step`` between values, the number of values
+``n``, and the ``scale``, ``'linear'`` for a ``step`` in the unit of the axis
+or ``'log'`` for a ``step`` in dex (log10 of the ratio of the values).
+"""
+
+# Tolerance on the deviation from a uniform grid, in steps.
+_GRID_RTOL = 1e-6
+
 class SpectralAxis(SpectralCoord):
     """
     Coordinate object representing spectral values corresponding to a specific
@@ -42,6 +53,200 @@ class SpectralAxis(SpectralCoord):
 
         return obj
 
+    @classmethod
+    def from_grid(cls, start, step, n, scale='linear', **kwargs):
+        """
+        Create a spectral axis of ``n`` uniformly spaced values, whose
+        parameters are recorded in `grid` so that its bin edges and the
+        pixels of spectral values are computed arithmetically.
+
+        Parameters
+        ----------
+        start : `~astropy.units.Quantity`
+            The first value of the axis.
+        step : float or `~astropy.units.Quantity`
+            The step between values, in the unit of ``start`` for a linear
+            axis, or in dex (log10 of the ratio of consecutive values) for a
+            logarithmic one.
+        n : int
+            The number of values.
+        scale : {'linear', 'log'}, optional
+            The spacing of the values.
+        kwargs
+            Passed to the `~specutils.SpectralAxis` initializer.
+        """
+        if scale not in ('linear', 'log'):
+            raise ValueError("scale must be 'linear' or 'log', got "
+                             "{!r}.".format(scale))
+
+        start = u.Quantity(start)
+        if scale == 'linear':
+            step = u.Quantity(step, start.unit).value
+        else:
+            step = u.Quantity(step, u.dimensionless_unscaled).value
+
+        grid = SpectralGrid(float(start.value), float(step), int(n), scale)
+        obj = cls(cls._grid_values(grid) * start.unit, **kwargs)
+        obj._record_grid(grid if n > 1 else None)
+
+        return obj
+
+    @property
+    def grid(self):
+        """
+        The `~specutils.spectra.spectral_axis.SpectralGrid` parameters
+        ``(start, step, n, scale)`` of the axis if its values are uniformly
+        spaced, linearly or logarithmically, and `None` otherwise.
+
+        The spacing is detected once, on first access, unless the axis was
+        created with `from_grid` or from a linear FITS WCS. It is detected
+        again if the values of the axis are modified in place.
+        """
+        results = self._derived_cache('_grid_results')
+        if 'grid' not in results:
+            results['grid'] = self._detect_grid()
+
+        return results['grid']
+
+    def _record_grid(self, grid):
+        """
+        Record the known ``grid`` of the axis, for its current values.
+        """
+        self._derived_cache('_grid_results')['grid'] = grid
+
+    def _detect_grid(self):
+        """
+        The grid of the values of the axis, or `None` if they are not
+        uniformly spaced.
+        """
+        values = self.value
+        if values.ndim != 1 or len(values) < 2 or \
+                not np.all(np.isfinite(values)):
+            return None
+
+        for scale in ('linear', 'log'):
+            grid = self._grid_from_endpoints(values, scale)
+            if grid is None:
+                continue
+
+            if scale == 'linear':
+                actual, step = values, grid.step
+                expected = self._grid_values(grid)
+            else:
+                actual, step = np.log10(np.abs(values)), grid.step
+                expected = np.log10(np.abs(grid.start)) + \
+                    step * np.arange(grid.n)
+
+            tolerance = _GRID_RTOL * abs(step) + \
+                8 * np.finfo(float).eps * np.max(np.abs(actual))
+            if np.all(np.abs(actual - expected) <= tolerance):
+                return grid
+
+        return None
+
+    @staticmethod
+    def _grid_from_endpoints(values, scale):
+        """
+        The grid with the first and last of ``values`` and their number, or
+        `None` if there is none with this ``scale``.
+        """
+        n = len(values)
+        first, last = float(values[0]), float(values[-1])
+        if first == last:
+            return None
+
+        if scale == 'linear':
+            return SpectralGrid(first, (last - first) / (n - 1), n, scale)
+
+        if first * last <= 0:
+            return None
+
+        return SpectralGrid(first, np.log10(last / first) / (n - 1), n, scale)
+
+    @staticmethod
+    def _grid_values(grid):
+        """
+        The values of a `~specutils.spectra.spectral_axis.SpectralGrid`.
+        """
+        indices = np.arange(grid.n)
+        if grid.scale == 'linear':
+            return grid.start + grid.step * indices
+
+        return grid.start * 10 ** (grid.step * indices)
+
+    def _set_grid(self, scale):
+        """
+        Record the grid of an axis known to be uniformly spaced with
+        ``scale``, e.g. from its WCS, without checking its values.
+        """
+        if self.ndim == 1 and len(self) > 1:
+            self._record_grid(self._grid_from_endpoints(self.value, scale))
+
+    def __getitem__(self, item):
+        result = super().__getitem__(item)
+
+        # Slices of a grid (or of an axis created from bin edges) keep it.
+        if isinstance(item, slice) and isinstance(result, SpectralAxis) and \
+                result.ndim == 1 and self.ndim == 1:
+            start, stop, stride = item.indices(len(self))
+
+            grid = self._derived_cache('_grid_results').get('grid')
+            if grid is not None:
+                result._record_grid(None if len(result) < 2 else SpectralGrid(
+                    float(result.value[0]), grid.step * stride, len(result),
+                    grid.scale))
+
+            if stride == 1 and hasattr(self, '_bin_edges') and len(result):
+                result._bin_edges = self._bin_edges[start:start +
+                                                    len(result) + 1]
+
+        return result
+
+    def _locate(self, lower, upper):
+        """
+        Left (inclusive) and right (exclusive) indices of the closed
+        intervals ``[lower, upper]`` on an axis with a `grid`, computed
+        arithmetically from their positions on the grid.
+        """
+        grid = self.grid
+        n = grid.n
+        lower = np.asarray(lower, dtype=float)
+        upper = np.asarray(upper, dtype=float)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            if grid.scale == 'linear':
+                low, up = ((x - grid.start) / grid.step for x in (lower, upper))
+            else:
+                low, up = (np.where(x / grid.start > 0,
+                                    np.log10(x / grid.start) / grid.step,
+                                    -np.inf * np.sign(grid.step))
+                           for x in (lower, upper))
+
+        # On a descending axis, the values are those of an ascending one
+        # with the opposite sign.
+        values = self.value
+        if grid.step < 0:
+            values, lower, upper = -values, -upper, -lower
+            low, up = up, low
+
+        left = np.clip(np.ceil(np.clip(low, -1, n)), 0, n).astype(int)
+        right = np.clip(np.floor(np.clip(up, -1, n)) + 1, 0, n).astype(int)
+
+        # Correct the rounding of the positions of bounds on pixel values, so
+        # that ``left`` is the number of values below ``lower`` and ``right``
+        # the number of values up to ``upper``.
+        def value(i):
+            return values[np.clip(i, 0, n - 1)]
+
+        left = np.where((left > 0) & (value(left - 1) >= lower), left - 1, left)
+        left = np.where((left < n) & (value(left) < lower), left + 1, left)
+        right = np.where((right > 0) & (value(right - 1) > upper), right - 1,
+                         right)
+        right = np.where((right < n) & (value(right) <= upper), right + 1,
+                         right)
+
+        return left, np.maximum(left, right)
+
     @staticmethod
     def _edges_from_centers(centers, unit):
         """
@@ -61,17 +266,128 @@ class SpectralAxis(SpectralCoord):
         """
         return (edges[1:] + edges[:-1]) / 2
 
-    @lazyproperty
+    @property
     def bin_edges(self):
         """
         Calculates bin edges if the spectral axis was created with centers
         specified.
+
+        The edges are computed once and cached like the `grid`, and computed
+        again if the values of the axis are modified in place.
         """
         if hasattr(self, '_bin_edges'):
             return self._bin_edges
-        else:
+
+        results = self._derived_cache('_grid_results')
+        if 'bin_edges' not in results:
+            results['bin_edges'] = self._edges_from_grid()
+
+        return results['bin_edges']
+
+    def _edges_from_grid(self):
+        """
+        The bin edges halfway between the centers, computed arithmetically
+        if the axis has a `grid`.
+        """
+        grid = self.grid
+        if grid is None:
             return self._edges_from_centers(self.value, self.unit)
 
+        # The same edges, halfway between the centers, computed from the
+        # grid parameters.
+        if grid.scale == 'linear':
+            edges = grid.start + grid.step * (np.arange(grid.n + 1) - 0.5)
+        else:
+            ratio = 10 ** grid.step
+            edges = grid.start * ratio ** (np.arange(grid.n + 1) - 1.) * \
+                (1 + ratio) / 2
+            edges[0] = grid.start * (3 - ratio) / 2
+            edges[-1] = grid.start * ratio ** (grid.n - 1) * \
+                (3 - 1 / ratio) / 2
+
+        return edges * self.unit
+
+    def _values_key(self):
+        """
+        A cheap fingerprint of the values of the axis: its unit, shape and a
+        few values spread over it.
+        """
+        values = self.view(np.ndarray)
+        if values.size == 0:
+            return self.unit, values.shape, b''
+
+        n = values.size - 1
+        samples = values.flat[[0, n // 4, n // 2, 3 * n // 4, n]]
+        return self.unit, values.shape, samples.tobytes()
+
+    def _derived_cache(self, name):
+        """
+        The dict ``name`` of results cached from the values of the axis. It
+        is emptied when the values no longer match the fingerprint they were
+        cached with, e.g. after they were modified in place, so that the
+        results are computed again.
+        """
+        key = self._values_key()
+        cache = self.__dict__.get(name)
+        if cache is None or cache[0] != key:
+            cache = self.__dict__[name] = (key, {})
+
+        return cache[1]
+
+    def _monotonic_index(self, unit=None):
+        """
+        The values of the axis in ``unit`` (its own unit by default) in
+        ascending order, and whether the axis is descending in that unit, to
+        locate spectral values on it with `~numpy.searchsorted`.
+
+        The index is computed once per unit and cached, and computed again
+        if the values of the axis are modified in place.
+        """
+        unit = self.unit if unit is None else u.Unit(unit)
+
+        indices = self._derived_cache('_monotonic_indices')
+        if unit not in indices:
+            values = u.Quantity(self, copy=False).to_value(unit, u.spectral())
+            indices[unit] = self._sorted_values(values)
+
+        return indices[unit]
+
+    def _flux_conversion_factor(self, from_unit, to_unit):
+        """
+        The factor converting fluxes from ``from_unit`` to ``to_unit`` with
+        the spectral density equivalencies of the axis: a scalar if the
+        units are directly convertible, and one value per pixel otherwise.
+
+        The factor is computed once per pair of units and cached, like the
+        monotonic index, and computed again if the values of the axis are
+        modified in place.
+        """
+        key = (u.Unit(from_unit), u.Unit(to_unit))
+
+        factors = self._derived_cache('_flux_conversion_factors')
+        if key not in factors:
+            try:
+                factor = key[0].to(key[1])
+            except u.UnitConversionError:
+                factor = u.Quantity(np.ones(self.shape), key[0]).to_value(
+                    key[1], u.spectral_density(self))
+            factors[key] = factor
+
+        return factors[key]
+
+    @staticmethod
+    def _sorted_values(values):
+        """
+        The monotonic array ``values`` in ascending order, and whether it was
+        descending.
+        """
+        values = np.asarray(values)
+        descending = len(values) > 1 and values[0] > values[-1]
+        if descending:
+            values = np.ascontiguousarray(values[::-1])
+
+        return values, descending
+
     def with_observer_stationary_relative_to(self, frame,
                                              velocity=None,
                                              preserve_observer_frame=False):
@@ -4,6 +4,8 @@ import sys
 import numpy as np
 import astropy.units as u
 
+from .spectral_axis import SpectralAxis
+
 
 class SpectralRegion:
     """
@@ -216,6 +218,202 @@ class SpectralRegion:
         """
         return max(x[1] for x in self._subregions)
 
+    @staticmethod
+    def _bounds_values(subregions, unit):
+        """
+        Return the lower and upper bounds of ``subregions`` as two arrays of
+        values in ``unit``.  Conversions that reverse the ordering of a
+        sub-region (e.g. wavelength to frequency) are swapped back so that
+        the lower value is always the smaller one.
+        """
+        lower = np.array([x[0].value for x in subregions], dtype=float)
+        upper = np.array([x[1].value for x in subregions], dtype=float)
+
+        # The bounds are converted once per distinct unit.
+        lower_units = [x[0].unit for x in subregions]
+        upper_units = [x[1].unit for x in subregions]
+        for bound_unit in set(lower_units) | set(upper_units):
+            if bound_unit == unit:
+                continue
+
+            for values, units in ((lower, lower_units), (upper, upper_units)):
+                selected = np.array([x == bound_unit for x in units],
+                                    dtype=bool)
+                if np.any(selected):
+                    values[selected] = (values[selected] * bound_unit).to_value(
+                        unit, u.spectral())
+
+        return np.minimum(lower, upper), np.maximum(lower, upper)
+
+    def _bounds_arrays(self, unit):
+        """
+        Return whether each sub-region is defined in pixels, and the lower
+        and upper bounds of the sub-regions as arrays, in pixels for the
+        former and in ``unit`` for the others (see `_bounds_values`).
+
+        The arrays are cached on the region, and recomputed when its
+        sub-regions are added, removed or replaced.
+        """
+        subregions = self._subregions
+        cache = getattr(self, '_bounds_cache', None)
+        if cache is None or len(cache[0]) != len(subregions) or \
+                any(a is not b for a, b in zip(cache[0], subregions)):
+            cache = self._bounds_cache = (tuple(subregions), {})
+
+        arrays = cache[1]
+        if unit not in arrays:
+            is_pixel = {}
+            for x in subregions:
+                if x[0].unit not in is_pixel:
+                    is_pixel[x[0].unit] = x[0].unit.is_equivalent(u.pix)
+            is_pixel = np.array([is_pixel[x[0].unit] for x in subregions],
+                                dtype=bool)
+
+            lower = np.zeros(len(subregions))
+            upper = np.zeros(len(subregions))
+            if np.any(is_pixel):
+                lower[is_pixel] = [x[0].value for x, p in
+                                   zip(subregions, is_pixel) if p]
+                upper[is_pixel] = [x[1].value for x, p in
+                                   zip(subregions, is_pixel) if p]
+            if not np.all(is_pixel):
+                lower[~is_pixel], upper[~is_pixel] = self._bounds_values(
+                    [x for x, p in zip(subregions, is_pixel) if not p], unit)
+
+            arrays[unit] = is_pixel, lower, upper
+
+        return arrays[unit]
+
+    def _edge_indices(self, spectral_axis):
+        """
+        Compute the left (inclusive) and right (exclusive) pixel index of
+        each sub-region on ``spectral_axis``.
+
+        This is the single definition of the pixels of a region shared by
+        `~specutils.manipulation.extract_region`, `to_mask` and the analysis
+        functions.  Spectral values are treated as a closed interval and are
+        located over all the sub-regions at once, arithmetically on axes with
+        a `~specutils.SpectralAxis.grid` and with a single vectorized
+        `~numpy.searchsorted` per side otherwise.  As in earlier versions of
+        `~specutils.manipulation.extract_region`, a bound past the end of an
+        axis that is ascending in length space stops at (and excludes) the
+        last pixel.  Pixel bounds are floored/ceiled directly.
+
+        Parameters
+        ----------
+        spectral_axis : `~astropy.units.Quantity` or `~specutils.SpectralAxis`
+            The monotonic spectral axis the region is applied to.
+
+        Returns
+        -------
+        left, right : `~numpy.ndarray`
+            Integer arrays with one entry per sub-region.
+        """
+        n = spectral_axis.shape[-1]
+        left = np.zeros(len(self._subregions), dtype=int)
+        right = np.zeros(len(self._subregions), dtype=int)
+
+        is_pixel, lower, upper = self._bounds_arrays(spectral_axis.unit)
+
+        if np.any(is_pixel):
+            left[is_pixel] = np.floor(lower[is_pixel])
+            right[is_pixel] = np.ceil(upper[is_pixel])
+
+        if not np.all(is_pixel):
+            in_values = ~is_pixel
+
+            def bounds(unit):
+                _, lower, upper = self._bounds_arrays(unit)
+                return lower[in_values], upper[in_values]
+
+            left[in_values], right[in_values] = _locate_edges(spectral_axis,
+                                                              bounds)
+
+        left = np.clip(left, 0, n)
+        right = np.clip(right, 0, n)
+
+        return left, np.maximum(left, right)
+
+    @staticmethod
+    def _search_bounds(values, descending, lower, upper):
+        """
+        Locate the closed intervals ``[lower, upper]`` on a monotonic axis,
+        given as its ``values`` in ascending order and whether it is
+        descending (see `~specutils.SpectralAxis._monotonic_index`), returning
+        their left (inclusive) and right (exclusive) indices on the axis.
+        """
+        if descending:
+            # Map the indices on the reversed (ascending) values back.
+            n = len(values)
+            return (n - np.searchsorted(values, upper, side='right'),
+                    n - np.searchsorted(values, lower, side='left'))
+
+        return (np.searchsorted(values, lower, side='left'),
+                np.searchsorted(values, upper, side='right'))
+
+    def to_mask(self, spectral_axis):
+        """
+        Compute a boolean mask that is `True` for every element of
+        ``spectral_axis`` that falls inside any of the sub-regions.
+
+        The pixels are the same as those extracted by
+        `~specutils.manipulation.extract_region` (see `_edge_indices`):
+        sub-regions are treated as closed intervals, except that a bound past
+        the end of an ascending axis excludes the last pixel.  Regions defined
+        in ``u.pixel`` select the pixels from ``floor(lower)`` up to (but not
+        including) ``ceil(upper)``.
+
+        Multi-dimensional spectral axes, such as those of a
+        `~specutils.SpectrumCollection`, hold one spectral axis per spectrum
+        along their last axis, and the region is located on each of them.
+
+        Parameters
+        ----------
+        spectral_axis : `~astropy.units.Quantity` or `~specutils.SpectralAxis`
+            The spectral axis of the spectrum, e.g. ``spectrum.spectral_axis``.
+            Must be monotonic (ascending or descending) along its last axis.
+
+        Returns
+        -------
+        mask : `~numpy.ndarray`
+            Boolean array with the same shape as ``spectral_axis``.
+        """
+        if spectral_axis.ndim > 1:
+            rows = u.Quantity(spectral_axis, copy=False)
+            rows = rows.reshape(-1, rows.shape[-1])
+            return np.array([self.to_mask(row) for row in rows],
+                            dtype=bool).reshape(spectral_axis.shape)
+
+        n = spectral_axis.shape[-1]
+        left, right = self._edge_indices(spectral_axis)
+
+        # Mark the start and end of each interval and integrate, so that
+        # overlapping sub-regions are combined without a loop.
+        edges = np.zeros(n + 1, dtype=int)
+        np.add.at(edges, left, 1)
+        np.add.at(edges, right, -1)
+
+        return np.cumsum(edges[:-1]) > 0
+
+    def to_indices(self, spectral_axis):
+        """
+        Compute the (sorted, unique) indices of the elements of
+        ``spectral_axis`` that fall inside any of the sub-regions.
+
+        See `~specutils.SpectralRegion.to_mask` for the interval conventions.
+
+        Parameters
+        ----------
+        spectral_axis : `~astropy.units.Quantity` or `~specutils.SpectralAxis`
+            The spectral axis of the spectrum, e.g. ``spectrum.spectral_axis``.
+
+        Returns
+        -------
+        indices : `~numpy.ndarray`
+            Integer array of pixel indices.
+        """
+        return np.flatnonzero(self.to_mask(spectral_axis))
+
     def invert_from_spectrum(self, spectrum):
         """
         Invert a SpectralRegion based on the extent of the
@@ -311,3 +509,65 @@ class SpectralRegion:
         #
 
         return SpectralRegion([(x, y) for x, y in zip(newlist[0::2], newlist[1::2])])
+
+
+def _monotonic_index(spectral_axis, unit=None):
+    """
+    The ascending values of ``spectral_axis`` in ``unit`` and whether it is
+    descending, cached on `~specutils.SpectralAxis` instances.
+    """
+    if isinstance(spectral_axis, SpectralAxis):
+        return spectral_axis._monotonic_index(unit)
+
+    spectral_axis = u.Quantity(spectral_axis, copy=False)
+    if unit is not None:
+        spectral_axis = spectral_axis.to(unit, u.spectral())
+
+    return SpectralAxis._sorted_values(spectral_axis.value)
+
+
+def _locate_edges(spectral_axis, bounds):
+    """
+    Left (inclusive) and right (exclusive) indices of closed intervals of
+    spectral values on ``spectral_axis``, following the rules of
+    `SpectralRegion._edge_indices`: a bound past the end of an axis that is
+    ascending in length space stops at (and excludes) the last pixel.
+
+    ``bounds`` is a callable returning the lower and upper bounds of the
+    intervals as arrays in the unit it is given.
+    """
+    unit = spectral_axis.unit
+    lower, upper = bounds(unit)
+    left, right = _locate_bounds(spectral_axis, lower, upper)
+
+    # TODO: spectral regions cannot handle strictly ascending spectral
+    #  axis values. Instead, convert to length space if axis given in
+    #  a desceninding unit space (e.g. frequency). Bounds past the end
+    #  of an axis that is ascending in length space stop at the last
+    #  pixel.
+    if unit.physical_type != 'length' and \
+            unit.is_equivalent(u.AA, equivalencies=u.spectral()):
+        unit = u.AA
+        lower, upper = bounds(unit)
+
+    values, descending = _monotonic_index(spectral_axis, unit)
+    if values.size > 1 and not descending:
+        last = values.size - 1
+        left = np.where(lower > values[-1], last, left)
+        right = np.where(upper > values[-1], last, right)
+
+    return left, right
+
+
+def _locate_bounds(spectral_axis, lower, upper):
+    """
+    Left (inclusive) and right (exclusive) indices of the closed intervals
+    ``[lower, upper]`` on ``spectral_axis``, computed arithmetically for
+    uniformly spaced axes and with `~numpy.searchsorted` otherwise.
+    """
+    if isinstance(spectral_axis, SpectralAxis) and \
+            spectral_axis.grid is not None:
+        return spectral_axis._locate(lower, upper)
+
+    return SpectralRegion._search_bounds(*_monotonic_index(spectral_axis),
+                                         lower, upper)
@@ -3,11 +3,14 @@ from copy import deepcopy
 
 import numpy as np
 from astropy import units as u
-from astropy.nddata import NDDataRef
-from astropy.utils.decorators import lazyproperty
+from astropy.nddata import (NDDataRef, StdDevUncertainty, VarianceUncertainty,
+                            InverseVariance)
+from astropy import wcs as fitswcs
+from astropy.utils.decorators import lazyproperty, sharedmethod
 from .spectrum_mixin import OneDSpectrumMixin
 from .spectral_axis import SpectralAxis
 from ..utils.wcs_utils import gwcs_from_array
+from ..utils.dtype_utils import result_dtype
 
 __all__ = ['Spectrum1D']
 
@@ -156,6 +159,12 @@ class Spectrum1D(OneDSpectrumMixin, NDDataRef):
                 raise ValueError("Spectral axis must be a `Quantity` or "
                                  "`SpectralAxis` object.")
 
+            # The GWCS is built lazily, so its check that the spectral axis
+            # is one-dimensional is done here.
+            if spectral_axis.ndim != 1:
+                raise ValueError("Spectral axis must be one-dimensional, got "
+                                 "shape {}.".format(spectral_axis.shape))
+
             # If spectral axis is provided as an astropy Quantity, convert it
             # to a specutils SpectralAxis object.
             if not isinstance(spectral_axis, SpectralAxis):
@@ -179,7 +188,9 @@ class Spectrum1D(OneDSpectrumMixin, NDDataRef):
 
                 self._spectral_axis = spectral_axis
 
-            wcs = gwcs_from_array(self._spectral_axis)
+            # The GWCS lookup table of the spectral axis is only built when
+            # the ``wcs`` is first accessed.
+            wcs = None
         elif wcs is None:
             # If no spectral axis or wcs information is provided, initialize
             # with an empty gwcs based on the flux.
@@ -190,6 +201,9 @@ class Spectrum1D(OneDSpectrumMixin, NDDataRef):
             data=flux.value if isinstance(flux, u.Quantity) else flux,
             wcs=wcs, **kwargs)
 
+        if spectral_axis is not None:
+            self._wcs_spectral_axis = self._spectral_axis
+
         # If no spectral_axis was provided, create a SpectralCoord based on
         # the WCS
         if spectral_axis is None:
@@ -206,6 +220,12 @@ class Spectrum1D(OneDSpectrumMixin, NDDataRef):
                 doppler_rest=rest_value,
                 doppler_convention=velocity_convention)
 
+            # The values of linear and logarithmic FITS spectral axes are
+            # uniformly spaced, so their grid is known without checking them.
+            scale = _fits_wcs_scale(wcs)
+            if scale is not None:
+                self._spectral_axis._set_grid(scale)
+
         if hasattr(self, 'uncertainty') and self.uncertainty is not None:
             if not flux.shape == self.uncertainty.array.shape:
                 raise ValueError(
@@ -222,33 +242,44 @@ class Spectrum1D(OneDSpectrumMixin, NDDataRef):
                 ``Spectrum1D`` where all attributes are sliced.
             2.) When flux is multi-dimensional (i.e. several fluxes over the
                 same spectral axis), indexing returns a new ``Spectrum1D`` with
-                the sliced flux range and a deep copy of all other attributes.
-
-        The first case is handled by the parent class, while the second is
-        handled here.
-        """
-        if len(self.flux.shape) > 1:
-            return self._copy(
-                flux=self.flux[item],
-                uncertainty=self.uncertainty[item]
-                if self.uncertainty is not None else None)
-
-        if not isinstance(item, slice):
-            item = slice(item, item+1, None)
-
-        tmp_spec = super().__getitem__(item)
-
-        # TODO: this is a workaround until we figure out how to deal with non-
-        #  strictly ascending spectral axes. Currently, the wcs is created from
-        #  a spectral axis array by converting to a length physical type. On
-        #  a regular slicing operation, the wcs is handed back to the
-        #  initializer and a new spectral axis is created. This would then also
-        #  be in length units, which may not be the units used initially. So,
-        #  we create a new ``Spectrum1D`` that includes the sliced spectral
-        #  axis. This means that a new wcs object will be created with the
-        #  appropriate unit translation handling.
-        return tmp_spec._copy(
-            spectral_axis=self.spectral_axis[item])
+                the sliced flux range and the same spectral axis. Indexing
+                all the dimensions also slices the spectral axis with the last
+                index.
+
+        For basic indices (integers and slices), the flux, uncertainty, mask
+        and spectral axis of the new spectrum are views of those of this
+        one, so modifying them in place modifies this spectrum. The meta is
+        copied. Use `copy` for an independent spectrum.
+        """
+        if self.flux.ndim > 1:
+            spectral_item = slice(None)
+            if isinstance(item, tuple) and item and \
+                    item[-1] is not Ellipsis and \
+                    (len(item) == self.flux.ndim or
+                     any(x is Ellipsis for x in item)):
+                spectral_item = item[-1]
+        else:
+            if isinstance(item, (int, np.integer)):
+                item = slice(item, item + 1 or None)
+            spectral_item = item
+
+        if isinstance(spectral_item, (int, np.integer)):
+            spectral_item = slice(spectral_item, spectral_item + 1 or None)
+            item = item[:-1] + (spectral_item,)
+
+        return self.__class__(
+            flux=self.flux[item],
+            spectral_axis=self.spectral_axis[spectral_item],
+            uncertainty=None if self.uncertainty is None
+            else self.uncertainty[item],
+            mask=None if self.mask is None else self.mask[item],
+            meta=deepcopy(self.meta))
+
+    def copy(self):
+        """
+        Return a deep copy of the spectrum, which shares no data with it.
+        """
+        return self._copy()
 
     def _copy(self, **kwargs):
         """
@@ -259,7 +290,6 @@ class Spectrum1D(OneDSpectrumMixin, NDDataRef):
             flux=deepcopy(self.flux),
             spectral_axis=deepcopy(self.spectral_axis),
             uncertainty=deepcopy(self.uncertainty),
-            wcs=deepcopy(self.wcs),
             mask=deepcopy(self.mask),
             meta=deepcopy(self.meta),
             unit=deepcopy(self.unit),
@@ -268,8 +298,36 @@ class Spectrum1D(OneDSpectrumMixin, NDDataRef):
 
         alt_kwargs.update(kwargs)
 
+        # The WCS is rebuilt from the spectral axis when there is one, so it
+        # is only copied (and built) otherwise.
+        if alt_kwargs['spectral_axis'] is None:
+            alt_kwargs.setdefault('wcs', deepcopy(self.wcs))
+
         return self.__class__(**alt_kwargs)
 
+    @property
+    def wcs(self):
+        """
+        The WCS of the spectrum. For spectra created from a spectral axis, a
+        GWCS lookup table of the axis is built the first time it is accessed.
+        """
+        spectral_axis = getattr(self, '_wcs_spectral_axis', None)
+        if spectral_axis is not None:
+            self._wcs_spectral_axis = None
+            NDDataRef.wcs.fset(self, gwcs_from_array(spectral_axis))
+
+        return self._wcs
+
+    @wcs.setter
+    def wcs(self, wcs):
+        # A pending WCS is built before being replaced, so that setting the
+        # WCS behaves as if it had been built on creation.
+        if wcs is not None:
+            self.wcs
+        self._wcs_spectral_axis = None
+
+        NDDataRef.wcs.fset(self, wcs)
+
     @property
     def frequency(self):
         """
@@ -310,6 +368,24 @@ class Spectrum1D(OneDSpectrumMixin, NDDataRef):
     def bin_edges(self):
         return self.spectral_axis.bin_edges
 
+    def build_cumulative_index(self):
+        """
+        Build a `~specutils.analysis.CumulativeIndex` of this spectrum and
+        attach it, so that the analysis functions answer region queries from
+        its prefix sums instead of extracting every region. The index must be
+        rebuilt after modifying the flux, mask or uncertainty in place.
+
+        Returns
+        -------
+        index : `~specutils.analysis.CumulativeIndex`
+            The attached index.
+        """
+        from ..analysis.cumulative import CumulativeIndex
+
+        self._cumulative_index = CumulativeIndex(self)
+
+        return self._cumulative_index
+
     @property
     def shape(self):
         return self.flux.shape
@@ -382,6 +458,248 @@ class Spectrum1D(OneDSpectrumMixin, NDDataRef):
 
         return self.divide(other)
 
+    def __iadd__(self, other):
+        if not isinstance(other, NDDataRef):
+            other = u.Quantity(other, unit=self.unit)
+
+        return self._inplace_arithmetic(np.add, other)
+
+    def __isub__(self, other):
+        if not isinstance(other, NDDataRef):
+            other = u.Quantity(other, unit=self.unit)
+
+        return self._inplace_arithmetic(np.subtract, other)
+
+    def __imul__(self, other):
+        if not isinstance(other, NDDataRef):
+            other = u.Quantity(other)
+
+        return self._inplace_arithmetic(np.multiply, other)
+
+    def __itruediv__(self, other):
+        if not isinstance(other, NDDataRef):
+            other = u.Quantity(other)
+
+        return self._inplace_arithmetic(np.true_divide, other)
+
+    @sharedmethod
+    def add(self, operand, operand2=None, out=None, **kwargs):
+        """
+        Add ``operand`` to this spectrum, or ``operand2`` to ``operand`` if
+        it is given. See `~astropy.nddata.NDArithmeticMixin.add`.
+
+        Spectra that share their spectral axis, or have equal ones, and
+        `~astropy.units.Quantity` operands are added directly, propagating
+        the variance of the uncertainties analytically. The result is then
+        written to the flux, uncertainty and mask of the spectrum ``out``
+        if it is given, e.g. ``spectrum.add(other, out=spectrum)``.
+        """
+        return self._dispatch_arithmetic(np.add, operand, operand2, out,
+                                         kwargs)
+
+    @sharedmethod
+    def subtract(self, operand, operand2=None, out=None, **kwargs):
+        """
+        Subtract ``operand`` from this spectrum, or ``operand2`` from
+        ``operand`` if it is given. See
+        `~astropy.nddata.NDArithmeticMixin.subtract` and `add` for the fast
+        path and ``out``.
+        """
+        return self._dispatch_arithmetic(np.subtract, operand, operand2, out,
+                                         kwargs)
+
+    @sharedmethod
+    def multiply(self, operand, operand2=None, out=None, **kwargs):
+        """
+        Multiply this spectrum by ``operand``, or ``operand`` by ``operand2``
+        if it is given. See `~astropy.nddata.NDArithmeticMixin.multiply` and
+        `add` for the fast path and ``out``.
+        """
+        return self._dispatch_arithmetic(np.multiply, operand, operand2, out,
+                                         kwargs)
+
+    @sharedmethod
+    def divide(self, operand, operand2=None, out=None, **kwargs):
+        """
+        Divide this spectrum by ``operand``, or ``operand`` by ``operand2``
+        if it is given. See `~astropy.nddata.NDArithmeticMixin.divide` and
+        `add` for the fast path and ``out``.
+        """
+        return self._dispatch_arithmetic(np.true_divide, operand, operand2,
+                                         out, kwargs)
+
+    @sharedmethod
+    def _dispatch_arithmetic(self, operation, operand, operand2, out, kwargs):
+        """
+        Apply ``operation`` with the fast path of `_fast_arithmetic` if the
+        operands allow it, and otherwise with
+        `~astropy.nddata.NDArithmeticMixin`.
+        """
+        first, second = (self, operand) if operand2 is None \
+            else (operand, operand2)
+
+        # Options of the NDArithmetic handling of the uncertainty, mask, meta
+        # and WCS are only honoured by the general path.
+        if isinstance(first, Spectrum1D) and not kwargs:
+            result = first._fast_arithmetic(operation, second, out)
+            if result is not None:
+                return result
+
+        if out is not None:
+            raise ValueError("out is only supported for spectra that share "
+                             "their spectral axis with a spectrum or "
+                             "Quantity operand.")
+
+        return self._prepare_then_do_arithmetic(operation, operand, operand2,
+                                                **kwargs)
+
+    def _inplace_arithmetic(self, operation, other):
+        """
+        Apply ``operation`` in place for the augmented assignment operators,
+        which fall back to the binary operators if the fast path does not
+        apply.
+        """
+        # Results that broadcast to a larger shape than the flux of this
+        # spectrum are new spectra, as returned by the binary operators.
+        operand = other.data if isinstance(other, NDDataRef) else other
+        try:
+            shape = np.broadcast_shapes(self.data.shape, np.shape(operand))
+        except ValueError:
+            return NotImplemented
+        if shape != self.data.shape:
+            return NotImplemented
+
+        if self._fast_arithmetic(operation, other, out=self) is None:
+            return NotImplemented
+
+        return self
+
+    def _shares_spectral_axis(self, other):
+        """
+        Whether ``other`` is a spectrum with the same spectral axis object as
+        this one, or with an equal one.
+        """
+        a, b = self.spectral_axis, getattr(other, 'spectral_axis', None)
+
+        return a is b or (isinstance(b, u.Quantity) and a.shape == b.shape and
+                          a.unit == b.unit and
+                          np.array_equal(a.value, b.value))
+
+    def _fast_arithmetic(self, operation, other, out=None):
+        """
+        Apply the ufunc ``operation`` to the flux of this spectrum and
+        ``other``, a spectrum on the same spectral axis or a
+        `~astropy.units.Quantity`, without the WCS comparison and
+        uncertainty objects of `~astropy.nddata.NDArithmeticMixin`.
+
+        The variances of standard deviation, variance and inverse variance
+        uncertainties are propagated analytically, assuming the operands are
+        uncorrelated as `~astropy.nddata.NDArithmeticMixin` does, and masks
+        are combined with a logical or. Returns `None`, without doing
+        anything, if the operands are not supported.
+        """
+        if isinstance(other, Spectrum1D):
+            if not self._shares_spectral_axis(other):
+                return None
+            b, b_unit = other.data, other.unit
+        elif isinstance(other, u.Quantity) and \
+                not isinstance(other, NDDataRef):
+            b, b_unit = other.value, other.unit
+            other = None
+        else:
+            return None
+
+        uncertainties = [getattr(operand, 'uncertainty', None)
+                         for operand in (self, other)]
+        types = {type(unc) for unc in uncertainties if unc is not None}
+        if len(types) > 1 or not types <= set(_VARIANCE_CONVERSIONS):
+            return None
+
+        try:
+            shape = np.broadcast_shapes(self.data.shape, np.shape(b))
+        except ValueError:
+            return None
+        if shape[-1:] != self.data.shape[-1:]:
+            return None
+
+        if out is not None and (not isinstance(out, Spectrum1D) or
+                                out.data.shape != shape or
+                                not self._shares_spectral_axis(out)):
+            raise ValueError("out must be a spectrum with the shape {} of "
+                             "the result and the same spectral axis."
+                             "".format(shape))
+
+        a, unit = self.data, self.unit
+        if operation in (np.add, np.subtract):
+            factor = b_unit.to(unit)
+            if factor != 1:
+                b = b * factor
+        else:
+            factor = 1
+            unit = unit * b_unit if operation is np.multiply \
+                else unit / b_unit
+
+        # With the 'preserve' policy, the type of the result is that of the
+        # spectra, which Quantity operands (e.g. calibration curves) do not
+        # change.
+        dtype = result_dtype(a, b) if other is not None else result_dtype(a)
+
+        variance = _propagate_variance(
+            operation, a, b, _variance(self),
+            None if other is None else _variance(other, factor), shape, dtype)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            if out is None:
+                flux = operation(a, b, dtype=dtype)
+            else:
+                flux = operation(a, b, out=out.data)
+
+        uncertainty = None
+        if variance is not None:
+            uncertainty_type = types.pop()
+            from_variance = _VARIANCE_CONVERSIONS[uncertainty_type][1]
+            if from_variance is not None:
+                with np.errstate(divide='ignore'):
+                    from_variance(variance, out=variance)
+            uncertainty = uncertainty_type(variance, copy=False)
+
+        masks = [mask for mask in (self.mask, getattr(other, 'mask', None))
+                 if mask is not None]
+
+        if out is None:
+            mask = None
+            if masks:
+                mask = np.broadcast_to(np.logical_or(masks[0], masks[-1]),
+                                       shape).copy()
+
+            result = self.__class__(flux=u.Quantity(flux, unit, copy=False),
+                                    spectral_axis=self.spectral_axis,
+                                    uncertainty=uncertainty, mask=mask)
+
+            # The WCS of spectra that were not created from their spectral
+            # axis (e.g. a FITS WCS) is kept, as by NDArithmeticMixin.
+            if self._wcs_spectral_axis is None:
+                result._wcs_spectral_axis = None
+                NDDataRef.wcs.fset(result, self.wcs)
+
+            return result
+
+        if not masks:
+            out.mask = None
+        elif isinstance(out.mask, np.ndarray) and out.mask.dtype == bool \
+                and out.mask.shape == shape:
+            np.logical_or(masks[0], masks[-1], out=out.mask)
+        else:
+            out.mask = np.broadcast_to(np.logical_or(masks[0], masks[-1]),
+                                       shape).copy()
+
+        out._unit = unit
+        out.uncertainty = uncertainty
+
+        out._clear_derived_results()
+
+        return out
+
     def _format_array_summary(self, label, array):
         if len(array) == 1:
             mean = np.mean(array)
@@ -427,3 +745,86 @@ class Spectrum1D(OneDSpectrumMixin, NDDataRef):
         result = "<Spectrum1D({})>".format(inner_str)
 
         return result
+
+
+def _fits_wcs_scale(wcs):
+    """
+    The spacing, ``'linear'`` or ``'log'``, of the spectral axis of a
+    one-dimensional FITS WCS without distortions, or `None`.
+    """
+    if not isinstance(wcs, fitswcs.WCS) or wcs.naxis != 1 or \
+            wcs.has_distortion:
+        return None
+
+    ctype = wcs.wcs.ctype[0].strip().upper()
+    if '-' not in ctype:
+        return 'linear'
+    if ctype.endswith('-LOG'):
+        return 'log'
+
+    return None
+
+
+# The uncertainty classes propagated by the arithmetic fast path, with the
+# ufuncs converting their values to and from variances (`None` for the
+# identity) and the power of the flux unit their unit is the variance of.
+_VARIANCE_CONVERSIONS = {
+    StdDevUncertainty: (np.square, np.sqrt, 2),
+    VarianceUncertainty: (None, None, 1),
+    InverseVariance: (np.reciprocal, np.reciprocal, -1),
+}
+
+
+def _variance(spectrum, factor=1):
+    """
+    The variance of the flux of ``spectrum`` in its flux unit squared, for
+    the flux multiplied by ``factor``, or `None` if it has no uncertainty.
+    """
+    uncertainty = spectrum.uncertainty
+    if uncertainty is None:
+        return None
+
+    to_variance, _, power = _VARIANCE_CONVERSIONS[type(uncertainty)]
+    variance = uncertainty.array
+    if to_variance is not None:
+        with np.errstate(divide='ignore'):
+            variance = to_variance(variance)
+
+    if uncertainty.unit is not None:
+        factor = factor**2 * (uncertainty.unit**power).to(spectrum.unit**2)
+    else:
+        factor = factor**2
+
+    return variance * factor if factor != 1 else variance
+
+
+def _propagate_variance(operation, a, b, var_a, var_b, shape, dtype=None):
+    """
+    The variance, with shape ``shape``, of ``operation(a, b)`` for
+    uncorrelated operands of variances ``var_a`` and ``var_b``, either of
+    which may be `None` for an exact operand. Always a new array of type
+    ``dtype`` (float64 by default), or `None` if both are `None`.
+    """
+    if dtype is None:
+        dtype = np.dtype(float)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if operation is np.multiply:
+            var_a = None if var_a is None else var_a * np.square(b)
+            var_b = None if var_b is None else var_b * np.square(a)
+        elif operation is np.true_divide:
+            var_a = None if var_a is None else var_a / np.square(b)
+            var_b = None if var_b is None else \
+                var_b * np.square(a / np.square(b))
+
+    terms = [var for var in (var_a, var_b) if var is not None]
+    if not terms:
+        return None
+    if len(terms) == 2:
+        variance = np.add(*terms, dtype=dtype)
+        if variance.shape == shape:
+            return variance
+    else:
+        variance = terms[0]
+
+    return np.array(np.broadcast_to(variance, shape), dtype=dtype)
@@ -8,6 +8,7 @@ from astropy.utils.decorators import lazyproperty, deprecated
 from astropy.wcs.wcsapi import HighLevelWCSWrapper
 
 from specutils.utils.wcs_utils import gwcs_from_array
+from specutils.utils.dtype_utils import result_dtype
 
 DOPPLER_CONVENTIONS = {}
 DOPPLER_CONVENTIONS['radio'] = u.doppler_radio
@@ -84,10 +85,16 @@ class OneDSpectrumMixin:
         """
         return u.Quantity(self.data, unit=self.unit, copy=False)
 
-    def new_flux_unit(self, unit, equivalencies=None, suppress_conversion=False):
+    def new_flux_unit(self, unit, equivalencies=None, suppress_conversion=False,
+                      inplace=False, dtype=None):
         """
-        Converts the flux data to the specified unit.  This is an in-place
-        change to the object.
+        Converts the flux data to the specified unit.
+
+        Conversions between flux units with the default spectral density
+        equivalencies are linear, so they are applied as a multiplication by
+        a conversion factor (a scalar for a pure change of scale, or one
+        value per pixel otherwise), which is cached on the spectral axis for
+        each pair of units.
 
         Parameters
         ----------
@@ -102,27 +109,96 @@ class OneDSpectrumMixin:
             Set to true if updating the unit without
             converting data values.
 
+        inplace : bool
+            Set to true to convert the flux of this spectrum instead of
+            returning a copy. Floating point fluxes are then multiplied by
+            the conversion factor in place, without allocating a new array.
+
+        dtype : `~numpy.dtype`, optional
+            Floating point type of the converted flux, when it is not
+            converted in place. By default it follows
+            ``specutils.conf.dtype_policy``.
+
         Returns
         -------
         `~specutils.Spectrum1D`
-            A new spectrum with the converted flux array
+            A new spectrum with the converted flux array, or this spectrum
+            if ``inplace`` is set.
         """
-        new_spec = deepcopy(self)
+        if inplace:
+            new_spec = self
+        elif suppress_conversion:
+            new_spec = deepcopy(self)
+        else:
+            # The flux is replaced by the converted one, so it is shared
+            # with the copy instead of being copied too.
+            new_spec = deepcopy(self, {id(self._data): self._data})
+
+        if suppress_conversion:
+            new_spec._unit = u.Unit(unit)
+            return new_spec
+
+        factor = self._flux_conversion_factor(unit, equivalencies)
 
-        if not suppress_conversion:
+        if factor is None:
             if equivalencies is None:
                 equivalencies = eq.spectral_density(self.spectral_axis)
 
-            new_data = self.flux.to(
-                unit, equivalencies=equivalencies)
+            new_data = self.flux.to(unit, equivalencies=equivalencies)
 
             new_spec._data = new_data.value
             new_spec._unit = new_data.unit
         else:
+            data = self._data
+            if not inplace or data.dtype.kind not in 'fc' or \
+                    not data.flags.writeable:
+                new_spec._data = np.multiply(
+                    data, factor, dtype=result_dtype(data, dtype=dtype))
+            elif np.any(factor != 1):
+                np.multiply(data, factor, out=data)
+
             new_spec._unit = u.Unit(unit)
 
+        if inplace:
+            self._clear_derived_results()
+
         return new_spec
 
+    def _flux_conversion_factor(self, unit, equivalencies=None):
+        """
+        The factor converting the flux to ``unit``, or `None` if the
+        conversion is not a multiplication (or might not be, with custom
+        equivalencies).
+        """
+        try:
+            unit = u.Unit(unit)
+        except (TypeError, ValueError):
+            return None
+
+        if not isinstance(self.unit, u.UnitBase) or \
+                not isinstance(unit, u.UnitBase):
+            return None
+
+        if equivalencies is None:
+            return self.spectral_axis._flux_conversion_factor(self.unit, unit)
+
+        try:
+            return self.unit.to(unit)
+        except u.UnitConversionError:
+            return None
+
+    def _clear_derived_results(self):
+        """
+        Discard the results attached to the spectrum that were derived from
+        its flux, mask or uncertainty, after they are modified in place,
+        including those stored in the active analysis caches.
+        """
+        from ..analysis.caching import evict
+
+        self.__dict__.pop('_cumulative_index', None)
+        self.__dict__.pop('_continuum_statistics', None)
+        evict(self)
+
     @property
     def velocity_convention(self):
         """
@@ -5,15 +5,19 @@ import astropy.units as u
 from astropy.modeling import models
 from astropy.nddata import StdDevUncertainty
 from astropy.stats.funcs import gaussian_sigma_to_fwhm
+from astropy.table import QTable
 from astropy.tests.helper import quantity_allclose
 from astropy.utils.exceptions import AstropyUserWarning
 
-from ..spectra import Spectrum1D, SpectralRegion
+from ..spectra import Spectrum1D, SpectralRegion, SpectrumCollection
 from ..analysis import (line_flux, equivalent_width, snr, centroid,
                         gaussian_sigma_width, gaussian_fwhm, fwhm,
-                        snr_derived, fwzi, is_continuum_below_threshold)
+                        snr_derived, fwzi, is_continuum_below_threshold,
+                        CumulativeIndex, measure, cache, moment_maps,
+                        SpectralIndexWeights, spectral_indices)
 from ..fitting import find_lines_threshold
-from ..manipulation import snr_threshold, FluxConservingResampler
+from ..manipulation import (snr_threshold, FluxConservingResampler,
+                            extract_region)
 from ..tests.spectral_examples import simulated_spectra
 
 
@@ -77,13 +81,29 @@ def test_line_flux_masked():
 
     assert result.unit.is_equivalent(u.Jy * u.um)
 
-    # Flux from masked spectrum should be identical with the
-    # flux from same spectrum but with no mask (because we
-    # interpolate over the masked data).
-    result_unmasked = line_flux(spectrum)
-    assert quantity_allclose(result.value, result_unmasked.value, atol=0.001)
+    # Flux from masked spectrum should be identical with the flux
+    # from the same spectrum with the masked data linearly interpolated
+    # (the spectral axis is uniform).
+    good = ~spectrum_masked.mask
+    interpolated = np.interp(wavelengths.value, wavelengths.value[good],
+                             flux.value[good]) * flux.unit
+    result_interpolated = line_flux(
+        Spectrum1D(spectral_axis=wavelengths, flux=interpolated))
+    assert quantity_allclose(result, result_interpolated)
+
+    # Masked pixels don't contribute to the uncertainty.
+    spectrum_masked.uncertainty.array[~good] = 1e10
+    assert quantity_allclose(line_flux(spectrum_masked).uncertainty,
+                             result.uncertainty)
+
+    # Each spectrum of a multi-dimensional flux is integrated separately.
+    multi = Spectrum1D(spectral_axis=wavelengths,
+                       flux=np.vstack([flux, 2 * flux]),
+                       mask=np.vstack([spectrum_masked.mask] * 2))
+    assert quantity_allclose(line_flux(multi), [1, 2] * result)
 
     # With flux conserving resampler
+    result_unmasked = line_flux(spectrum)
     result = line_flux(spectrum_masked, mask_interpolation=FluxConservingResampler)
     assert quantity_allclose(result.value, result_unmasked.value, atol=0.001)
 
@@ -148,11 +168,16 @@ def test_equivalent_width_masked ():
 
     assert result.unit.is_equivalent(spectrum.wcs.unit)
 
-    # Compare with unmasked computation.
-    result_unmasked = equivalent_width(spectrum)
-    assert quantity_allclose(result.value, result_unmasked.value, atol=0.001)
+    # Compare with the masked data linearly interpolated.
+    good = ~spectrum_masked.mask
+    interpolated = np.interp(wavelengths.value, wavelengths.value[good],
+                             flux.value[good]) * flux.unit
+    result_interpolated = equivalent_width(
+        Spectrum1D(spectral_axis=wavelengths, flux=interpolated))
+    assert quantity_allclose(result, result_interpolated)
 
     # With flux conserving resampler
+    result_unmasked = equivalent_width(spectrum)
     result = equivalent_width(spectrum_masked,
                               mask_interpolation=FluxConservingResampler)
     assert quantity_allclose(result.value, result_unmasked.value, atol=0.001)
@@ -176,6 +201,33 @@ def test_equivalent_width_regions():
     assert quantity_allclose(result, expected, atol=0.02*u.GHz)
 
 
+def test_equivalent_width_subregions():
+    spectral_axis = np.arange(1, 101) * u.AA
+    spectrum = Spectrum1D(spectral_axis=spectral_axis,
+                          flux=np.full(100, 0.5) * u.Jy)
+    first = SpectralRegion(10*u.AA, 20*u.AA)
+    second = SpectralRegion(50*u.AA, 70*u.AA)
+    region = first + second
+
+    # The widths and line fluxes of all the sub-regions are added up.
+    expected = equivalent_width(spectrum, regions=first) + \
+        equivalent_width(spectrum, regions=second)
+
+    assert quantity_allclose(equivalent_width(spectrum, regions=region),
+                             expected)
+    assert quantity_allclose(
+        equivalent_width(spectrum, continuum=np.ones(100), regions=region),
+        expected)
+    assert quantity_allclose(
+        measure(spectrum, region,
+                quantities=['equivalent_width'])['equivalent_width'],
+        [expected])
+
+    spectrum.build_cumulative_index()
+    assert quantity_allclose(equivalent_width(spectrum, regions=region),
+                             expected)
+
+
 @pytest.mark.parametrize('continuum', [1*u.Jy, 2*u.Jy, 5*u.Jy])
 def test_equivalent_width_continuum(continuum):
 
@@ -199,6 +251,44 @@ def test_equivalent_width_continuum(continuum):
     assert quantity_allclose(result, expected, atol=0.01*u.GHz)
 
 
+def test_equivalent_width_continuum_array():
+
+    np.random.seed(42)
+
+    wavelengths = np.linspace(4000, 5000, 500) * u.AA
+    g = models.Gaussian1D(amplitude=0.5, mean=4500, stddev=10)
+    normalized = 1 - g(wavelengths.value)
+    slopes = np.array([[1e-4], [5e-4], [-2e-4]])
+    continuum = (2 + slopes * (wavelengths.value - 4000)) * u.Jy
+    flux = normalized * continuum
+    region = SpectralRegion(4400*u.AA, 4600*u.AA)
+
+    # Every spectrum is normalized by its own continuum.
+    spectrum = Spectrum1D(spectral_axis=wavelengths, flux=flux)
+    expected = equivalent_width(
+        Spectrum1D(spectral_axis=wavelengths, flux=normalized*u.Jy),
+        regions=region)
+    result = equivalent_width(spectrum, continuum=continuum, regions=region)
+    assert result.shape == (3,)
+    assert quantity_allclose(result, expected)
+
+    # Model sets are evaluated on the spectral axis, one per spectrum.
+    model = models.Linear1D(slope=slopes.ravel(),
+                            intercept=2 - 4000 * slopes.ravel(), n_models=3)
+    assert quantity_allclose(
+        equivalent_width(spectrum, continuum=model, regions=region), expected)
+
+    # A scalar continuum gives the same results as before.
+    single = Spectrum1D(spectral_axis=wavelengths, flux=2 * normalized * u.Jy)
+    assert quantity_allclose(
+        equivalent_width(single, continuum=2*u.Jy, regions=region),
+        equivalent_width(single,
+                         continuum=np.full(500, 2) * u.Jy, regions=region))
+
+    with pytest.raises(ValueError):
+        equivalent_width(spectrum, continuum=continuum[:2], regions=region)
+
+
 def test_equivalent_width_absorption():
 
     np.random.seed(42)
@@ -422,6 +512,70 @@ def test_snr_derived_masked():
     assert np.allclose(snr_derived(spectrum, [sr, sr2]), [4.01610033, 1.94906157])
 
 
+def test_snr_derived_multidim(tmp_path):
+    np.random.seed(42)
+
+    x = np.arange(1, 101) * u.um
+    y = np.random.random((3, 2, len(x)))
+    mask = np.random.randn(*y.shape) > 0
+    # Leave too few unmasked pixels in the region of one of the spectra.
+    mask[1, 0, 35:50] = True
+
+    sr = SpectralRegion(38*u.um, 48*u.um)
+
+    # Each spectrum gives the same S/N as on its own.
+    spectrum = Spectrum1D(spectral_axis=x, flux=y*u.Jy, mask=mask)
+    expected = [[snr_derived(Spectrum1D(spectral_axis=x, flux=y[i, j]*u.Jy,
+                                        mask=mask[i, j]), sr)
+                 for j in range(2)] for i in range(3)]
+
+    result = snr_derived(spectrum, sr)
+    assert result.shape == (3, 2)
+    assert quantity_allclose(result, u.Quantity(expected))
+    assert result[1, 0] == 0
+
+    unmasked = Spectrum1D(spectral_axis=x, flux=y*u.Jy)
+    assert quantity_allclose(
+        snr_derived(unmasked)[2, 1],
+        snr_derived(Spectrum1D(spectral_axis=x, flux=y[2, 1]*u.Jy)))
+
+    # Memory-mapped fluxes can be processed a few spectra at a time.
+    filename = str(tmp_path / 'flux.dat')
+    flux = np.memmap(filename, dtype=float, mode='w+', shape=y.shape)
+    flux[:] = y
+    flux.flush()
+    flux = np.memmap(filename, dtype=float, mode='r', shape=y.shape)
+
+    spectrum = Spectrum1D(spectral_axis=x, flux=flux*u.Jy, mask=mask)
+    for chunk_size in (1, 4, 10):
+        assert quantity_allclose(
+            snr_derived(spectrum, sr, chunk_size=chunk_size), result)
+
+    with pytest.raises(ValueError):
+        snr_derived(spectrum, chunk_size=0)
+
+
+def test_snr_derived_collection():
+    np.random.seed(42)
+
+    spectral_axis = np.vstack([np.linspace(1, 10, 50),
+                               np.linspace(2, 11, 50),
+                               np.linspace(11, 2, 50)]) * u.um
+    flux = np.random.random((3, 50)) * u.Jy
+    mask = np.random.randn(3, 50) > 1
+    collection = SpectrumCollection(flux=flux, spectral_axis=spectral_axis,
+                                    mask=mask)
+    sr = SpectralRegion(3*u.um, 8*u.um)
+
+    # The region selects different pixels in every spectrum.
+    expected = u.Quantity([snr_derived(collection[i], sr) for i in range(3)])
+
+    assert quantity_allclose(snr_derived(collection, sr), expected)
+    assert quantity_allclose(snr_derived(collection, sr, chunk_size=2),
+                             expected)
+    assert quantity_allclose(snr_derived(collection, [sr, sr])[1], expected)
+
+
 def test_centroid(simulated_spectra):
     """
     Test the simple version of the spectral centroid.
@@ -816,8 +970,14 @@ def test_fwhm_multi_spectrum():
     results = fwhm(spectra)
 
     expected = stddevs * gaussian_sigma_to_fwhm
+    assert isinstance(results, u.Quantity)
+    assert results.shape == (3,)
     assert quantity_allclose(results, expected, atol=0.01*u.GHz)
 
+    spectra = Spectrum1D(spectral_axis=frequencies,
+                         flux=flux.reshape(3, 1, -1))
+    assert fwhm(spectra).shape == (3, 1)
+
 
 def test_fwzi():
     np.random.seed(42)
@@ -879,7 +1039,20 @@ def test_fwzi_multi_spectrum():
 
     expected = [113.51706001 * u.AA, 567.21252727 * u.AA, 499.5024546 * u.AA]
 
-    assert quantity_allclose(fwzi(spec), expected)
+    result = fwzi(spec)
+    assert isinstance(result, u.Quantity)
+    assert result.shape == (3,)
+    assert quantity_allclose(result, expected)
+
+    # Each row is masked separately.
+    mask = np.zeros(flux.shape, dtype=bool)
+    mask[1, ::3] = True
+    spec = Spectrum1D(spectral_axis=disp, flux=flux * u.Jy, mask=mask)
+    single = Spectrum1D(spectral_axis=disp, flux=flux[1] * u.Jy, mask=mask[1])
+
+    result = fwzi(spec)
+    assert quantity_allclose(result[[0, 2]], expected[::2])
+    assert quantity_allclose(result[1], fwzi(single))
 
 
 def test_is_continuum_below_threshold():
@@ -927,3 +1100,412 @@ def test_is_continuum_below_threshold():
     with pytest.warns(AstropyUserWarning) as e_info:
         find_lines_threshold(spectrum, noise_factor=1)
         assert len(e_info)==1 and 'if you want to suppress this warning' in e_info[0].message.args[0].lower()
+
+
+def test_is_continuum_below_threshold_per_spectrum():
+    np.random.seed(42)
+
+    wavelengths = np.linspace(300, 1000, 50) * u.nm
+    data = np.random.normal(0, 1, (3, 50))
+    data[1] += 20
+    mask = np.zeros(data.shape, dtype=bool)
+    mask[2, :30] = True
+    data[2, :30] = 100
+    spectrum = Spectrum1D(spectral_axis=wavelengths, flux=data * u.Jy,
+                          mask=mask)
+
+    # Every spectrum is checked against its own unmasked pixels.
+    result = is_continuum_below_threshold(spectrum, threshold=1*u.Jy,
+                                          per_spectrum=True)
+    assert result.tolist() == [True, False, True]
+
+    for i in range(3):
+        single = Spectrum1D(spectral_axis=wavelengths, flux=data[i] * u.Jy,
+                            mask=mask[i])
+        assert is_continuum_below_threshold(single, threshold=3) == \
+            is_continuum_below_threshold(spectrum, threshold=3,
+                                         per_spectrum=True)[i]
+
+    # The statistics are stored on the spectrum until its mask is replaced.
+    statistics = spectrum._continuum_statistics
+    assert is_continuum_below_threshold(spectrum, threshold=1*u.Jy,
+                                        per_spectrum=True).tolist() == \
+        [True, False, True]
+    assert spectrum._continuum_statistics is statistics
+
+    spectrum.mask = None
+    assert is_continuum_below_threshold(spectrum, threshold=1*u.Jy,
+                                        per_spectrum=True).tolist() == \
+        [True, False, False]
+
+    # Or its flux is modified in place.
+    spectrum.data[:] = 0
+    assert is_continuum_below_threshold(spectrum, threshold=1*u.Jy,
+                                        per_spectrum=True).tolist() == \
+        [True, True, True]
+    spectrum.data[1] = 5
+    assert is_continuum_below_threshold(spectrum, threshold=1*u.Jy,
+                                        per_spectrum=True).tolist() == \
+        [True, False, True]
+
+
+def test_cumulative_index():
+    np.random.seed(42)
+    spectral_axis = np.sort(np.random.uniform(4000, 5000, 200)) * u.AA
+    flux = np.random.normal(1, 0.3, 200) * u.Jy
+    uncertainty = StdDevUncertainty(np.random.uniform(0.1, 0.3, 200) * u.Jy)
+    spectrum = Spectrum1D(spectral_axis=spectral_axis, flux=flux,
+                          uncertainty=uncertainty)
+
+    # Includes regions past the ends of the spectral axis.
+    regions = [SpectralRegion(4100*u.AA, 4250*u.AA),
+               SpectralRegion(3900*u.AA, 4020*u.AA),
+               SpectralRegion(4810*u.AA, 5100*u.AA),
+               SpectralRegion(spectral_axis[20], spectral_axis[60])]
+
+    expected_flux = line_flux(spectrum, regions)
+    expected_ew = equivalent_width(spectrum, regions=regions)
+    expected_centroid = centroid(spectrum, regions)
+    expected_snr = snr(spectrum, regions)
+
+    index = spectrum.build_cumulative_index()
+    assert isinstance(index, CumulativeIndex)
+
+    # The spectral axis of the index is searched without being converted
+    # or sorted again for each query.
+    values = index._spectral_axis._monotonic_index()[0]
+    centroid(spectrum, regions)
+    assert index._spectral_axis._monotonic_index()[0] is values
+
+    for expected, result in zip(expected_flux, line_flux(spectrum, regions)):
+        assert quantity_allclose(result, expected)
+        assert quantity_allclose(result.uncertainty, expected.uncertainty)
+
+    assert quantity_allclose(equivalent_width(spectrum, regions=regions),
+                             expected_ew)
+    assert quantity_allclose(centroid(spectrum, regions), expected_centroid)
+    assert quantity_allclose(snr(spectrum, regions), expected_snr)
+
+    # A spectrum with new flux doesn't use the stale index.
+    spectrum = spectrum._copy(flux=2 * flux)
+    spectrum._cumulative_index = index
+    assert quantity_allclose(centroid(spectrum, regions), expected_centroid)
+    assert quantity_allclose(line_flux(spectrum, regions[0]),
+                             2 * expected_flux[0])
+
+
+def test_region_pixels_past_axis_end():
+    # All the analysis functions use the pixels of extract_region, which
+    # excludes the last pixel when the upper bound is past the end of the
+    # axis.
+    np.random.seed(42)
+    spectral_axis = np.arange(10) * u.um
+    flux = np.random.uniform(1, 2, 10) * u.Jy
+    spectrum = Spectrum1D(spectral_axis=spectral_axis, flux=flux,
+                          uncertainty=StdDevUncertainty(np.full(10, 0.1)))
+    region = SpectralRegion(2 * u.um, 20 * u.um)
+    extracted = extract_region(spectrum, region)
+    assert len(extracted.flux) == 7
+
+    for function in (centroid, snr, gaussian_sigma_width, fwhm, fwzi):
+        assert quantity_allclose(function(spectrum, region),
+                                 function(extracted, None))
+
+    table = measure(spectrum, [region],
+                    quantities=['line_flux', 'centroid', 'snr'])
+    assert quantity_allclose(table['line_flux'][0], line_flux(extracted))
+    assert quantity_allclose(table['centroid'][0], centroid(extracted, None))
+    assert quantity_allclose(table['snr'][0], snr(extracted))
+
+    spectrum.build_cumulative_index()
+    assert quantity_allclose(centroid(spectrum, region), centroid(extracted, None))
+    assert quantity_allclose(snr(spectrum, region), snr(extracted))
+
+
+def test_cumulative_index_fractional():
+    spectral_axis = np.arange(10) * u.AA
+    spectrum = Spectrum1D(spectral_axis=spectral_axis,
+                          flux=np.ones((2, 10)) * u.Jy,
+                          uncertainty=StdDevUncertainty(np.ones((2, 10))))
+    index = CumulativeIndex(spectrum)
+
+    result = index.line_flux(SpectralRegion(2.25*u.AA, 5.5*u.AA),
+                             fractional=True)
+    assert quantity_allclose(result, [3.25, 3.25] * u.Jy * u.AA)
+
+    result = index.line_flux(SpectralRegion(2.25*u.AA, 2.5*u.AA),
+                             fractional=True)
+    assert quantity_allclose(result, [0.25, 0.25] * u.Jy * u.AA)
+    assert quantity_allclose(result.uncertainty, [0.25, 0.25] * u.Jy * u.AA)
+
+    # Bounds outside the spectrum are clipped to its bin edges.
+    result = index.line_flux(SpectralRegion(-5*u.AA, 50*u.AA),
+                             fractional=True)
+    assert quantity_allclose(result, [10, 10] * u.Jy * u.AA)
+
+    with pytest.raises(ValueError):
+        index.line_flux(SpectralRegion(2*u.pix, 5*u.pix), fractional=True)
+
+
+def test_measure():
+    np.random.seed(42)
+    spectral_axis = np.linspace(4000, 5000, 300) * u.AA
+    centers = [4200, 4500, 4800] * u.AA
+    flux = sum(models.Gaussian1D(2 * u.Jy, center, 8 * u.AA)(spectral_axis)
+               for center in centers)
+    flux = flux + np.random.normal(0, 0.05, 300) * u.Jy
+    uncertainty = StdDevUncertainty(np.full(300, 0.05) * u.Jy)
+    spectrum = Spectrum1D(spectral_axis=spectral_axis, flux=flux,
+                          uncertainty=uncertainty)
+    regions = [SpectralRegion(center - 25 * u.AA, center + 25 * u.AA)
+               for center in centers]
+
+    table = measure(spectrum, regions)
+
+    assert table.colnames == ['region_index', 'line_flux',
+                              'line_flux_uncertainty', 'equivalent_width',
+                              'centroid', 'gaussian_sigma_width',
+                              'gaussian_fwhm', 'fwhm', 'snr']
+    assert len(table) == 3
+
+    fluxes = line_flux(spectrum, regions)
+    assert quantity_allclose(table['line_flux'], u.Quantity(fluxes))
+    assert quantity_allclose(table['line_flux_uncertainty'],
+                             u.Quantity([f.uncertainty for f in fluxes]))
+    assert quantity_allclose(table['equivalent_width'],
+                             equivalent_width(spectrum, regions=regions))
+    assert quantity_allclose(table['centroid'], centroid(spectrum, regions))
+    assert quantity_allclose(table['gaussian_sigma_width'],
+                             gaussian_sigma_width(spectrum, regions))
+    assert quantity_allclose(table['gaussian_fwhm'],
+                             gaussian_fwhm(spectrum, regions))
+    assert quantity_allclose(table['fwhm'], fwhm(spectrum, regions))
+    assert quantity_allclose(table['snr'], snr(spectrum, regions))
+
+    # Multiple spectra give one row per spectrum and region.
+    multi = Spectrum1D(spectral_axis=spectral_axis,
+                       flux=np.vstack([flux, 2 * flux]))
+    table = measure(multi, regions, quantities=['centroid', 'fwhm'])
+
+    assert table.colnames == ['spectrum_index', 'region_index', 'centroid',
+                              'fwhm']
+    assert list(table['spectrum_index']) == [0, 0, 0, 1, 1, 1]
+    assert list(table['region_index']) == [0, 1, 2, 0, 1, 2]
+    assert quantity_allclose(table['centroid'][:3], table['centroid'][3:])
+    assert quantity_allclose(table['fwhm'][3:], fwhm(spectrum, regions))
+
+    with pytest.raises(ValueError):
+        measure(multi, regions, quantities=['snr'])
+
+    with pytest.raises(ValueError):
+        measure(spectrum, regions, quantities=['flux'])
+
+
+def test_measure_collection():
+    np.random.seed(42)
+    spectral_axis = np.vstack([np.linspace(4000, 5000, 100),
+                               np.linspace(4100, 5100, 100),
+                               np.linspace(4000, 5000, 100)]) * u.AA
+    flux = np.random.uniform(1, 2, (3, 100)) * u.Jy
+    uncertainty = StdDevUncertainty(np.full((3, 100), 0.1))
+    collection = SpectrumCollection(flux=flux, spectral_axis=spectral_axis,
+                                    uncertainty=uncertainty)
+    regions = [SpectralRegion(4200 * u.AA, 4500 * u.AA),
+               SpectralRegion(4800 * u.AA, 5050 * u.AA)]
+
+    table = measure(collection, regions)
+
+    assert list(table['spectrum_index']) == [0, 0, 1, 1, 2, 2]
+    assert list(table['region_index']) == [0, 1, 0, 1, 0, 1]
+
+    for i in range(3):
+        expected = measure(collection[i], regions)
+        rows = table[table['spectrum_index'] == i]
+        for name in expected.colnames:
+            assert quantity_allclose(rows[name], expected[name])
+
+
+def test_cache():
+    np.random.seed(42)
+    spectral_axis = np.linspace(1, 10, 200) * u.um
+    flux = models.Gaussian1D(1 * u.Jy, 5 * u.um, 0.5 * u.um)(spectral_axis)
+    flux += np.random.normal(0., 0.01, spectral_axis.shape) * u.Jy
+    spectrum = Spectrum1D(spectral_axis=spectral_axis, flux=flux)
+    region = SpectralRegion(3 * u.um, 7 * u.um)
+
+    def quantities(spectrum):
+        return [centroid(spectrum, region),
+                gaussian_sigma_width(spectrum, region),
+                gaussian_fwhm(spectrum, region),
+                line_flux(spectrum, region),
+                equivalent_width(spectrum, regions=region)]
+
+    expected = quantities(spectrum)
+
+    with cache() as analysis_cache:
+        for result, value in zip(quantities(spectrum), expected):
+            assert quantity_allclose(result, value)
+        assert analysis_cache.hits > 0
+        misses = analysis_cache.misses
+
+        # Repeated calls are answered from the cache.
+        for result, value in zip(quantities(spectrum), expected):
+            assert quantity_allclose(result, value)
+        assert analysis_cache.misses == misses
+
+        # A spectrum with a new flux array is not.
+        other = Spectrum1D(spectral_axis=spectral_axis, flux=2 * flux)
+        assert quantity_allclose(line_flux(other, region), 2 * expected[3])
+        assert analysis_cache.misses > misses
+
+        # Caching does not build the lazy WCS.
+        assert other._wcs is None
+
+    assert len(analysis_cache) == 0
+    assert analysis_cache.info().hits == analysis_cache.hits
+
+    with cache(maxsize=2) as analysis_cache:
+        for lower in range(2, 6):
+            centroid(spectrum, SpectralRegion(lower * u.um, 8 * u.um))
+        assert len(analysis_cache) == 2
+
+    with pytest.raises(ValueError):
+        with cache(maxsize=0):
+            pass
+
+
+@pytest.mark.parametrize('modify', [
+    lambda spectrum: spectrum.__iadd__(1 * u.Jy),
+    lambda spectrum: spectrum.__isub__(1 * u.Jy),
+    lambda spectrum: spectrum.__imul__(2),
+    lambda spectrum: spectrum.__itruediv__(2),
+    lambda spectrum: spectrum.add(1 * u.Jy, out=spectrum),
+    lambda spectrum: spectrum.new_flux_unit(u.mJy, inplace=True)])
+def test_cache_inplace(modify):
+    spectrum = Spectrum1D(spectral_axis=np.arange(1, 11) * u.um,
+                          flux=np.linspace(5, 15, 10) * u.Jy)
+    region = SpectralRegion(2 * u.um, 8 * u.um)
+
+    with cache() as analysis_cache:
+        line_flux(spectrum, region)
+        centroid(spectrum, region)
+        assert len(analysis_cache) > 0
+
+        # In-place modifications of the spectrum evict its entries.
+        modify(spectrum)
+        assert len(analysis_cache) == 0
+
+        expected = Spectrum1D(spectral_axis=spectrum.spectral_axis,
+                              flux=spectrum.flux.copy())
+        assert quantity_allclose(line_flux(spectrum, region),
+                                 line_flux(expected, region))
+        assert quantity_allclose(centroid(spectrum, region),
+                                 centroid(expected, region))
+
+
+def test_moment_maps(tmp_path):
+    np.random.seed(42)
+    spectral_axis = np.linspace(4000, 5000, 200) * u.AA
+    centers = np.random.uniform(4300, 4700, (3, 4))
+    widths = np.random.uniform(10, 40, (3, 4))
+    flux = np.exp(-0.5 * ((spectral_axis.value - centers[..., np.newaxis]) /
+                          widths[..., np.newaxis]) ** 2)
+    flux += np.random.normal(0., 0.001, flux.shape)
+
+    spectrum = Spectrum1D(spectral_axis=spectral_axis, flux=flux * u.Jy)
+    region = SpectralRegion(4200 * u.AA, 4800 * u.AA)
+
+    maps = moment_maps(spectrum, region)
+    assert list(maps) == [0, 1, 2]
+    assert maps[0].shape == (3, 4)
+    assert maps[0].unit == u.Jy * u.AA
+
+    # The maps match the individual analysis functions, spectrum by spectrum.
+    for i, j in np.ndindex(3, 4):
+        single = Spectrum1D(spectral_axis=spectral_axis, flux=flux[i, j] * u.Jy)
+        assert quantity_allclose(maps[1][i, j], centroid(single, region))
+        assert quantity_allclose(maps[2][i, j],
+                                 gaussian_sigma_width(single, region))
+
+    assert quantity_allclose(moment_maps(spectrum, orders=[0])[0],
+                             line_flux(spectrum))
+
+    # Masked pixels are left out.
+    mask = np.zeros(flux.shape, dtype=bool)
+    mask[..., :100] = True
+    masked = Spectrum1D(spectral_axis=spectral_axis, flux=flux * u.Jy,
+                        mask=mask)
+    upper = Spectrum1D(spectral_axis=spectral_axis[100:],
+                       flux=flux[..., 100:] * u.Jy)
+    assert quantity_allclose(moment_maps(masked, orders=[1])[1],
+                             centroid(upper, None))
+
+    # Memory-mapped cubes can be processed in chunks and threads.
+    filename = str(tmp_path / 'cube.dat')
+    cube = np.memmap(filename, dtype=float, mode='w+', shape=flux.shape)
+    cube[:] = flux
+    cube.flush()
+    cube = np.memmap(filename, dtype=float, mode='r', shape=flux.shape)
+    spectrum = Spectrum1D(spectral_axis=spectral_axis, flux=cube * u.Jy)
+
+    for chunk_size, n_threads in [(1, None), (5, 2), (None, 3)]:
+        chunked = moment_maps(spectrum, region, orders=(2, 0),
+                              chunk_size=chunk_size, n_threads=n_threads)
+        assert list(chunked) == [2, 0]
+        for order in chunked:
+            assert quantity_allclose(chunked[order], maps[order])
+
+    with pytest.raises(ValueError):
+        moment_maps(spectrum, orders=(3,))
+
+
+def test_spectral_indices():
+    spectral_axis = np.linspace(4000, 6000, 2001) * u.AA
+    depth = np.array([[0.3], [0.5]])
+    # Absorption lines on a sloped continuum.
+    flux = (1 + 1e-4 * (spectral_axis.value - 5000)) * \
+        (1 - depth * np.exp(-0.5 * ((spectral_axis.value - 5000) / 5) ** 2))
+
+    definitions = QTable(
+        rows=[('ew', 4900.3, 4950.7, 4970.2, 5030.9, 5050.1, 5100.4, 'A'),
+              ('mag', 4900.3, 4950.7, 4970.2, 5030.9, 5050.1, 5100.4, 'mag'),
+              ('outside', 3900, 3950, 4970.2, 5030.9, 5050.1, 5100.4, 'A')],
+        names=('name', 'blue_start', 'blue_end', 'band_start', 'band_end',
+               'red_start', 'red_end', 'unit'))
+
+    spectrum = Spectrum1D(spectral_axis=spectral_axis, flux=flux * u.Jy)
+    table = spectral_indices(spectrum, definitions)
+
+    ew = depth.ravel() * 5 * np.sqrt(2 * np.pi) * u.AA
+    assert table.colnames == ['spectrum_index', 'ew', 'mag', 'outside']
+    assert quantity_allclose(table['ew'], ew, rtol=1e-5)
+    assert quantity_allclose(table['mag'], -2.5 * np.log10(
+        1 - ew / (60.7 * u.AA)) * u.mag, rtol=1e-5)
+    assert np.all(np.isnan(table['outside']))
+
+    # The passbands are converted to the unit of the spectral axis.
+    frequency = Spectrum1D(
+        spectral_axis=spectral_axis.to(u.THz, u.spectral())[::-1],
+        flux=flux[:, ::-1] * u.Jy)
+    assert quantity_allclose(spectral_indices(frequency, definitions)['ew'],
+                             ew, rtol=1e-5)
+
+    # Spectra of a collection with different spectral axes.
+    shifted = spectral_axis + 0.3 * u.AA
+    collection = SpectrumCollection(
+        flux=flux * u.Jy, spectral_axis=u.Quantity([spectral_axis, shifted]))
+    single = Spectrum1D(spectral_axis=shifted, flux=flux[1] * u.Jy)
+    table = spectral_indices(collection, definitions)
+    assert quantity_allclose(table['ew'][0], ew[0], rtol=1e-5)
+    assert quantity_allclose(table['ew'][1],
+                             spectral_indices(single, definitions)['ew'][0])
+
+    # Precomputed weights are reused, NaN pixels only affect their indices.
+    weights = SpectralIndexWeights(definitions, spectral_axis)
+    flux[:, :10] = np.nan
+    spectrum = Spectrum1D(spectral_axis=spectral_axis, flux=flux * u.Jy)
+    assert quantity_allclose(spectral_indices(spectrum, weights)['ew'], ew,
+                             rtol=1e-5)
+
+    with pytest.raises(ValueError):
+        spectral_indices(spectrum, definitions[['name', 'band_start']])
@@ -1,6 +1,8 @@
 import astropy.units as u
 import numpy as np
 import pytest
+from astropy.nddata import (StdDevUncertainty, VarianceUncertainty,
+                            InverseVariance)
 
 from ..spectra.spectrum1d import Spectrum1D
 from .spectral_examples import simulated_spectra
@@ -104,3 +106,92 @@ def test_masks(simulated_spectra):
     masked_diff = masked_sum - masked_spec
     assert u.allclose(masked_diff.flux, masked_spec.flux)
     assert np.all(masked_diff.mask == masked_sum.mask | masked_spec.mask)
+
+
+@pytest.mark.parametrize('operation', ['add', 'subtract', 'multiply',
+                                       'divide'])
+@pytest.mark.parametrize('uncertainty_type', [StdDevUncertainty,
+                                              VarianceUncertainty,
+                                              InverseVariance])
+def test_shared_spectral_axis(operation, uncertainty_type):
+    spectral_axis = np.arange(1, 11) * u.nm
+    flux1 = np.random.sample((3, 10)) + 1
+    flux2 = np.random.sample(10) + 1
+
+    spec1 = Spectrum1D(spectral_axis=spectral_axis, flux=flux1 * u.Jy,
+                       uncertainty=uncertainty_type(flux1 / 10),
+                       mask=flux1 > 1.9)
+    spec2 = Spectrum1D(spectral_axis=spec1.spectral_axis,
+                       flux=flux2 * 1000 * u.mJy,
+                       uncertainty=uncertainty_type(flux2 * 100),
+                       mask=flux2 > 1.9)
+
+    result = getattr(spec1, operation)(spec2)
+
+    # The general NDArithmetic path propagates the same uncertainties.
+    expected = getattr(spec1, operation)(
+        Spectrum1D(spectral_axis=spec1.spectral_axis,
+                   flux=np.broadcast_to(spec2.flux, flux1.shape, subok=True),
+                   uncertainty=uncertainty_type(
+                       np.broadcast_to(flux2 * 100, flux1.shape))),
+        handle_meta=None)
+
+    assert result.spectral_axis is spec1.spectral_axis
+    assert result.unit == expected.unit
+    assert u.allclose(result.flux, expected.flux)
+    assert isinstance(result.uncertainty, uncertainty_type)
+    assert np.allclose(result.uncertainty.array, expected.uncertainty.array)
+    assert np.array_equal(result.mask, spec1.mask | spec2.mask)
+
+    # Writing to the first operand modifies it in place.
+    data = spec1.data
+    assert getattr(spec1, operation)(spec2, out=spec1) is spec1
+    assert spec1.data is data
+    assert u.allclose(spec1.flux, expected.flux)
+    assert np.allclose(spec1.uncertainty.array, expected.uncertainty.array)
+
+
+def test_inplace_arithmetic():
+    spectral_axis = np.arange(1, 11) * u.nm
+    spec = Spectrum1D(spectral_axis=spectral_axis, flux=np.ones(10) * u.Jy,
+                      uncertainty=StdDevUncertainty(np.full(10, 0.1)))
+    sky = Spectrum1D(spectral_axis=spectral_axis, flux=np.full(10, 0.5) * u.Jy,
+                     uncertainty=StdDevUncertainty(np.full(10, 0.1)))
+    spec.build_cumulative_index()
+
+    flux = spec.data
+    spec -= sky
+    spec *= 2 * u.m
+    spec /= 4
+
+    assert spec.data is flux
+    assert spec.unit == u.Jy * u.m
+    assert u.allclose(spec.flux, 0.25 * u.Jy * u.m)
+    assert np.allclose(spec.uncertainty.array, np.sqrt(0.02) / 2)
+    assert spec.uncertainty.unit == u.Jy * u.m
+    assert getattr(spec, '_cumulative_index', None) is None
+
+    # Spectra on other spectral axes go through the general path.
+    other = Spectrum1D(spectral_axis=spectral_axis * 2,
+                       flux=np.ones(10) * u.Jy * u.m)
+    result = spec
+    result += other
+    assert result is not spec
+    assert u.allclose(result.flux, 1.25 * u.Jy * u.m)
+
+    with pytest.raises(ValueError):
+        spec.add(other, out=spec)
+
+    # Results larger than the spectrum are new spectra.
+    spectra = Spectrum1D(spectral_axis=spectral_axis,
+                         flux=np.ones((3, 10)) * u.Jy * u.m)
+    result = spec
+    result += spectra
+    assert result is not spec
+    assert result.flux.shape == (3, 10)
+    assert u.allclose(result.flux, 1.25 * u.Jy * u.m)
+
+    result = spec
+    result *= np.full((2, 10), 2)
+    assert result is not spec
+    assert u.allclose(result.flux, 0.5 * u.Jy * u.m)
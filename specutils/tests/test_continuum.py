@@ -1,10 +1,13 @@
 import numpy as np
 
 import astropy.units as u
+from astropy.modeling.fitting import LevMarLSQFitter, LinearLSQFitter
+from astropy.modeling.polynomial import Chebyshev1D
 
 from ..spectra.spectrum1d import Spectrum1D
-from ..spectra import SpectralRegion
-from ..fitting.continuum import fit_generic_continuum, fit_continuum
+from ..spectra import SpectralRegion, SpectrumCollection
+from ..fitting.continuum import (fit_generic_continuum, fit_continuum,
+                                 fit_clipped_continuum)
 from ..manipulation.smoothing import median_smooth
 
 
@@ -173,3 +176,90 @@ def test_constant_continuum_window():
                        atol=1.e-5)
     assert np.allclose(spectrum_normalized.flux.value[160:], y_continuum_fitted_expected[160:],
                        atol=1.e-5)
+
+
+def test_continuum_fit_multiple_spectra():
+    """
+    Fit the continuum of several spectra at once, with the linear fitter
+    solving all of them together, and compare with fitting each spectrum.
+    """
+    x_single_continuum, y_single_continuum = single_peak_continuum()
+    flux = np.vstack([y_single_continuum, 2 * y_single_continuum,
+                      y_single_continuum + 1])
+    spectrum = Spectrum1D(flux=flux*u.Jy, spectral_axis=x_single_continuum*u.um)
+    exclude = [SpectralRegion(6*u.um, 6.6*u.um)]
+
+    for fitter in (LevMarLSQFitter(), LinearLSQFitter()):
+        results = fit_generic_continuum(spectrum, fitter=fitter,
+                                        exclude_regions=exclude)
+        continuum = fit_generic_continuum(spectrum, fitter=fitter,
+                                          exclude_regions=exclude,
+                                          return_continuum=True)
+
+        assert len(results) == 3
+        assert continuum.shape == flux.shape
+        assert continuum.unit == u.Jy
+
+        for i in range(3):
+            single = fit_generic_continuum(spectrum[i], fitter=fitter,
+                                           exclude_regions=exclude)
+            expected = single(x_single_continuum*u.um)
+
+            assert np.allclose(results[i](x_single_continuum*u.um).value,
+                               expected.value)
+            assert np.allclose(continuum[i].value, expected.value)
+
+    # A collection of spectra gives the same continuum
+    collection = SpectrumCollection(
+        flux=flux*u.Jy, spectral_axis=np.vstack([x_single_continuum]*3)*u.um)
+    collection_continuum = fit_generic_continuum(collection,
+                                                 fitter=LinearLSQFitter(),
+                                                 exclude_regions=exclude,
+                                                 return_continuum=True)
+    assert np.allclose(collection_continuum.value, continuum.value)
+
+
+def test_clipped_continuum():
+    """
+    Iterative sigma-clipped fits of several spectra match clipping and
+    refitting each spectrum on its own.
+    """
+    np.random.seed(0)
+    x = np.linspace(5000, 6000, 300)
+    continuum = np.array([1, 2, 3])[:, np.newaxis] * (1 + 0.0005 * (x - 5000))
+    flux = continuum + np.random.normal(0, 0.02, continuum.shape)
+    flux[:, 100:110] -= 0.5
+    flux[2, 200:205] += 1
+    spectrum = Spectrum1D(flux=flux*u.Jy, spectral_axis=x*u.AA)
+
+    results = fit_clipped_continuum(spectrum, Chebyshev1D(2), sigma=3,
+                                    maxiters=5)
+
+    assert np.all(results.status == 0)
+    assert np.allclose(results.evaluate().value, continuum, atol=0.01)
+
+    fitter = LinearLSQFitter()
+    for i in range(3):
+        used = np.ones(x.shape, dtype=bool)
+        for n_iterations in range(1, 7):
+            model = fitter(Chebyshev1D(2, domain=[5000, 6000]),
+                           x[used], flux[i, used])
+            residuals = flux[i] - model(x)
+            std = np.sqrt(np.mean(residuals[used]**2))
+            clipped = np.abs(residuals) <= 3 * std
+            if np.all(clipped == used):
+                break
+            used = clipped
+
+        assert results.n_iterations[i] == n_iterations
+        assert np.allclose(results.parameters[i], model.parameters)
+
+    # A single spectrum returns a model
+    single = fit_clipped_continuum(spectrum[1], Chebyshev1D(2))
+    assert np.allclose(single.parameters, results.parameters[1])
+
+    # Clipping only the absorption lines
+    results = fit_clipped_continuum(spectrum, Chebyshev1D(2), sigma_lower=2,
+                                    sigma_upper=100, maxiters=10)
+    assert np.allclose(results.evaluate().value[:2], continuum[:2], atol=0.01)
+    assert results.evaluate()[2, 200] > 3.5 * u.Jy
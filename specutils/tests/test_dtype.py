@@ -0,0 +1,124 @@
+import numpy as np
+import pytest
+import astropy.units as u
+from astropy.nddata import StdDevUncertainty, InverseVariance
+
+from .. import conf
+from ..spectra import Spectrum1D, SpectralRegion
+from ..manipulation import (box_smooth, gaussian_smooth, median_smooth,
+                            FluxConservingResampler,
+                            LinearInterpolatedResampler,
+                            SplineInterpolatedResampler)
+from ..analysis import (line_flux, equivalent_width, snr_derived,
+                        moment_maps)
+
+
+@pytest.fixture
+def spectra():
+    np.random.seed(42)
+    flux = (np.random.sample((3, 100)) + 1).astype(np.float32)
+    spectral_axis = np.linspace(4000, 5000, 100).astype(np.float32) * u.AA
+
+    return Spectrum1D(spectral_axis=spectral_axis, flux=flux * u.Jy,
+                      uncertainty=StdDevUncertainty(flux / 10))
+
+
+@pytest.fixture
+def preserve():
+    with conf.set_temp('dtype_policy', 'preserve'):
+        yield
+
+
+def _dtypes(spectrum):
+    return (spectrum.flux.dtype,
+            spectrum.uncertainty.array.dtype if spectrum.uncertainty
+            is not None else np.float32)
+
+
+@pytest.mark.parametrize('smooth', [
+    lambda spectrum, **kwargs: box_smooth(spectrum, 3, **kwargs),
+    lambda spectrum, **kwargs: gaussian_smooth(spectrum, 2, **kwargs),
+    lambda spectrum, **kwargs: median_smooth(spectrum, 3, **kwargs)])
+def test_smoothing_dtype(spectra, preserve, smooth):
+    spectrum = spectra[0]
+
+    assert _dtypes(smooth(spectrum)) == (np.float32, np.float32)
+    assert smooth(spectrum, dtype=np.float64).flux.dtype == np.float64
+
+
+@pytest.mark.parametrize('resampler', [FluxConservingResampler,
+                                       LinearInterpolatedResampler,
+                                       SplineInterpolatedResampler])
+def test_resampling_dtype(spectra, preserve, resampler):
+    spectrum = spectra[0]
+    new_axis = np.linspace(4100, 4900, 50).astype(np.float32) * u.AA
+
+    result = resampler()(spectrum, new_axis)
+    assert _dtypes(result) == (np.float32, np.float32)
+
+    result = resampler()(spectrum, new_axis, dtype=np.float64)
+    assert _dtypes(result) == (np.float64, np.float64)
+
+    with conf.set_temp('dtype_policy', 'promote'):
+        assert resampler()(spectrum, new_axis).flux.dtype == np.float64
+
+
+def test_resampling_multi_dimensional_dtype(spectra, preserve):
+    new_axis = np.linspace(4100, 4900, 50) * u.AA
+    result = FluxConservingResampler()(spectra, new_axis)
+
+    assert _dtypes(result) == (np.float32, np.float32)
+
+    expected = FluxConservingResampler()(spectra, new_axis, dtype=np.float64)
+    assert u.allclose(result.flux, expected.flux, rtol=1e-5)
+
+
+def test_analysis_dtype(spectra, preserve):
+    region = SpectralRegion(4200 * u.AA, 4400 * u.AA)
+
+    flux = line_flux(spectra)
+    assert flux.dtype == np.float32
+    assert flux.uncertainty.dtype == np.float32
+    assert equivalent_width(spectra).dtype == np.float32
+    assert equivalent_width(spectra, regions=region).dtype == np.float32
+    assert snr_derived(spectra).dtype == np.float32
+    assert snr_derived(spectra, chunk_size=2).dtype == np.float32
+    assert snr_derived(spectra, dtype=np.float64).dtype == np.float64
+
+    maps = moment_maps(spectra)
+    assert all(moment.dtype == np.float32 for moment in maps.values())
+
+    with conf.set_temp('dtype_policy', 'promote'):
+        promoted = line_flux(spectra)
+        assert promoted.dtype == np.float64
+        assert u.allclose(flux, promoted, rtol=1e-5)
+
+
+def test_arithmetic_dtype(spectra, preserve):
+    sky = spectra[0]
+
+    assert _dtypes(spectra - sky) == (np.float32, np.float32)
+    assert _dtypes(spectra * 2) == (np.float32, np.float32)
+
+    # Quantity operands do not change the type of the spectra.
+    calibration = np.linspace(1, 2, 100) * u.erg / u.Jy
+    assert _dtypes(spectra * calibration) == (np.float32, np.float32)
+
+    spectra /= 2 * u.s
+    assert _dtypes(spectra) == (np.float32, np.float32)
+
+    ivar = Spectrum1D(spectral_axis=spectra.spectral_axis, flux=spectra.flux,
+                      uncertainty=InverseVariance(np.ones((3, 100),
+                                                          np.float32)))
+    assert _dtypes(ivar + ivar) == (np.float32, np.float32)
+
+
+def test_flux_unit_conversion_dtype(spectra, preserve):
+    flambda = u.erg / u.s / u.cm**2 / u.AA
+
+    assert spectra.new_flux_unit(flambda).flux.dtype == np.float32
+    assert spectra.new_flux_unit(
+        flambda, dtype=np.float64).flux.dtype == np.float64
+
+    spectra.new_flux_unit(flambda, inplace=True)
+    assert spectra.flux.dtype == np.float32
@@ -1,15 +1,17 @@
+import pytest
 import astropy.units as u
 import numpy as np
 from astropy.modeling import models
 from astropy.nddata import StdDevUncertainty
 from astropy.tests.helper import assert_quantity_allclose
 
-from ..analysis import centroid, fwhm
-from ..fitting import (estimate_line_parameters, find_lines_derivative,
+from ..analysis import centroid, fwhm, gaussian_sigma_width
+from ..fitting import (FitResults, estimate_line_parameters,
+                       estimate_line_shapes, find_lines_derivative,
                        find_lines_threshold, fit_lines)
 from ..manipulation import (extract_region, noise_region_uncertainty,
                             spectrum_from_model)
-from ..spectra import SpectralRegion, Spectrum1D
+from ..spectra import SpectralRegion, Spectrum1D, SpectrumCollection
 
 
 def single_peak():
@@ -91,6 +93,35 @@ def test_find_lines_threshold():
     assert absorption_lines['line_center_index'].tolist() == [163]
 
 
+def test_find_lines_multiple_spectra():
+    x_double, y_double = double_peak_absorption_and_emission()
+    flux = np.vstack([y_double, -y_double, np.zeros_like(y_double)])
+    collection = SpectrumCollection(flux=flux*u.Jy,
+                                    spectral_axis=np.vstack([x_double]*3)*u.um)
+
+    lines = find_lines_derivative(collection, flux_threshold=0.75)
+
+    assert lines['spectrum_index'].tolist() == [0, 0, 0, 1, 1, 1]
+    assert lines['line_type'].tolist() == ['emission'] * 2 + ['absorption'] + \
+                                          ['emission'] + ['absorption'] * 2
+    assert lines['line_center_index'].tolist() == [90, 109, 163, 163, 90, 109]
+    assert_quantity_allclose(lines['line_center'],
+                             x_double[lines['line_center_index']]*u.um)
+
+    # The same spectra stacked in a Spectrum1D
+    spectrum = Spectrum1D(flux=flux*u.Jy, spectral_axis=x_double*u.um,
+                          uncertainty=StdDevUncertainty(np.full(flux.shape, 0.2)))
+    lines = find_lines_threshold(spectrum, noise_factor=3)
+    single = find_lines_threshold(spectrum[0], noise_factor=3)
+
+    assert 'spectrum_index' not in single.colnames
+    first = lines[lines['spectrum_index'] == 0]
+    assert first['line_center_index'].tolist() == \
+        single['line_center_index'].tolist()
+    assert first['line_type'].tolist() == single['line_type'].tolist()
+    assert np.all(lines['spectrum_index'] < 2)
+
+
 def test_single_peak_estimate():
     """
     Single Peak fit.
@@ -176,6 +207,33 @@ def test_single_peak_estimate():
     assert g_init.sigma.unit == u.um
 
 
+def test_estimate_line_shapes():
+    x = np.linspace(0., 10., 200)
+    means = np.array([6.3, 2., 8.])
+    y = np.array([3., 1., 2.])[:, np.newaxis] * \
+        np.exp(-0.5 * (x - means[:, np.newaxis])**2 / 0.3**2)
+    spectrum = Spectrum1D(flux=y*u.Jy, spectral_axis=x*u.um)
+
+    shapes = estimate_line_shapes(spectrum)
+
+    assert len(shapes) == 3
+    for i, row in enumerate(shapes):
+        single = Spectrum1D(flux=y[i]*u.Jy, spectral_axis=x*u.um)
+        assert_quantity_allclose(row['amplitude'], single.flux.max())
+        assert_quantity_allclose(row['centroid'], centroid(single, None))
+        assert_quantity_allclose(row['sigma'], gaussian_sigma_width(single))
+        assert_quantity_allclose(row['fwhm'], fwhm(single))
+
+    # The estimates are returned as a model set, which seeds the fits
+    g_init = estimate_line_parameters(spectrum, models.Gaussian1D())
+    assert len(g_init) == 3
+    assert_quantity_allclose(g_init.mean.quantity, means*u.um)
+
+    results = fit_lines(spectrum, g_init)
+    assert_quantity_allclose(results.parameter('mean'), means*u.um)
+    assert_quantity_allclose(results.parameter('stddev'), [0.3]*3*u.um)
+
+
 def test_single_peak_fit():
     """
     Single peak fit
@@ -698,3 +756,98 @@ def test_fit_subspectrum():
                                 stddev=4.0721*u.angstrom)
     g_fit = fit_lines(sub_spectrum, g_init)
     y_fit = g_fit(sub_spectrum.spectral_axis)
+
+
+def test_fit_lines_batch():
+    np.random.seed(0)
+    x = np.linspace(0., 10., 200)
+    amplitudes = np.array([[1., 2., 3.], [4., 5., 6.]])
+    y = amplitudes[..., np.newaxis] * np.exp(-0.5 * (x - 5.)**2 / 0.5**2)
+    y += np.random.normal(0., 0.05, y.shape)
+
+    spectrum = Spectrum1D(flux=y*u.Jy, spectral_axis=x*u.um)
+    g_init = models.Gaussian1D(amplitude=1*u.Jy, mean=4.9*u.um,
+                               stddev=0.4*u.um)
+
+    results = fit_lines(spectrum, g_init)
+
+    assert isinstance(results, FitResults)
+    assert len(results) == 6
+    assert results.shape == (2, 3)
+    assert results.parameters.shape == (6, 3)
+    assert results.parameters.flags['C_CONTIGUOUS']
+    assert_quantity_allclose(results.parameter('amplitude'),
+                             amplitudes*u.Jy, rtol=0.05)
+    assert np.all(results.uncertainties > 0)
+    assert np.all(results.n_iterations > 0)
+
+    # Each row matches fitting the spectrum on its own
+    g_fit = fit_lines(spectrum[1, 2], g_init)
+    assert_quantity_allclose(results[1, 2].amplitude, g_fit.amplitude)
+    assert_quantity_allclose(results[5].mean, g_fit.mean)
+    assert results[5].mean.unit == u.um
+
+    table = results.to_table()
+    assert len(table) == 6
+    assert table['mean'].unit == u.um
+    assert table['amplitude_err'].unit == u.Jy
+    assert np.all(table['spectrum_index'] == np.arange(6))
+    assert_quantity_allclose(table['amplitude'].reshape(2, 3),
+                             results.parameter('amplitude'))
+
+
+def test_fit_lines_batch_collection():
+    np.random.seed(0)
+    x = np.linspace(0., 10., 200)
+    y = 3 * np.exp(-0.5 * (x - 5.)**2 / 0.5**2)
+    y = y + np.random.normal(0., 0.05, (3, 200))
+    mask = np.zeros(y.shape, dtype=bool)
+    mask[1, 90:110] = True
+
+    collection = SpectrumCollection(flux=y*u.Jy,
+                                    spectral_axis=np.vstack([x]*3)*u.um,
+                                    mask=mask)
+    g_init = models.Gaussian1D(amplitude=1*u.Jy, mean=4.9*u.um,
+                               stddev=0.4*u.um)
+
+    results = fit_lines(collection, [g_init, g_init],
+                        window=SpectralRegion(3*u.um, 7*u.um))
+
+    assert len(results) == 2
+    for result in results:
+        assert_quantity_allclose(result.parameter('mean'), [5]*3*u.um,
+                                 atol=0.05*u.um)
+
+    # The masked row is fit from the wings only, and matches masking it
+    # in the single spectrum case.
+    single = Spectrum1D(flux=y[1]*u.Jy, spectral_axis=x*u.um, mask=mask[1])
+    g_fit = fit_lines(single, g_init, window=SpectralRegion(3*u.um, 7*u.um))
+    assert_quantity_allclose(results[0][1].stddev, g_fit.stddev)
+
+
+def test_fit_lines_bootstrap():
+    np.random.seed(0)
+    x = np.linspace(0., 10., 200)
+    y = 3 * np.exp(-0.5 * (x - 6.3)**2 / 0.8**2)
+    y = y + np.random.normal(0., 0.2, x.size)
+    spectrum = Spectrum1D(flux=y*u.Jy, spectral_axis=x*u.um,
+                          uncertainty=StdDevUncertainty(np.full(x.size, 0.2)))
+    g_init = models.Gaussian1D(amplitude=3*u.Jy, mean=6.1*u.um,
+                               stddev=1.*u.um)
+
+    g_fit, table = fit_lines(spectrum, g_init, n_bootstrap=100, seed=42)
+
+    assert_quantity_allclose(g_fit.mean, fit_lines(spectrum, g_init).mean)
+    assert list(table['percentile']) == [16, 50, 84]
+    assert table['mean'].unit == u.um
+    assert table['amplitude'].unit == u.Jy
+    assert table['mean'][0] < g_fit.mean < table['mean'][2]
+    assert table['stddev'][0] < 0.8*u.um < table['stddev'][2]
+
+    # The same seed draws the same realizations.
+    _, repeat = fit_lines(spectrum, g_init, n_bootstrap=100, seed=42)
+    assert np.all(repeat['amplitude'] == table['amplitude'])
+
+    with pytest.raises(ValueError):
+        fit_lines(Spectrum1D(flux=y*u.Jy, spectral_axis=x*u.um), g_init,
+                  n_bootstrap=10)
@@ -10,6 +10,7 @@ from ..utils.wcs_utils import gwcs_from_array
 
 from ..spectra import Spectrum1D, SpectralRegion, SpectrumCollection
 from ..manipulation import snr_threshold, excise_regions, linear_exciser
+from ..manipulation.utils import true_exciser
 
 def test_true_exciser():
     np.random.seed(84)
@@ -23,6 +24,19 @@ def test_true_exciser():
     assert len(excised_spec.flux) == len(spec.flux)-10
     assert np.isclose(excised_spec.flux.sum(), 243.2617*u.Jy, atol=0.001*u.Jy)
 
+def test_true_exciser_subregions():
+    spectral_axis = np.arange(10)*u.AA
+    flux = np.arange(10)*u.Jy
+    spec = Spectrum1D(flux=flux, spectral_axis=spectral_axis)
+
+    # Only the subregions are removed, not everything between them
+    region = SpectralRegion([(1*u.AA, 2*u.AA), (6*u.AA, 7*u.AA)])
+    excised_spec = true_exciser(spec, region)
+
+    assert quantity_allclose(excised_spec.flux, [0, 3, 4, 5, 8, 9]*u.Jy)
+    assert quantity_allclose(excised_spec.spectral_axis,
+                             [0, 3, 4, 5, 8, 9]*u.AA)
+
 def test_linear_exciser():
     np.random.seed(84)
     spectral_axis = np.linspace(5000,5100,num=100)*u.AA
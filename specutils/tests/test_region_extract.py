@@ -6,7 +6,7 @@ from astropy.nddata import StdDevUncertainty
 from astropy.tests.helper import quantity_allclose
 
 from ..spectra import Spectrum1D, SpectralRegion
-from ..manipulation import extract_region
+from ..manipulation import extract_region, extract_velocity_windows
 from ..manipulation.utils import linear_exciser
 from .spectral_examples import simulated_spectra
 
@@ -172,6 +172,19 @@ def test_extract_region_mismatched_units():
     assert quantity_allclose(extracted.flux, [10, 11]*u.Jy)
 
 
+def test_extract_region_descending():
+    spectrum = Spectrum1D(spectral_axis=np.linspace(700, 400, 301)*u.nm,
+                          flux=np.arange(301)*u.Jy)
+
+    region = SpectralRegion([(500*u.nm, 502*u.nm), (6000*u.AA, 6001*u.AA)])
+
+    extracted = extract_region(spectrum, region)
+
+    assert quantity_allclose(extracted[0].spectral_axis, [502, 501, 500]*u.nm)
+    assert quantity_allclose(extracted[0].flux, [198, 199, 200]*u.Jy)
+    assert quantity_allclose(extracted[1].spectral_axis, [600]*u.nm)
+
+
 def test_linear_excise_invert_from_spectrum():
     spec = Spectrum1D(flux=np.random.sample(100) * u.Jy,
                       spectral_axis=np.arange(100) * u.AA)
@@ -200,3 +213,64 @@ def test_extract_masked():
 
     assert np.all(extracted.mask == [False, True])
     assert np.all(extracted.flux.value == [1, 2])
+
+
+def test_extract_velocity_windows():
+    np.random.seed(42)
+
+    wavelengths = np.linspace(4000, 7000, 3001)*u.AA
+    flux = np.random.random((2, 3001))*u.Jy
+    uncertainty = StdDevUncertainty(0.1*np.ones((2, 3001))*u.Jy)
+    mask = np.zeros((2, 3001), dtype=bool)
+    spectrum = Spectrum1D(spectral_axis=wavelengths, flux=flux,
+                          uncertainty=uncertainty, mask=mask)
+
+    lines = [4861.3, 6562.8, 9000]*u.AA
+    windows = extract_velocity_windows(spectrum, lines, 500*u.km/u.s)
+
+    assert len(windows) == 3
+    for line, window in zip(lines, windows[:2]):
+        region = SpectralRegion.from_center(line, line*500/299792.458)
+        extracted = extract_region(
+            Spectrum1D(spectral_axis=wavelengths, flux=flux[1]), region)
+        assert quantity_allclose(window.spectral_axis,
+                                 extracted.spectral_axis)
+        assert quantity_allclose(window.flux[1], extracted.flux)
+
+        # The windows are views of the spectrum.
+        assert np.shares_memory(window.flux, spectrum.flux)
+        assert np.shares_memory(window.uncertainty.array,
+                                spectrum.uncertainty.array)
+        assert np.shares_memory(window.mask, spectrum.mask)
+        assert isinstance(window.uncertainty, StdDevUncertainty)
+
+    # Lines outside the spectrum give empty windows.
+    assert windows[2].flux.shape == (2, 0)
+
+    # Frequency axes are descending in wavelength.
+    frequency = Spectrum1D(spectral_axis=wavelengths.to(u.GHz, u.spectral()),
+                           flux=flux[0])
+    window, = extract_velocity_windows(frequency, 6562.8*u.AA, 500*u.km/u.s)
+    assert quantity_allclose(window.flux, windows[1].flux[0])
+
+    # Windows running past the ends of the spectrum select the same pixels
+    # as extract_region, which excludes the last pixel past the red end.
+    edges = [4001, 6995]*u.AA
+    for axis in (wavelengths, wavelengths.to(u.GHz, u.spectral())):
+        edge_spectrum = Spectrum1D(spectral_axis=axis, flux=flux[0])
+        windows = extract_velocity_windows(edge_spectrum, edges,
+                                           500*u.km/u.s)
+        for line, window in zip(edges, windows):
+            bounds = line*(1 + np.array([-1, 1])*500/299792.458)
+            extracted = extract_region(
+                edge_spectrum,
+                SpectralRegion(*bounds.to(axis.unit, u.spectral())))
+            assert quantity_allclose(window.flux, extracted.flux)
+    assert window.pixels.stop == 3000
+
+    with pytest.raises(ValueError):
+        extract_velocity_windows(spectrum, lines, -500*u.km/u.s)
+
+    with pytest.raises(ValueError):
+        extract_velocity_windows(spectrum, lines, 500*u.km/u.s,
+                                 doppler_convention='doppler')
@@ -5,6 +5,7 @@ import astropy.units as u
 from astropy.nddata import StdDevUncertainty
 
 from ..spectra import Spectrum1D, SpectralRegion
+from ..manipulation import extract_region
 
 
 def test_lower_upper():
@@ -157,3 +158,63 @@ def test_invert():
     sr_inverted = sr.invert_from_spectrum(spectrum)
     for ii, expected in enumerate(sr_inverted_expected):
         assert sr_inverted.subregions[ii] == sr_inverted_expected[ii]
+
+
+def test_to_mask():
+    spectral_axis = np.arange(1, 26)*u.um
+
+    # Closed interval, same as extract_region
+    sr = SpectralRegion(8*u.um, 15*u.um)
+    mask = sr.to_mask(spectral_axis)
+
+    assert mask.shape == spectral_axis.shape
+    assert np.all(spectral_axis[mask].value == np.arange(8, 16))
+    assert np.all(sr.to_indices(spectral_axis) == np.arange(7, 15))
+
+    # Multiple, overlapping sub-regions in a different unit. As in
+    # extract_region, bounds past the end of the axis exclude the last pixel.
+    sr = SpectralRegion([(15000*u.AA, 45000*u.AA), (35000*u.AA, 55000*u.AA),
+                         (195000*u.AA, 300000*u.AA)])
+    assert np.all(spectral_axis[sr.to_mask(spectral_axis)].value ==
+                  [2, 3, 4, 5, 20, 21, 22, 23, 24])
+
+    # Regions outside of the spectral axis select nothing
+    sr = SpectralRegion(28*u.um, 30*u.um)
+    assert not np.any(sr.to_mask(spectral_axis))
+    assert len(sr.to_indices(spectral_axis)) == 0
+
+    # Pixel regions index directly
+    sr = SpectralRegion(7.5*u.pix, 10.5*u.pix)
+    assert np.all(sr.to_indices(spectral_axis) == [7, 8, 9, 10])
+
+
+def test_to_mask_descending():
+    spectral_axis = (np.arange(1, 26)*u.um).to(u.GHz, u.spectral())
+
+    sr = SpectralRegion(8*u.um, 15*u.um)
+    indices = sr.to_indices(spectral_axis)
+
+    assert np.all(indices == np.arange(7, 15))
+
+    sr = SpectralRegion(spectral_axis[7], spectral_axis[14])
+    assert np.all(sr.to_indices(spectral_axis) == indices)
+
+
+@pytest.mark.parametrize('spectral_axis', [
+    np.arange(10) * u.um,
+    np.arange(10)[::-1] * u.um,
+    (np.arange(1, 11) * u.um).to(u.GHz, u.spectral())])
+@pytest.mark.parametrize('bounds', [
+    (2 * u.um, 20 * u.um), (-5 * u.um, 4 * u.um), (-5 * u.um, 20 * u.um),
+    (0 * u.um, 9 * u.um), (9 * u.um, 20 * u.um)])
+def test_to_mask_matches_extract_region(spectral_axis, bounds):
+    spectrum = Spectrum1D(spectral_axis=spectral_axis,
+                          flux=np.arange(10) * u.Jy)
+    region = SpectralRegion(*bounds)
+
+    extracted = extract_region(spectrum, region)
+    mask = region.to_mask(spectrum.spectral_axis)
+
+    assert np.all(spectrum.flux[mask] == extracted.flux)
+    assert np.all(spectrum.flux[mask] ==
+                  spectrum.flux[region.to_mask(spectral_axis)])
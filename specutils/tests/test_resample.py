@@ -5,6 +5,7 @@ from astropy.nddata import InverseVariance, StdDevUncertainty
 from astropy.tests.helper import assert_quantity_allclose
 
 from ..spectra.spectrum1d import Spectrum1D
+from ..spectra.spectral_axis import SpectralAxis
 from ..tests.spectral_examples import simulated_spectra
 from ..manipulation.resample import FluxConservingResampler, LinearInterpolatedResampler, SplineInterpolatedResampler
 
@@ -35,6 +36,49 @@ def test_same_grid_fluxconserving(simulated_spectra):
                        results.uncertainty.array)
 
 
+def test_same_log_grid_fluxconserving():
+    """
+    Test that resampling onto the same logarithmic grid returns the same
+    flux and uncertainty, as with the full resampling matrix.
+    """
+    spectral_axis = np.geomspace(4000, 5000, 50) * u.AA
+    flux = np.random.sample((3, 50)) * u.Jy
+    input_spectra = Spectrum1D(spectral_axis=spectral_axis, flux=flux,
+                               uncertainty=StdDevUncertainty(flux.value / 10))
+
+    results = FluxConservingResampler()(input_spectra, spectral_axis)
+
+    assert_quantity_allclose(results.flux, flux)
+    assert np.allclose(results.uncertainty.array, 100 / flux.value**2)
+
+    # Compare with a grid that differs by a negligible offset, which goes
+    # through the resampling matrix.
+    results = FluxConservingResampler()(input_spectra,
+                                        spectral_axis * (1 + 1e-12))
+    assert_quantity_allclose(results.flux[:, 1:-1], flux[:, 1:-1])
+
+
+def test_same_grid_modified_values_fluxconserving():
+    """
+    Test that resampling onto a grid whose values were modified in place
+    does not reuse the grid of the original values.
+    """
+    spectral_axis = SpectralAxis.from_grid(4000 * u.AA, 10 * u.AA, 50)
+    flux = np.random.sample(50) * u.Jy
+    input_spectra = Spectrum1D(spectral_axis=spectral_axis, flux=flux)
+
+    new_axis = SpectralAxis.from_grid(4000 * u.AA, 10 * u.AA, 50)
+    assert_quantity_allclose(
+        FluxConservingResampler()(input_spectra, new_axis).flux, flux)
+
+    new_axis.value[:] += 5
+    expected = FluxConservingResampler()(input_spectra,
+                                         u.Quantity(new_axis, copy=True))
+    result = FluxConservingResampler()(input_spectra, new_axis)
+    assert_quantity_allclose(result.flux, expected.flux, equal_nan=True)
+    assert not np.allclose(result.flux[:-1], flux[:-1])
+
+
 def test_expanded_grid_fluxconserving():
     """
     New dispersion axis has more bins then input dispersion axis
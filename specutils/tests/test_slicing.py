@@ -1,5 +1,6 @@
 import astropy.units as u
 import astropy.wcs as fitswcs
+from astropy.nddata import StdDevUncertainty
 from astropy.tests.helper import quantity_allclose
 import numpy as np
 from numpy.testing import assert_allclose
@@ -99,3 +100,47 @@ def test_slicing_multidim():
 
     assert quantity_allclose(spec2.flux, spec.flux[1:3])
     assert quantity_allclose(spec2.spectral_axis, spec.spectral_axis)
+
+
+def test_slicing_views():
+    spec = Spectrum1D(spectral_axis=np.arange(100) * u.AA,
+                      flux=np.random.sample((3, 100)) * u.Jy,
+                      uncertainty=StdDevUncertainty(np.ones((3, 100))),
+                      mask=np.zeros((3, 100), dtype=bool))
+
+    for sliced in (spec[1], spec[1:3], spec[1, 10:20], spec[..., 10:20]):
+        assert np.shares_memory(sliced.flux, spec.flux)
+        assert np.shares_memory(sliced.uncertainty.array,
+                                spec.uncertainty.array)
+        assert np.shares_memory(sliced.mask, spec.mask)
+        assert sliced.uncertainty.parent_nddata is sliced
+
+    window = spec[1, 10:20]
+    assert window.flux.shape == (10,)
+    assert quantity_allclose(window.spectral_axis, np.arange(10, 20) * u.AA)
+    assert np.shares_memory(window.spectral_axis, spec.spectral_axis)
+    assert spec[..., 10:20].flux.shape == (3, 10)
+    assert spec[0, -1].flux.shape == (1,)
+
+    # The meta is copied, so changing that of a slice leaves the spectrum
+    # unchanged.
+    spec.meta['header'] = {'OBJECT': 'star'}
+    sliced = spec[1, 10:20]
+    sliced.meta['header']['OBJECT'] = 'galaxy'
+    sliced.meta['name'] = 'window'
+    assert spec.meta == {'header': {'OBJECT': 'star'}}
+
+    # Writing to a slice modifies the spectrum, unless it is copied.
+    window.flux[0] = 10 * u.Jy
+    assert spec.flux[1, 10] == 10 * u.Jy
+
+    copied = spec[1, 10:20].copy()
+    copied.flux[0] = 20 * u.Jy
+    copied.mask[0] = True
+    assert spec.flux[1, 10] == 10 * u.Jy
+    assert not spec.mask[1, 10]
+
+    # Fancy indexing copies, as for numpy arrays.
+    selected = spec[0][[1, 3]]
+    assert quantity_allclose(selected.spectral_axis, [1, 3] * u.AA)
+    assert not np.shares_memory(selected.flux, spec.flux)
@@ -2,6 +2,7 @@ import astropy.units as u
 import numpy as np
 import pytest
 from astropy import time
+from astropy.tests.helper import assert_quantity_allclose
 from astropy.constants import c
 from astropy.coordinates import (SkyCoord, EarthLocation, ICRS, GCRS, Galactic,
                                  CartesianDifferential,
@@ -10,6 +11,7 @@ from astropy.coordinates import (SkyCoord, EarthLocation, ICRS, GCRS, Galactic,
 
 from ..extern.spectralcoord import SpectralCoord
 from ..spectra.spectral_axis import SpectralAxis
+from ..spectra.spectral_region import SpectralRegion
 
 
 def get_greenwich_earthlocation():
@@ -119,3 +121,112 @@ def test_create_from_spectral_axis(observer, target):
     assert spec_axis1.radial_velocity == spec_axis2.radial_velocity
     assert spec_axis1.doppler_convention == spec_axis2.doppler_convention
     assert spec_axis1.doppler_rest == spec_axis2.doppler_rest
+
+
+def test_monotonic_index():
+    spectral_axis = SpectralAxis(np.linspace(700, 400, 301) * u.nm)
+
+    values, descending = spectral_axis._monotonic_index()
+    assert descending
+    assert np.all(np.diff(values) > 0)
+    assert values[0] == 400
+
+    # The index is cached per unit, and the index in a unit whose ordering
+    # is reversed is ascending.
+    assert spectral_axis._monotonic_index()[0] is values
+    values, descending = spectral_axis._monotonic_index(u.THz)
+    assert not descending
+    assert np.isclose(values[0], (700 * u.nm).to_value(u.THz, u.spectral()))
+
+    # Slices have their own index.
+    assert not spectral_axis[::-1]._monotonic_index()[1]
+
+
+def test_monotonic_index_modified_values():
+    spectral_axis = SpectralAxis([1, 2, 3, 5, 8, 13] * u.um)
+    region = SpectralRegion(0.5 * u.um, 3.5 * u.um)
+    assert np.all(region.to_indices(spectral_axis) == [0, 1, 2])
+
+    # The index is computed again after the values are modified in place,
+    # which leaves them writeable.
+    spectral_axis.value[:] += 100
+    assert len(region.to_indices(spectral_axis)) == 0
+
+    spectral_axis[:] = spectral_axis[::-1]
+    assert spectral_axis._monotonic_index()[1]
+    assert spectral_axis.flags.writeable
+
+
+@pytest.mark.parametrize('values, scale', [
+    (np.linspace(4000, 7000, 301), 'linear'),
+    (np.linspace(7000, 4000, 301), 'linear'),
+    (np.geomspace(3000, 10000, 200), 'log'),
+    (np.array([1., 2., 4., 5.]), None)])
+def test_grid(values, scale):
+    spectral_axis = SpectralAxis(values * u.AA)
+
+    grid = spectral_axis.grid
+    if scale is None:
+        assert grid is None
+        return
+
+    assert grid.scale == scale
+    assert grid.n == len(values)
+    assert np.allclose(SpectralAxis._grid_values(grid), values)
+
+    # The arithmetic bin edges are the midpoints between the centers.
+    assert np.allclose(spectral_axis.bin_edges.value,
+                       SpectralAxis._edges_from_centers(values, u.AA).value)
+
+    # Bounds are located as with a binary search, including on pixels.
+    lower = np.concatenate([values[::7], np.linspace(2000, 11000, 50)])
+    upper = lower + np.abs(grid.step * (values[0] if scale == 'log' else 1)) * 3
+    left, right = spectral_axis._locate(lower, upper)
+    expected = SpectralRegion._search_bounds(
+        *spectral_axis._monotonic_index(), lower, upper)
+    assert np.array_equal(left, expected[0])
+    assert np.array_equal(right, np.maximum(*expected))
+
+    # Slices keep the grid.
+    sliced = spectral_axis[10:40:3]
+    assert sliced._derived_cache('_grid_results')['grid'] == (
+        sliced.value[0], grid.step * 3, 10, scale)
+
+
+def test_from_grid():
+    spectral_axis = SpectralAxis.from_grid(4000 * u.AA, 1e-4, 100,
+                                           scale='log')
+
+    assert len(spectral_axis) == 100
+    assert_quantity_allclose(spectral_axis[[0, -1]],
+                             [4000, 4000 * 10 ** (99e-4)] * u.AA)
+    assert spectral_axis.grid == (4000, 1e-4, 100, 'log')
+
+    spectral_axis = SpectralAxis.from_grid(1 * u.um, 10 * u.nm, 11)
+    assert_quantity_allclose(spectral_axis, np.linspace(1, 1.1, 11) * u.um)
+    assert_quantity_allclose(spectral_axis.bin_edges[[0, -1]],
+                             [0.995, 1.105] * u.um)
+
+    with pytest.raises(ValueError):
+        SpectralAxis.from_grid(1 * u.um, 10 * u.nm, 11, scale='quadratic')
+
+    # Slices of axes created from bin edges keep their edges.
+    spectral_axis = SpectralAxis([1, 2, 4, 8, 16] * u.um,
+                                 bin_specification="edges")
+    assert_quantity_allclose(spectral_axis[1:3].bin_edges, [2, 4, 8] * u.um)
+
+
+def test_grid_modified_values():
+    spectral_axis = SpectralAxis.from_grid(1 * u.um, 10 * u.nm, 11)
+    assert spectral_axis.grid.step == 0.01
+    assert_quantity_allclose(spectral_axis.bin_edges[-1], 1.105 * u.um)
+
+    # The grid and bin edges are computed again after the values are
+    # modified in place.
+    spectral_axis.value[:] = np.linspace(2, 2.2, 11)
+    assert np.isclose(spectral_axis.grid.step, 0.02)
+    assert_quantity_allclose(spectral_axis.bin_edges[-1], 2.21 * u.um)
+
+    spectral_axis.value[:] = [1, 2, 3, 5, 8, 13, 21, 34, 55, 89, 144]
+    assert spectral_axis.grid is None
+    assert_quantity_allclose(spectral_axis.bin_edges[-1], 171.5 * u.um)
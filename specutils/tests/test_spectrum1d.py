@@ -233,6 +233,52 @@ def test_flux_unit_conversion():
     assert new_spec.flux[0] == 26.0 * u.uJy
 
 
+def test_flux_unit_conversion_inplace():
+    s = Spectrum1D(flux=np.array([[26.0, 44.5], [1.0, 2.0]]) * u.Jy,
+                   spectral_axis=np.array([400, 500]) * u.nm)
+    flambda = u.erg / u.s / u.cm**2 / u.AA
+    expected = s.flux.to(flambda, u.spectral_density(s.spectral_axis))
+
+    # The copy shares nothing with the original spectrum.
+    converted_spec = s.new_flux_unit(flambda)
+    assert u.allclose(converted_spec.flux, expected)
+    assert converted_spec.data is not s.data
+    assert converted_spec.spectral_axis is not s.spectral_axis
+    assert s.flux.unit == u.Jy
+
+    # The conversion factors are cached on the spectral axis.
+    factors = s.spectral_axis._derived_cache('_flux_conversion_factors')
+    assert factors[u.Jy, flambda].shape == (2,)
+
+    data = s.data
+    assert s.new_flux_unit(u.mJy, inplace=True) is s
+    assert s.data is data
+    assert u.allclose(s.flux, expected.to(u.mJy,
+                                          u.spectral_density(s.spectral_axis)))
+    assert factors[u.Jy, u.mJy] == 1000
+
+    s.new_flux_unit(flambda, inplace=True)
+    assert s.data is data
+    assert u.allclose(s.flux, expected)
+
+    # Read-only fluxes are replaced by a converted array.
+    flux = u.Quantity(np.broadcast_to([26., 44.], (3, 2)), u.Jy, copy=False)
+    s = Spectrum1D(flux=flux, spectral_axis=np.array([400, 500]) * u.nm)
+    s.new_flux_unit(u.mJy, inplace=True)
+    assert u.allclose(s.flux, [26000, 44000] * u.mJy)
+    assert u.allclose(flux, [26, 44] * u.Jy)
+
+    # The factors are computed again if the spectral axis is modified in
+    # place.
+    s = Spectrum1D(flux=np.array([26.0, 44.5]) * u.Jy,
+                   spectral_axis=np.array([400, 500]) * u.nm)
+    s.new_flux_unit(flambda)
+    s.spectral_axis.value[:] = [800, 1000]
+    expected = s.flux.to(flambda, u.spectral_density(s.spectral_axis))
+    assert u.allclose(s.new_flux_unit(flambda).flux, expected)
+    assert s.spectral_axis.flags.writeable
+
+
 def test_wcs_transformations():
     # Test with a GWCS
     spec = Spectrum1D(spectral_axis=np.arange(1, 50) * u.nm,
@@ -263,6 +309,53 @@ def test_wcs_transformations():
 
     assert np.allclose(spec.wcs.world_to_pixel(7000*u.AA), [461.2])
 
+def test_lazy_wcs():
+    spec = Spectrum1D(spectral_axis=np.arange(1, 50) * u.nm,
+                      flux=np.random.randn(49) * u.Jy,
+                      uncertainty=StdDevUncertainty(np.ones(49)))
+
+    # Operations that only need the spectral axis don't build the WCS.
+    from ..manipulation import box_smooth
+    from ..spectra import SpectralRegion
+    from ..analysis import centroid
+
+    box_smooth(spec, 3)
+    centroid(spec, SpectralRegion(10 * u.nm, 20 * u.nm))
+    assert spec._wcs is None
+
+    # It is built once, on first access.
+    wcs = spec.wcs
+    assert isinstance(wcs, gwcs.wcs.WCS)
+    assert spec.wcs is wcs
+    assert np.allclose(wcs.world_to_pixel(np.arange(20, 30) * u.nm),
+                       np.arange(19, 29))
+
+    # Setting the WCS behaves as if it had been built on creation.
+    spec = Spectrum1D(spectral_axis=np.arange(1, 50) * u.nm,
+                      flux=np.random.randn(49) * u.Jy)
+    with pytest.raises(ValueError):
+        spec.wcs = wcs
+    spec.wcs = None
+    assert spec.wcs is None
+
+    with pytest.raises(ValueError):
+        Spectrum1D(spectral_axis=np.arange(1, 50).reshape(49, 1) * u.nm,
+                   flux=np.random.randn(49) * u.Jy)
+
+
+def test_fitswcs_grid():
+    my_wcs = fitswcs.WCS(header={'CDELT1': 1, 'CRVAL1': 6562.8,
+                                 'CUNIT1': 'Angstrom', 'CTYPE1': 'WAVE',
+                                 'CRPIX1': 25}, naxis=1)
+    spec = Spectrum1D(flux=np.ones(50) * u.Jy, wcs=my_wcs)
+
+    # The grid of a linear FITS WCS is known without detecting it.
+    grid = spec.spectral_axis._derived_cache('_grid_results')['grid']
+    assert grid.scale == 'linear'
+    assert grid.n == 50
+    assert np.isclose(grid.step, (1 * u.AA).to_value(spec.spectral_axis.unit))
+
+
 def test_create_explicit_fitswcs():
     my_wcs = fitswcs.WCS(header={'CDELT1': 1, 'CRVAL1': 6562.8, 'CUNIT1': 'Angstrom',
                                  'CTYPE1': 'WAVE', 'RESTFRQ': 1400000000, 'CRPIX1': 25})
@@ -0,0 +1,55 @@
+"""
+Helpers applying the floating point type policy of the manipulation and
+analysis functions, ``specutils.conf.dtype_policy``.
+"""
+
+import numpy as np
+
+
+def result_dtype(*arrays, dtype=None):
+    """
+    The floating point type to compute the results of a function of
+    ``arrays`` in, or `None` to leave it to the type promotion of NumPy.
+
+    Parameters
+    ----------
+    arrays : array-like
+        The inputs of the function, e.g. the flux of a spectrum.
+
+    dtype : `~numpy.dtype`, optional
+        The type requested in the call, which overrides the policy.
+
+    Returns
+    -------
+    dtype : `~numpy.dtype` or `None`
+        ``dtype`` if it is given. Otherwise, with the ``'preserve'`` policy,
+        the floating point type the array inputs promote to, so that float32
+        inputs give float32 results (and integer inputs float64 results), and
+        `None` with the ``'promote'`` policy.
+    """
+    if dtype is not None:
+        return np.dtype(dtype)
+
+    from .. import conf
+
+    if conf.dtype_policy != 'preserve':
+        return None
+
+    # Scalars, e.g. a factor applied to a spectrum, do not change the type
+    # of the arrays they are combined with.
+    arrays = [np.asanyarray(array) for array in arrays]
+    dtypes = ([array.dtype for array in arrays if array.ndim] or
+              [array.dtype for array in arrays])
+
+    return np.result_type(*dtypes, np.float16)
+
+
+def cast(array, dtype):
+    """
+    ``array`` converted to ``dtype``, without copying it if it already has
+    that type, or unchanged if ``dtype`` (or ``array``) is `None`.
+    """
+    if dtype is None or array is None:
+        return array
+
+    return np.asanyarray(array).astype(dtype, copy=False)